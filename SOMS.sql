@@ -24,6 +24,12 @@ DROP TABLE IF EXISTS belongs_to;
 DROP TABLE IF EXISTS organization;
 DROP TABLE IF EXISTS student;
 DROP TABLE IF EXISTS studentorg_log;
+DROP TABLE IF EXISTS payment_history;
+DROP TABLE IF EXISTS belongs_to_history;
+DROP VIEW IF EXISTS payment_all;
+DROP VIEW IF EXISTS belongs_to_all;
+DROP TABLE IF EXISTS payment_archive;
+DROP TABLE IF EXISTS belongs_to_archive;
 
 -- Re-enable foreign key checks
 SET FOREIGN_KEY_CHECKS=1;
@@ -58,6 +64,9 @@ CREATE TABLE IF NOT EXISTS payment (
     CONSTRAINT student_studno_fk FOREIGN KEY (stud_no) REFERENCES student(stud_no)
 ) AUTO_INCREMENT = 1001;
 
+-- Open balances (top debtors) are read from this index without touching paid rows
+CREATE INDEX IF NOT EXISTS payment_open_balance ON payment (payment_status, stud_no, org_id, due_date, amount, amount_paid);
+
 CREATE TABLE IF NOT EXISTS belongs_to (
     stud_no VARCHAR(10),
     org_id INT(10),
@@ -72,6 +81,108 @@ CREATE TABLE IF NOT EXISTS belongs_to (
     CONSTRAINT belongs_orgid_fk FOREIGN KEY(org_id) REFERENCES organization(org_id)
 );
 
+-- Per-term member lookups (facets, drill-down) read one organization's term directly
+CREATE INDEX IF NOT EXISTS belongs_to_org_term ON belongs_to (org_id, acad_year, semester);
+
+-- One row per organization term, maintained by term_summary.py
+CREATE TABLE IF NOT EXISTS term_membership_summary (
+    org_id INT(10),
+    acad_year VARCHAR(9),
+    semester VARCHAR(1),
+    term_no INT,
+    total_members INT NOT NULL,
+    active_members INT NOT NULL,
+    inactive_members INT NOT NULL,
+    alumni_members INT NOT NULL,
+    retained_members INT NOT NULL,
+    PRIMARY KEY(org_id, acad_year, semester)
+);
+
+-- Row versions of payment and belongs_to for "as of" reports (history.py).
+-- A version is current from valid_from until valid_to; the current one ends at 9999-12-31.
+CREATE TABLE IF NOT EXISTS payment_history (
+    history_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    payment_id INT(5) NOT NULL,
+    amount_paid DECIMAL(11,2),
+    payment_date DATE DEFAULT NULL,
+    payment_status VARCHAR(30),
+    amount DECIMAL(11,2),
+    due_date DATE NOT NULL,
+    org_id INT(10) NOT NULL,
+    stud_no VARCHAR(10) NOT NULL,
+    valid_from DATETIME(6) NOT NULL,
+    valid_to DATETIME(6) NOT NULL DEFAULT '9999-12-31 23:59:59.999999',
+    KEY payment_history_row (payment_id, valid_to),
+    KEY payment_history_as_of (org_id, valid_to, valid_from)
+);
+
+CREATE TABLE IF NOT EXISTS belongs_to_history (
+    history_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    stud_no VARCHAR(10) NOT NULL,
+    org_id INT(10) NOT NULL,
+    semester VARCHAR(1) NOT NULL,
+    acad_year VARCHAR(9) NOT NULL,
+    status VARCHAR(50),
+    role VARCHAR(50),
+    committee VARCHAR(50),
+    batch_year INT(4),
+    valid_from DATETIME(6) NOT NULL,
+    valid_to DATETIME(6) NOT NULL DEFAULT '9999-12-31 23:59:59.999999',
+    KEY belongs_to_history_row (stud_no, org_id, semester, acad_year, valid_to),
+    KEY belongs_to_history_as_of (org_id, valid_to, valid_from)
+);
+
+-- Closed academic years moved out of payment and belongs_to (archive.py). Partitions
+-- (ay2018 = academic year 2018-2019) are split off p_future as years are archived;
+-- payment and belongs_to themselves cannot be partitioned while they have foreign keys.
+CREATE TABLE IF NOT EXISTS payment_archive (
+    payment_id INT(5) NOT NULL,
+    amount_paid DECIMAL(11,2),
+    payment_date DATE DEFAULT NULL,
+    payment_status VARCHAR(30),
+    amount DECIMAL(11,2),
+    due_date DATE NOT NULL,
+    org_id INT(10) NOT NULL,
+    stud_no VARCHAR(10) NOT NULL,
+    PRIMARY KEY (payment_id, due_date),
+    KEY payment_archive_org (org_id, due_date),
+    KEY payment_archive_stud_no (stud_no)
+) PARTITION BY RANGE COLUMNS (due_date) (
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+CREATE TABLE IF NOT EXISTS belongs_to_archive (
+    stud_no VARCHAR(10),
+    org_id INT(10),
+    semester VARCHAR(1),
+    acad_year VARCHAR(9),
+    status VARCHAR(50),
+    role VARCHAR(50),
+    committee VARCHAR(50),
+    batch_year INT(4),
+    PRIMARY KEY (stud_no, org_id, semester, acad_year),
+    KEY belongs_to_archive_org_term (org_id, acad_year, semester)
+) PARTITION BY RANGE COLUMNS (acad_year) (
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+-- Live and archived rows together, for whole-table reads (snapshots, the columnar engine,
+-- the term summary rebuild). Reports filter each branch themselves, so that a year
+-- predicate prunes the archive partitions; a view's join conditions never reach them.
+CREATE OR REPLACE VIEW payment_all AS
+    SELECT payment_id, amount_paid, payment_date, payment_status, amount, due_date, org_id, stud_no
+    FROM payment
+    UNION ALL
+    SELECT payment_id, amount_paid, payment_date, payment_status, amount, due_date, org_id, stud_no
+    FROM payment_archive;
+
+CREATE OR REPLACE VIEW belongs_to_all AS
+    SELECT stud_no, org_id, semester, acad_year, status, role, committee, batch_year
+    FROM belongs_to
+    UNION ALL
+    SELECT stud_no, org_id, semester, acad_year, status, role, committee, batch_year
+    FROM belongs_to_archive;
+
 -- Log Table
 CREATE TABLE IF NOT EXISTS studentorg_log (
     log_id INT AUTO_INCREMENT PRIMARY KEY,
@@ -82,94 +193,190 @@ CREATE TABLE IF NOT EXISTS studentorg_log (
 );
 
 -- Triggers
+-- Bulk jobs SET @soms_skip_audit = 1 for their session and write one
+-- summary row per batch (change_type BULK_INS/BULK_UPD/BULK_DEL) instead.
 
 DELIMITER //
 
 -- Triggers for student
 CREATE TRIGGER student_insert AFTER INSERT ON student
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('student', NEW.stud_no, 'INSERT');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('student', NEW.stud_no, 'INSERT');
+    END IF;
 END;
 //
 
 CREATE TRIGGER student_update AFTER UPDATE ON student
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('student', NEW.stud_no, 'UPDATE');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('student', NEW.stud_no, 'UPDATE');
+    END IF;
 END;
 //
 
 CREATE TRIGGER student_delete AFTER DELETE ON student
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('student', OLD.stud_no, 'DELETE');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('student', OLD.stud_no, 'DELETE');
+    END IF;
 END;
 //
 
 -- Triggers for organization
 CREATE TRIGGER organization_insert AFTER INSERT ON organization
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('organization', NEW.org_id, 'INSERT');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('organization', NEW.org_id, 'INSERT');
+    END IF;
 END;
 //
 
 CREATE TRIGGER organization_update AFTER UPDATE ON organization
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('organization', NEW.org_id, 'UPDATE');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('organization', NEW.org_id, 'UPDATE');
+    END IF;
 END;
 //
 
 CREATE TRIGGER organization_delete AFTER DELETE ON organization
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('organization', OLD.org_id, 'DELETE');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('organization', OLD.org_id, 'DELETE');
+    END IF;
 END;
 //
 
 -- Triggers for payment
 CREATE TRIGGER payment_insert AFTER INSERT ON payment
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('payment', NEW.payment_id, 'INSERT');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('payment', NEW.payment_id, 'INSERT');
+    END IF;
 END;
 //
 
 CREATE TRIGGER payment_update AFTER UPDATE ON payment
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('payment', NEW.payment_id, 'UPDATE');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('payment', NEW.payment_id, 'UPDATE');
+    END IF;
 END;
 //
 
 CREATE TRIGGER payment_delete AFTER DELETE ON payment
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('payment', OLD.payment_id, 'DELETE');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('payment', OLD.payment_id, 'DELETE');
+    END IF;
 END;
 //
 
 -- Triggers for belongs_to
 CREATE TRIGGER belongs_to_insert AFTER INSERT ON belongs_to
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('belongs_to', CONCAT(NEW.stud_no, '-', NEW.org_id, '-', NEW.semester, '-', NEW.acad_year), 'INSERT');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('belongs_to', CONCAT(NEW.stud_no, '-', NEW.org_id, '-', NEW.semester, '-', NEW.acad_year), 'INSERT');
+    END IF;
 END;
 //
 
 CREATE TRIGGER belongs_to_update AFTER UPDATE ON belongs_to
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('belongs_to', CONCAT(NEW.stud_no, '-', NEW.org_id, '-', NEW.semester, '-', NEW.acad_year), 'UPDATE');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('belongs_to', CONCAT(NEW.stud_no, '-', NEW.org_id, '-', NEW.semester, '-', NEW.acad_year), 'UPDATE');
+    END IF;
 END;
 //
 
 CREATE TRIGGER belongs_to_delete AFTER DELETE ON belongs_to
 FOR EACH ROW BEGIN
-    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
-    VALUES ('belongs_to', CONCAT(OLD.stud_no, '-', OLD.org_id, '-', OLD.semester, '-', OLD.acad_year), 'DELETE');
+    IF COALESCE(@soms_skip_audit, 0) = 0 THEN
+        INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+        VALUES ('belongs_to', CONCAT(OLD.stud_no, '-', OLD.org_id, '-', OLD.semester, '-', OLD.acad_year), 'DELETE');
+    END IF;
+END;
+//
+
+DELIMITER ;
+
+-- History triggers keep payment_history and belongs_to_history current. Unlike the
+-- audit triggers they also run for bulk jobs; only loaders that write the history
+-- themselves (history.seed_history) SET @soms_skip_history = 1.
+
+DELIMITER //
+
+-- History triggers for payment
+CREATE TRIGGER payment_history_insert AFTER INSERT ON payment
+FOR EACH ROW BEGIN
+    IF COALESCE(@soms_skip_history, 0) = 0 THEN
+        INSERT INTO payment_history (payment_id, amount_paid, payment_date, payment_status, amount, due_date, org_id, stud_no, valid_from)
+        VALUES (NEW.payment_id, NEW.amount_paid, NEW.payment_date, NEW.payment_status, NEW.amount, NEW.due_date, NEW.org_id, NEW.stud_no, NOW(6));
+    END IF;
+END;
+//
+
+CREATE TRIGGER payment_history_update AFTER UPDATE ON payment
+FOR EACH ROW BEGIN
+    IF COALESCE(@soms_skip_history, 0) = 0 THEN
+        UPDATE payment_history SET valid_to = NOW(6)
+        WHERE payment_id = OLD.payment_id AND valid_to = '9999-12-31 23:59:59.999999';
+        INSERT INTO payment_history (payment_id, amount_paid, payment_date, payment_status, amount, due_date, org_id, stud_no, valid_from)
+        VALUES (NEW.payment_id, NEW.amount_paid, NEW.payment_date, NEW.payment_status, NEW.amount, NEW.due_date, NEW.org_id, NEW.stud_no, NOW(6));
+    END IF;
+END;
+//
+
+CREATE TRIGGER payment_history_delete AFTER DELETE ON payment
+FOR EACH ROW BEGIN
+    IF COALESCE(@soms_skip_history, 0) = 0 THEN
+        UPDATE payment_history SET valid_to = NOW(6)
+        WHERE payment_id = OLD.payment_id AND valid_to = '9999-12-31 23:59:59.999999';
+    END IF;
+END;
+//
+
+-- History triggers for belongs_to
+CREATE TRIGGER belongs_to_history_insert AFTER INSERT ON belongs_to
+FOR EACH ROW BEGIN
+    IF COALESCE(@soms_skip_history, 0) = 0 THEN
+        INSERT INTO belongs_to_history (stud_no, org_id, semester, acad_year, status, role, committee, batch_year, valid_from)
+        VALUES (NEW.stud_no, NEW.org_id, NEW.semester, NEW.acad_year, NEW.status, NEW.role, NEW.committee, NEW.batch_year, NOW(6));
+    END IF;
+END;
+//
+
+CREATE TRIGGER belongs_to_history_update AFTER UPDATE ON belongs_to
+FOR EACH ROW BEGIN
+    IF COALESCE(@soms_skip_history, 0) = 0 THEN
+        UPDATE belongs_to_history SET valid_to = NOW(6)
+        WHERE stud_no = OLD.stud_no AND org_id = OLD.org_id AND semester = OLD.semester AND acad_year = OLD.acad_year
+          AND valid_to = '9999-12-31 23:59:59.999999';
+        INSERT INTO belongs_to_history (stud_no, org_id, semester, acad_year, status, role, committee, batch_year, valid_from)
+        VALUES (NEW.stud_no, NEW.org_id, NEW.semester, NEW.acad_year, NEW.status, NEW.role, NEW.committee, NEW.batch_year, NOW(6));
+    END IF;
+END;
+//
+
+CREATE TRIGGER belongs_to_history_delete AFTER DELETE ON belongs_to
+FOR EACH ROW BEGIN
+    IF COALESCE(@soms_skip_history, 0) = 0 THEN
+        UPDATE belongs_to_history SET valid_to = NOW(6)
+        WHERE stud_no = OLD.stud_no AND org_id = OLD.org_id AND semester = OLD.semester AND acad_year = OLD.acad_year
+          AND valid_to = '9999-12-31 23:59:59.999999';
+    END IF;
 END;
 //
 
@@ -244,10 +451,18 @@ BEGIN
     FROM payment p
     JOIN student s ON s.stud_no = p.stud_no
     JOIN organization o ON o.org_id = p.org_id
-    JOIN belongs_to b ON b.stud_no = p.stud_no AND b.org_id = p.org_id
+    JOIN (
+        SELECT bl.stud_no, bl.org_id, bl.semester, bl.acad_year
+        FROM belongs_to bl
+        WHERE bl.org_id = p_org_id AND bl.acad_year = CONCAT(p_batch_year, '-', p_batch_year + 1)
+          AND bl.semester = p_semester
+        UNION ALL
+        SELECT ba.stud_no, ba.org_id, ba.semester, ba.acad_year
+        FROM belongs_to_archive ba
+        WHERE ba.org_id = p_org_id AND ba.acad_year = CONCAT(p_batch_year, '-', p_batch_year + 1)
+          AND ba.semester = p_semester
+    ) b ON b.stud_no = p.stud_no AND b.org_id = p.org_id
     WHERE p.payment_status = 'Unpaid'
-      AND b.semester = p_semester
-      AND b.acad_year = p_batch_year
       AND o.org_id = p_org_id;
 END //
 
@@ -268,7 +483,7 @@ BEGIN
     FROM payment p
     JOIN student s ON p.stud_no = s.stud_no
     JOIN organization o ON p.org_id = o.org_id
-    JOIN belongs_to b ON b.stud_no = s.stud_no AND b.org_id = o.org_id
+    LEFT JOIN belongs_to b ON b.stud_no = s.stud_no AND b.org_id = o.org_id
     WHERE p.payment_status = 'Unpaid'
       AND s.stud_no = p_stud_no;
 END //
@@ -287,12 +502,17 @@ BEGIN
         b.semester,
         b.committee,
         o.org_name
-    FROM belongs_to b
+    FROM (
+        SELECT bl.stud_no, bl.org_id, bl.semester, bl.acad_year, bl.committee
+        FROM belongs_to bl
+        WHERE bl.org_id = p_org_id AND bl.acad_year = p_acad_year AND bl.committee = 'Executive'
+        UNION ALL
+        SELECT ba.stud_no, ba.org_id, ba.semester, ba.acad_year, ba.committee
+        FROM belongs_to_archive ba
+        WHERE ba.org_id = p_org_id AND ba.acad_year = p_acad_year AND ba.committee = 'Executive'
+    ) b
     JOIN student s ON b.stud_no = s.stud_no
-    JOIN organization o ON b.org_id = o.org_id
-    WHERE b.committee = 'Executive'
-      AND b.acad_year = p_acad_year
-      AND o.org_id = p_org_id;
+    JOIN organization o ON b.org_id = o.org_id;
 END //
 
 -- Report 5: View organization role history
@@ -309,11 +529,17 @@ BEGIN
         b.acad_year,
         b.semester,
         o.org_name
-    FROM belongs_to b
+    FROM (
+        SELECT bl.stud_no, bl.org_id, bl.semester, bl.acad_year, bl.role
+        FROM belongs_to bl
+        WHERE bl.org_id = p_org_id AND bl.role = p_role
+        UNION ALL
+        SELECT ba.stud_no, ba.org_id, ba.semester, ba.acad_year, ba.role
+        FROM belongs_to_archive ba
+        WHERE ba.org_id = p_org_id AND ba.role = p_role
+    ) b
     JOIN student s ON b.stud_no = s.stud_no
     JOIN organization o ON b.org_id = o.org_id
-    WHERE b.role = p_role
-      AND o.org_id = p_org_id
     ORDER BY b.acad_year DESC, b.semester DESC;
 END //
 
@@ -334,7 +560,17 @@ BEGIN
     FROM payment p
     JOIN student s ON p.stud_no = s.stud_no
     JOIN organization o ON p.org_id = o.org_id
-    JOIN belongs_to b ON b.stud_no = p.stud_no AND b.org_id = p.org_id AND b.semester = p_semester AND b.acad_year = p_batch_year
+    JOIN (
+        SELECT bl.stud_no, bl.org_id, bl.semester, bl.acad_year
+        FROM belongs_to bl
+        WHERE bl.org_id = p_org_id AND bl.acad_year = CONCAT(p_batch_year, '-', p_batch_year + 1)
+          AND bl.semester = p_semester
+        UNION ALL
+        SELECT ba.stud_no, ba.org_id, ba.semester, ba.acad_year
+        FROM belongs_to_archive ba
+        WHERE ba.org_id = p_org_id AND ba.acad_year = CONCAT(p_batch_year, '-', p_batch_year + 1)
+          AND ba.semester = p_semester
+    ) b ON b.stud_no = p.stud_no AND b.org_id = p.org_id
     WHERE p.payment_status = 'Partial'
       AND o.org_id = p_org_id
     ORDER BY b.acad_year DESC, b.semester DESC;
@@ -352,8 +588,11 @@ BEGIN
         (SUM(status IN ('Inactive', 'Alumni')) / COUNT(*)) * 100 AS "Percentage of inactive/alumni members",
         acad_year,
         semester
-    FROM belongs_to
-    WHERE org_id = p_org_id
+    FROM (
+        SELECT bl.semester, bl.acad_year, bl.status FROM belongs_to bl WHERE bl.org_id = p_org_id
+        UNION ALL
+        SELECT ba.semester, ba.acad_year, ba.status FROM belongs_to_archive ba WHERE ba.org_id = p_org_id
+    ) b
     GROUP BY acad_year, semester
     ORDER BY acad_year DESC, semester DESC
     LIMIT p_num_semesters;
@@ -371,12 +610,18 @@ BEGIN
         CONCAT(s.firstname, ' ', s.lastname) AS name,
         CONCAT(b.role, ', ', b.committee, ', ', b.semester, ' sem') AS 'Alumni Record',
         o.org_name
-    FROM belongs_to b
+    FROM (
+        SELECT bl.stud_no, bl.org_id, bl.semester, bl.acad_year, bl.role, bl.committee
+        FROM belongs_to bl
+        WHERE bl.org_id = p_org_id AND bl.status = 'Alumni'
+        UNION ALL
+        SELECT ba.stud_no, ba.org_id, ba.semester, ba.acad_year, ba.role, ba.committee
+        FROM belongs_to_archive ba
+        WHERE ba.org_id = p_org_id AND ba.status = 'Alumni'
+    ) b
     JOIN student s ON b.stud_no = s.stud_no
     JOIN organization o ON b.org_id = o.org_id
-    WHERE b.status = 'Alumni'
-      AND b.org_id = p_org_id
-      AND STR_TO_DATE(CONCAT(SUBSTRING_INDEX(b.acad_year, '-', 1), '-', IF(b.semester = '1', '06-01', '11-30')), '%Y-%m-%d') <= p_as_of_date
+    WHERE STR_TO_DATE(CONCAT(SUBSTRING_INDEX(b.acad_year, '-', 1), '-', IF(b.semester = '1', '06-01', '11-30')), '%Y-%m-%d') <= p_as_of_date
     ORDER BY b.acad_year DESC, b.semester DESC;
 END //
 
@@ -400,9 +645,12 @@ BEGIN
             WHEN p.payment_status = 'Partial' THEN (p.amount - p.amount_paid)
             ELSE 0
         END) AS total_unpaid_fees
-    FROM payment p
+    FROM payment_history p
     JOIN organization o ON o.org_id = p.org_id
     WHERE p.org_id = p_org_id
+      -- The fee versions current at the end of the as-of date
+      AND p.valid_from < DATE_ADD(p_as_of_date, INTERVAL 1 DAY)
+      AND p.valid_to >= DATE_ADD(p_as_of_date, INTERVAL 1 DAY)
     GROUP BY o.org_name;
 END //
 
@@ -424,12 +672,80 @@ BEGIN
     FROM payment p
     JOIN student s ON p.stud_no = s.stud_no
     JOIN organization o ON p.org_id = o.org_id
-    JOIN belongs_to b ON p.stud_no = b.stud_no AND p.org_id = b.org_id
+    JOIN (
+        SELECT bl.stud_no, bl.org_id, bl.semester, bl.acad_year
+        FROM belongs_to bl
+        WHERE bl.org_id = p_org_id AND bl.acad_year = CONCAT(p_batch_year, '-', p_batch_year + 1)
+          AND bl.semester = p_semester
+        UNION ALL
+        SELECT ba.stud_no, ba.org_id, ba.semester, ba.acad_year
+        FROM belongs_to_archive ba
+        WHERE ba.org_id = p_org_id AND ba.acad_year = CONCAT(p_batch_year, '-', p_batch_year + 1)
+          AND ba.semester = p_semester
+    ) b ON b.stud_no = p.stud_no AND b.org_id = p.org_id
     WHERE p.payment_status != 'Paid'
-      AND b.acad_year = p_batch_year
-      AND b.semester = p_semester
       AND p.org_id = p_org_id
     ORDER BY total_debt DESC;
 END //
 
+-- Student profile: identity, memberships by term, open fees and balance per org
+DROP PROCEDURE IF EXISTS GetStudentProfile;
+CREATE PROCEDURE GetStudentProfile (
+    IN p_stud_no VARCHAR(10)
+)
+BEGIN
+    SELECT stud_no, firstname, lastname, degrprog, batch, gender, birthday
+    FROM student
+    WHERE stud_no = p_stud_no;
+
+    SELECT
+        b.org_id,
+        o.org_name,
+        b.acad_year,
+        b.semester,
+        b.status,
+        b.role,
+        b.committee
+    FROM (
+        SELECT bl.org_id, bl.acad_year, bl.semester, bl.status, bl.role, bl.committee
+        FROM belongs_to bl
+        WHERE bl.stud_no = p_stud_no
+        UNION ALL
+        SELECT ba.org_id, ba.acad_year, ba.semester, ba.status, ba.role, ba.committee
+        FROM belongs_to_archive ba
+        WHERE ba.stud_no = p_stud_no
+    ) b
+    JOIN organization o ON b.org_id = o.org_id
+    ORDER BY b.acad_year DESC, b.semester DESC, o.org_name;
+
+    SELECT
+        p.payment_id,
+        o.org_name,
+        p.amount,
+        p.amount_paid,
+        p.payment_status,
+        p.due_date,
+        DATEDIFF(CURRENT_DATE, p.due_date) AS days_overdue
+    FROM payment p
+    JOIN organization o ON p.org_id = o.org_id
+    WHERE p.stud_no = p_stud_no
+      AND p.payment_status != 'Paid'
+    ORDER BY p.due_date;
+
+    SELECT
+        p.org_id,
+        o.org_name,
+        SUM(p.amount) AS total_fees,
+        SUM(COALESCE(p.amount_paid, 0)) AS total_paid,
+        SUM(p.amount - COALESCE(p.amount_paid, 0)) AS balance
+    FROM (
+        SELECT pl.org_id, pl.amount, pl.amount_paid FROM payment pl WHERE pl.stud_no = p_stud_no
+        UNION ALL
+        SELECT pa.org_id, pa.amount, pa.amount_paid FROM payment_archive pa WHERE pa.stud_no = p_stud_no
+    ) p
+    JOIN organization o ON p.org_id = o.org_id
+    GROUP BY p.org_id, o.org_name
+    ORDER BY balance DESC;
+END //
+
 DELIMITER ; 
\ No newline at end of file
@@ -0,0 +1,229 @@
+"""
+Cold-term archival for the Student Organization Management System
+
+payment and belongs_to keep only the academic years still in use. Closed
+academic years are moved to payment_archive and belongs_to_archive, which
+are range-partitioned by academic year (fees by due_date from June 1,
+memberships by acad_year); payment and belongs_to themselves cannot be
+partitioned while they have foreign keys. The payment_all and
+belongs_to_all views put live and archived rows back together for
+whole-table reads (snapshots, the columnar engine, the term summary
+rebuild). Reports that name a past term or span every term read
+live_and_archived(), which filters each branch. Open-fee lookups, fee
+collection, rosters and membership changes only touch the live tables.
+
+Settled ('Paid') fees are archived with their academic year; open fees stay
+in payment until they are paid, however old. Archiving moves rows without
+changing them, so it writes neither audit log rows nor history versions.
+
+    python archive.py status
+    python archive.py run --keep 1 --dry-run
+    python archive.py run --before 2022-2023
+"""
+
+import argparse
+import sys
+from collections import defaultdict
+from datetime import date
+
+from database import DEFAULT_BATCH_SIZE
+
+PAYMENT_COLUMNS = ('payment_id', 'amount_paid', 'payment_date', 'payment_status', 'amount', 'due_date', 'org_id',
+                   'stud_no')
+MEMBERSHIP_COLUMNS = ('stud_no', 'org_id', 'semester', 'acad_year', 'status', 'role', 'committee', 'batch_year')
+
+class ArchiveError(Exception):
+    """An academic year that cannot be archived as it stands"""
+
+# Live table -> (archive table, columns)
+ARCHIVE_TABLES = {
+    'payment': ('payment_archive', PAYMENT_COLUMNS),
+    'belongs_to': ('belongs_to_archive', MEMBERSHIP_COLUMNS),
+}
+
+def live_and_archived(table, where, alias):
+    """A derived table of a table's live and archived rows, filtered by where in both branches.
+
+    Unlike the payment_all and belongs_to_all views, the filter reaches
+    the archive branch as written, so a term or year predicate prunes its
+    partitions and an organization or student predicate uses its indexes.
+    where refers to the columns as <alias>.<column>; its parameters are
+    passed once per branch.
+    """
+    archive_table, columns = ARCHIVE_TABLES[table]
+    selected = ', '.join(f"{alias}.{column}" for column in columns)
+    return (f"(SELECT {selected} FROM {table} {alias} WHERE {where}\n"
+            f"     UNION ALL\n"
+            f"     SELECT {selected} FROM {archive_table} {alias} WHERE {where}) {alias}")
+
+def academic_year(day):
+    """The start year of the academic year (June 1 to May 31) a date falls in"""
+    return day.year if day.month >= 6 else day.year - 1
+
+def year_label(start_year):
+    return f"{start_year}-{start_year + 1}"
+
+def partition_bounds(table, start_year):
+    """(partition name, VALUES LESS THAN literal) of an academic year in an archive table"""
+    if table == 'payment_archive':
+        return f"ay{start_year}", f"'{start_year + 1}-06-01'"
+    return f"ay{start_year}", f"'{year_label(start_year + 1)}'"
+
+def ensure_partition(db_manager, table, start_year):
+    """Split the partition that would hold an academic year so the year gets its own"""
+    if not getattr(db_manager.connection, 'supports_partitions', True):
+        return False
+    name, bound = partition_bounds(table, start_year)
+    cursor = db_manager.cursor
+    cursor.execute("""SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS bound
+                      FROM information_schema.PARTITIONS
+                      WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+                      ORDER BY PARTITION_ORDINAL_POSITION""", (table,))
+    partitions = cursor.fetchall()
+    if any(partition['name'] == name for partition in partitions):
+        return False
+    # Bounds of one table share a format, so they order as strings; MAXVALUE is last
+    containing = next(partition for partition in partitions
+                      if partition['bound'] == 'MAXVALUE' or partition['bound'] > bound)
+    cursor.execute(f"""ALTER TABLE {table} REORGANIZE PARTITION {containing['name']} INTO (
+                           PARTITION {name} VALUES LESS THAN ({bound}),
+                           PARTITION {containing['name']} VALUES LESS THAN ({containing['bound']}))""")
+    return True
+
+def archive_status(db_manager):
+    """Live and archived payments and memberships per academic year, oldest first"""
+    cursor = db_manager.cursor
+    years = defaultdict(lambda: {'live_payments': 0, 'archived_payments': 0,
+                                 'live_memberships': 0, 'archived_memberships': 0})
+    for table, key in (('payment', 'live_payments'), ('payment_archive', 'archived_payments')):
+        # Grouped by day and folded into academic years here, which needs no date functions
+        cursor.execute(f"SELECT due_date, COUNT(*) AS payments FROM {table} GROUP BY due_date")
+        for row in cursor.fetchall():
+            years[academic_year(row['due_date'])][key] += row['payments']
+    for table, key in (('belongs_to', 'live_memberships'), ('belongs_to_archive', 'archived_memberships')):
+        cursor.execute(f"SELECT acad_year, COUNT(*) AS memberships FROM {table} GROUP BY acad_year")
+        for row in cursor.fetchall():
+            years[int(row['acad_year'].split('-')[0])][key] += row['memberships']
+    db_manager.connection.commit()
+    return [{'acad_year': year_label(start_year), **counts} for start_year, counts in sorted(years.items())]
+
+def closed_years(db_manager, before_year):
+    """Start years before before_year with settled fees or memberships still in the live tables"""
+    cursor = db_manager.cursor
+    cursor.execute("""SELECT DISTINCT due_date FROM payment
+                      WHERE payment_status = 'Paid' AND due_date < %s""", (date(before_year, 6, 1),))
+    years = {academic_year(row['due_date']) for row in cursor.fetchall()}
+    cursor.execute("SELECT DISTINCT acad_year FROM belongs_to WHERE acad_year < %s", (year_label(before_year),))
+    years.update(int(row['acad_year'].split('-')[0]) for row in cursor.fetchall())
+    db_manager.connection.commit()
+    return sorted(years)
+
+def archive_year(db_manager, start_year, batch_size=DEFAULT_BATCH_SIZE):
+    """Move one academic year's settled fees and memberships to the archive; returns (payments, memberships).
+
+    Raises ArchiveError, before moving anything, when a row of the year is
+    already in the archive: the live and archived copies would otherwise
+    both be read by every report over the two tables.
+    """
+    cursor = db_manager.cursor
+    cursor.execute("""SELECT COUNT(*) AS conflicts
+                      FROM payment p
+                      JOIN payment_archive a ON a.payment_id = p.payment_id
+                      WHERE p.payment_status = 'Paid' AND p.due_date >= %s AND p.due_date < %s""",
+                   (date(start_year, 6, 1), date(start_year + 1, 6, 1)))
+    payment_conflicts = cursor.fetchone()['conflicts']
+    cursor.execute("""SELECT COUNT(*) AS conflicts
+                      FROM belongs_to b
+                      JOIN belongs_to_archive a ON a.stud_no = b.stud_no AND a.org_id = b.org_id
+                                               AND a.semester = b.semester AND a.acad_year = b.acad_year
+                      WHERE b.acad_year = %s""", (year_label(start_year),))
+    membership_conflicts = cursor.fetchone()['conflicts']
+    db_manager.connection.commit()
+    if payment_conflicts or membership_conflicts:
+        raise ArchiveError(f"{year_label(start_year)}: {payment_conflicts} payments and {membership_conflicts} "
+                           f"memberships are already archived")
+
+    for table in ('payment_archive', 'belongs_to_archive'):
+        ensure_partition(db_manager, table, start_year)
+
+    payments = 0
+    cursor.execute("SET @soms_skip_audit = 1")
+    cursor.execute("SET @soms_skip_history = 1")
+    try:
+        while True:
+            cursor.execute("""SELECT payment_id FROM payment
+                              WHERE payment_status = 'Paid' AND due_date >= %s AND due_date < %s
+                              ORDER BY payment_id
+                              LIMIT %s""", (date(start_year, 6, 1), date(start_year + 1, 6, 1), batch_size))
+            ids = [row['payment_id'] for row in cursor.fetchall()]
+            if not ids:
+                break
+            placeholders = ', '.join(['%s'] * len(ids))
+            cursor.execute(f"""INSERT INTO payment_archive ({', '.join(PAYMENT_COLUMNS)})
+                               SELECT {', '.join(PAYMENT_COLUMNS)} FROM payment
+                               WHERE payment_id IN ({placeholders})""", ids)
+            cursor.execute(f"DELETE FROM payment WHERE payment_id IN ({placeholders})", ids)
+            db_manager.connection.commit()
+            payments += len(ids)
+
+        cursor.execute(f"""INSERT INTO belongs_to_archive ({', '.join(MEMBERSHIP_COLUMNS)})
+                           SELECT {', '.join(MEMBERSHIP_COLUMNS)} FROM belongs_to
+                           WHERE acad_year = %s""", (year_label(start_year),))
+        cursor.execute("DELETE FROM belongs_to WHERE acad_year = %s", (year_label(start_year),))
+        memberships = cursor.rowcount
+        db_manager.connection.commit()
+    except Exception:
+        db_manager.connection.rollback()
+        raise
+    finally:
+        cursor.execute("SET @soms_skip_history = NULL")
+        cursor.execute("SET @soms_skip_audit = NULL")
+    return payments, memberships
+
+def main():
+    parser = argparse.ArgumentParser(description="Archive closed academic years of payment and belongs_to")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('status', help="live and archived rows per academic year")
+    run = commands.add_parser('run', help="move closed academic years to the archive tables")
+    cutoff = run.add_mutually_exclusive_group()
+    cutoff.add_argument('--keep', type=int, default=1,
+                        help="closed academic years to keep live besides the current one (default 1)")
+    cutoff.add_argument('--before', metavar='YYYY-YYYY', help="archive every academic year before this one")
+    run.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+    run.add_argument('--dry-run', action='store_true', help="list the years without moving anything")
+    for command in commands.choices.values():
+        command.add_argument('--sqlite', metavar='PATH', help="use a SQLite database instead of MariaDB")
+    args = parser.parse_args()
+
+    from tabulate import tabulate
+    from backend import open_database
+    with open_database(args.sqlite) as db_manager:
+        if args.command == 'status':
+            rows = archive_status(db_manager)
+            print(tabulate([list(row.values()) for row in rows],
+                           headers=["Academic Year", "Live Payments", "Archived Payments",
+                                    "Live Memberships", "Archived Memberships"], tablefmt="grid"))
+            return 0
+
+        if args.before:
+            before_year = int(args.before.split('-')[0])
+        else:
+            before_year = academic_year(date.today()) - args.keep
+        years = closed_years(db_manager, before_year)
+        if not years:
+            print(f"✓ Nothing to archive before {year_label(before_year)}")
+            return 0
+        for start_year in years:
+            if args.dry_run:
+                print(f"Would archive {year_label(start_year)}")
+                continue
+            try:
+                payments, memberships = archive_year(db_manager, start_year, batch_size=args.batch_size)
+            except ArchiveError as e:
+                print(f"✗ {e}")
+                return 1
+            print(f"✓ {year_label(start_year)}: archived {payments} paid fees and {memberships} memberships")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
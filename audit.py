@@ -0,0 +1,62 @@
+"""
+Audit log helpers for bulk operations in the Student Organization Management System
+"""
+
+import re
+
+BULK_CHANGE_TYPES = {'INSERT': 'BULK_INS', 'UPDATE': 'BULK_UPD', 'DELETE': 'BULK_DEL'}
+BULK_IDENTIFIER = re.compile(r"^(?P<first>.*)\.\.(?P<last>.*) \((?P<count>\d+) rows\)$")
+
+def belongs_to_key(stud_no, org_id, semester, acad_year):
+    """Build the record_identifier the belongs_to triggers write"""
+    return f"{stud_no}-{org_id}-{semester}-{acad_year}"
+
+def parse_bulk_identifier(record_identifier):
+    """Split a summarized record_identifier into (first_key, last_key, count)"""
+    match = BULK_IDENTIFIER.match(record_identifier or '')
+    if not match:
+        return None
+    return match.group('first'), match.group('last'), int(match.group('count'))
+
+class BulkAudit:
+    """Suppress the per-row audit triggers for a bulk job.
+
+    While the context is active the session flag @soms_skip_audit is set,
+    so the studentorg_log triggers skip their per-row insert. The job calls
+    record() once per batch, inside the batch's transaction, to keep the
+    audit trail covered by one summarized row. With per_row=True the
+    triggers stay on and record() does nothing.
+    """
+
+    def __init__(self, db_manager, table_name, per_row=False):
+        self.db_manager = db_manager
+        self.table_name = table_name
+        self.per_row = per_row
+        self.batches = 0
+
+    def __enter__(self):
+        if not self.per_row:
+            self.db_manager.cursor.execute("SET @soms_skip_audit = 1")
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if not self.per_row:
+            self.db_manager.cursor.execute("SET @soms_skip_audit = NULL")
+        return False
+
+    def record(self, change_type, first_key, last_key, count):
+        """Write one summary row covering count rows between first_key and last_key"""
+        if self.per_row or not count:
+            return
+        self.db_manager.cursor.execute(
+            """INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+               VALUES (%s, %s, %s)""",
+            (self.table_name, f"{first_key}..{last_key} ({count} rows)", BULK_CHANGE_TYPES[change_type])
+        )
+        self.batches += 1
+
+    def record_keys(self, change_type, keys, count=None):
+        """Write one summary row for a batch of record identifiers"""
+        keys = [str(key) for key in keys]
+        if keys:
+            self.record(change_type, min(keys), max(keys), len(keys) if count is None else count)
@@ -0,0 +1,613 @@
+"""
+Embedded SQLite backend for the Student Organization Management System
+
+SQLiteDatabase exposes the same connection/cursor pair as
+main.DatabaseManager, so the managers and reports run unchanged against a
+local snapshot file or an in-memory database. The cursor translates the
+MariaDB dialect the app uses (%s placeholders, IF(), DATE_ADD/DATE_SUB by
+days, ON DUPLICATE KEY UPDATE, TRUNCATE, session variables) and registers
+the MariaDB functions the reports call (CONCAT, DATEDIFF, STR_TO_DATE,
+SUBSTRING_INDEX). callproc() runs the stored procedures of SOMS.sql, and
+SQLite errors are raised as mysql.connector errors so existing error
+handling still applies.
+
+    python backend.py snapshot soms.db                 copy MariaDB into a snapshot file
+    python backend.py create test.db --scale tiny      new database with a generated dataset
+    python soms.py report alumni --org 1001 --as-of 2025-01-01 --sqlite soms.db
+"""
+
+import argparse
+import os
+import re
+import sqlite3
+from datetime import date, datetime
+from decimal import Decimal
+
+from mysql.connector import errorcode, errors
+
+from history import HISTORY_TABLES, OPEN_VERSION
+
+SCHEMA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'SOMS.sql')
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS student (
+    stud_no VARCHAR(10) PRIMARY KEY,
+    firstname VARCHAR(50) NOT NULL,
+    lastname VARCHAR(50) NOT NULL,
+    degrprog VARCHAR(50),
+    batch INT NOT NULL,
+    gender VARCHAR(1) NOT NULL,
+    birthday DATE
+);
+
+CREATE TABLE IF NOT EXISTS organization (
+    org_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    org_name VARCHAR(50) NOT NULL,
+    year_established DATE NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS payment (
+    payment_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    amount_paid DECIMAL(11,2),
+    payment_date DATE DEFAULT NULL,
+    payment_status VARCHAR(30) DEFAULT 'Not Paid',
+    amount DECIMAL(11,2),
+    due_date DATE NOT NULL,
+    org_id INT NOT NULL REFERENCES organization(org_id),
+    stud_no VARCHAR(10) NOT NULL REFERENCES student(stud_no)
+);
+
+CREATE TABLE IF NOT EXISTS belongs_to (
+    stud_no VARCHAR(10) REFERENCES student(stud_no),
+    org_id INT REFERENCES organization(org_id),
+    semester VARCHAR(1),
+    acad_year VARCHAR(9),
+    status VARCHAR(50),
+    role VARCHAR(50),
+    committee VARCHAR(50),
+    batch_year INT,
+    PRIMARY KEY(stud_no, org_id, semester, acad_year)
+);
+
+CREATE TABLE IF NOT EXISTS studentorg_log (
+    log_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    table_name VARCHAR(50) NOT NULL,
+    record_identifier VARCHAR(255),
+    change_type VARCHAR(10) NOT NULL,
+    change_timestamp DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS term_membership_summary (
+    org_id INT,
+    acad_year VARCHAR(9),
+    semester VARCHAR(1),
+    term_no INT,
+    total_members INT NOT NULL,
+    active_members INT NOT NULL,
+    inactive_members INT NOT NULL,
+    alumni_members INT NOT NULL,
+    retained_members INT NOT NULL,
+    PRIMARY KEY(org_id, acad_year, semester)
+);
+
+CREATE TABLE IF NOT EXISTS payment_history (
+    history_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    payment_id INT NOT NULL,
+    amount_paid DECIMAL(11,2),
+    payment_date DATE DEFAULT NULL,
+    payment_status VARCHAR(30),
+    amount DECIMAL(11,2),
+    due_date DATE NOT NULL,
+    org_id INT NOT NULL,
+    stud_no VARCHAR(10) NOT NULL,
+    valid_from DATETIME NOT NULL,
+    valid_to DATETIME NOT NULL DEFAULT '9999-12-31 23:59:59.999999'
+);
+
+CREATE TABLE IF NOT EXISTS belongs_to_history (
+    history_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    stud_no VARCHAR(10) NOT NULL,
+    org_id INT NOT NULL,
+    semester VARCHAR(1) NOT NULL,
+    acad_year VARCHAR(9) NOT NULL,
+    status VARCHAR(50),
+    role VARCHAR(50),
+    committee VARCHAR(50),
+    batch_year INT,
+    valid_from DATETIME NOT NULL,
+    valid_to DATETIME NOT NULL DEFAULT '9999-12-31 23:59:59.999999'
+);
+
+-- Archived academic years (archive.py); SQLite has no partitions
+CREATE TABLE IF NOT EXISTS payment_archive (
+    payment_id INT NOT NULL,
+    amount_paid DECIMAL(11,2),
+    payment_date DATE DEFAULT NULL,
+    payment_status VARCHAR(30),
+    amount DECIMAL(11,2),
+    due_date DATE NOT NULL,
+    org_id INT NOT NULL,
+    stud_no VARCHAR(10) NOT NULL,
+    PRIMARY KEY (payment_id, due_date)
+);
+
+CREATE TABLE IF NOT EXISTS belongs_to_archive (
+    stud_no VARCHAR(10),
+    org_id INT,
+    semester VARCHAR(1),
+    acad_year VARCHAR(9),
+    status VARCHAR(50),
+    role VARCHAR(50),
+    committee VARCHAR(50),
+    batch_year INT,
+    PRIMARY KEY(stud_no, org_id, semester, acad_year)
+);
+
+CREATE VIEW IF NOT EXISTS payment_all AS
+    SELECT payment_id, amount_paid, payment_date, payment_status, amount, due_date, org_id, stud_no
+    FROM payment
+    UNION ALL
+    SELECT payment_id, amount_paid, payment_date, payment_status, amount, due_date, org_id, stud_no
+    FROM payment_archive;
+
+CREATE VIEW IF NOT EXISTS belongs_to_all AS
+    SELECT stud_no, org_id, semester, acad_year, status, role, committee, batch_year
+    FROM belongs_to
+    UNION ALL
+    SELECT stud_no, org_id, semester, acad_year, status, role, committee, batch_year
+    FROM belongs_to_archive;
+
+-- InnoDB indexes every foreign key
+CREATE INDEX IF NOT EXISTS payment_org_id ON payment (org_id);
+CREATE INDEX IF NOT EXISTS payment_stud_no ON payment (stud_no);
+CREATE INDEX IF NOT EXISTS belongs_to_org_id ON belongs_to (org_id);
+CREATE INDEX IF NOT EXISTS belongs_to_org_term ON belongs_to (org_id, acad_year, semester);
+CREATE INDEX IF NOT EXISTS payment_open_balance ON payment (payment_status, stud_no, org_id, due_date, amount, amount_paid);
+CREATE INDEX IF NOT EXISTS payment_archive_org ON payment_archive (org_id, due_date);
+CREATE INDEX IF NOT EXISTS payment_archive_stud_no ON payment_archive (stud_no);
+CREATE INDEX IF NOT EXISTS belongs_to_archive_org_term ON belongs_to_archive (org_id, acad_year, semester);
+CREATE INDEX IF NOT EXISTS payment_history_row ON payment_history (payment_id, valid_to);
+CREATE INDEX IF NOT EXISTS payment_history_as_of ON payment_history (org_id, valid_to, valid_from);
+CREATE INDEX IF NOT EXISTS belongs_to_history_row ON belongs_to_history (stud_no, org_id, semester, acad_year, valid_to);
+CREATE INDEX IF NOT EXISTS belongs_to_history_as_of ON belongs_to_history (org_id, valid_to, valid_from);
+
+-- AUTO_INCREMENT = 1001
+INSERT INTO sqlite_sequence (name, seq)
+SELECT name, 1000 FROM (SELECT 'organization' AS name UNION ALL SELECT 'payment')
+WHERE name NOT IN (SELECT name FROM sqlite_sequence);
+"""
+
+# Table -> record_identifier expression the audit triggers write
+AUDIT_KEYS = {
+    'student': "{row}.stud_no",
+    'organization': "{row}.org_id",
+    'payment': "{row}.payment_id",
+    'belongs_to': "{row}.stud_no || '-' || {row}.org_id || '-' || {row}.semester || '-' || {row}.acad_year",
+}
+
+# MariaDB date format -> strptime format
+DATE_FORMATS = {'%Y': '%Y', '%m': '%m', '%d': '%d', '%H': '%H', '%i': '%M', '%s': '%S'}
+
+# MariaDB's NOW(6) in local time; SQLite keeps milliseconds
+NOW = "strftime('%Y-%m-%d %H:%M:%f', 'now', 'localtime')"
+
+def session_ddl():
+    """Per-connection audit triggers and history triggers.
+
+    The triggers are TEMP so they can call soms_session(), which reads the
+    connection's stand-ins for MariaDB's @soms_skip_audit and
+    @soms_skip_history session variables (SQLiteConnection.session).
+    """
+    statements = []
+    for table, key in AUDIT_KEYS.items():
+        for event, row in (('INSERT', 'NEW'), ('UPDATE', 'NEW'), ('DELETE', 'OLD')):
+            statements.append(f"""
+                CREATE TEMP TRIGGER IF NOT EXISTS {table}_{event.lower()} AFTER {event} ON main.{table}
+                WHEN soms_session('skip_audit') = 0
+                BEGIN
+                    INSERT INTO studentorg_log (table_name, record_identifier, change_type)
+                    VALUES ('{table}', {key.format(row=row)}, '{event}');
+                END""")
+    for table, (history_table, key, columns) in HISTORY_TABLES.items():
+        open_version = f"""
+                    INSERT INTO {history_table} ({', '.join(columns)}, valid_from)
+                    VALUES ({', '.join(f'NEW.{column}' for column in columns)}, {NOW});"""
+        close_version = f"""
+                    UPDATE {history_table} SET valid_to = {NOW}
+                    WHERE {' AND '.join(f'{column} = OLD.{column}' for column in key)}
+                      AND valid_to = '{OPEN_VERSION}';"""
+        for event, body in (('INSERT', open_version), ('UPDATE', close_version + open_version),
+                            ('DELETE', close_version)):
+            statements.append(f"""
+                CREATE TEMP TRIGGER IF NOT EXISTS {table}_history_{event.lower()} AFTER {event} ON main.{table}
+                WHEN soms_session('skip_history') = 0
+                BEGIN{body}
+                END""")
+    return statements
+
+def parse_procedures(schema_file=SCHEMA_FILE):
+    """Return {procedure: [SELECT statements]} for the stored procedures in SOMS.sql"""
+    with open(schema_file, encoding='utf-8') as sql_file:
+        schema = sql_file.read()
+    pattern = re.compile(r'CREATE PROCEDURE\s+(\w+)\s*\((.*?)\)\s*BEGIN(.*?)END\s*//', re.DOTALL | re.IGNORECASE)
+    procedures = {}
+    for name, _, body in pattern.findall(schema):
+        statements = [statement.strip() for statement in body.split(';')]
+        procedures[name] = [statement for statement in statements if statement.upper().startswith('SELECT')]
+    return procedures
+
+def procedure_parameters(schema_file=SCHEMA_FILE):
+    """Return {procedure: [(parameter, type)]} in declaration order"""
+    with open(schema_file, encoding='utf-8') as sql_file:
+        schema = sql_file.read()
+    pattern = re.compile(r'CREATE PROCEDURE\s+(\w+)\s*\((.*?)\)\s*BEGIN', re.DOTALL | re.IGNORECASE)
+    return {name: [(param, kind.upper()) for param, kind in re.findall(r'\bIN\s+(\w+)\s+(\w+)', params, re.IGNORECASE)]
+            for name, params in pattern.findall(schema)}
+
+# MariaDB functions used by the reports
+
+def sql_concat(*values):
+    if any(value is None for value in values):
+        return None
+    return ''.join(str(value) for value in values)
+
+def to_date(value):
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value)[:10])
+
+def sql_datediff(end, start):
+    end, start = to_date(end), to_date(start)
+    if end is None or start is None:
+        return None
+    return (end - start).days
+
+def sql_str_to_date(value, mysql_format):
+    if value is None or mysql_format is None:
+        return None
+    python_format = re.sub(r'%[a-zA-Z]', lambda match: DATE_FORMATS.get(match.group(0), match.group(0)),
+                           mysql_format)
+    try:
+        return datetime.strptime(value, python_format).date().isoformat()
+    except ValueError:
+        return None
+
+def sql_substring_index(value, delimiter, count):
+    if value is None or delimiter is None or count is None:
+        return None
+    parts = str(value).split(delimiter)
+    return delimiter.join(parts[:count] if count > 0 else parts[count:])
+
+def to_decimal(value):
+    """MariaDB returns DECIMAL arithmetic as Decimal; SQLite returns floats"""
+    cents = value * 100
+    if abs(cents - round(cents)) < 1e-6:
+        return Decimal(f"{value:.2f}")
+    return Decimal(f"{value:.4f}")
+
+def dict_row(cursor, row):
+    return {column[0]: to_decimal(value) if isinstance(value, float) else value
+            for column, value in zip(cursor.description, row)}
+
+def tuple_row(cursor, row):
+    # Floats only come from computed columns; most rows are returned untouched
+    for value in row:
+        if type(value) is float:
+            return tuple([to_decimal(value) if type(value) is float else value for value in row])
+    return row
+
+# Bound as numbers: SQLite orders every number before every TEXT value, so a
+# Decimal bound as text would fail numeric comparisons (DECIMAL columns store REAL)
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(date, date.isoformat)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(sep=' '))
+sqlite3.register_converter('DECIMAL', lambda value: Decimal(value.decode()).quantize(Decimal('0.01')))
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()[:10]))
+sqlite3.register_converter('DATETIME', lambda value: datetime.fromisoformat(value.decode()))
+
+def translate_error(error):
+    """Raise a sqlite3 error as the mysql.connector error the app handles"""
+    message = str(error)
+    if isinstance(error, sqlite3.IntegrityError):
+        if 'UNIQUE' in message or 'PRIMARY KEY' in message:
+            errno = errorcode.ER_DUP_ENTRY
+        elif 'FOREIGN KEY' in message:
+            errno = errorcode.ER_NO_REFERENCED_ROW_2
+        elif 'NOT NULL' in message:
+            errno = errorcode.ER_BAD_NULL_ERROR
+        else:
+            errno = None
+        return errors.IntegrityError(msg=message, errno=errno)
+    if isinstance(error, sqlite3.OperationalError):
+        if 'locked' in message:
+            return errors.OperationalError(msg=message, errno=errorcode.ER_LOCK_WAIT_TIMEOUT)
+        return errors.ProgrammingError(msg=message, errno=errorcode.ER_PARSE_ERROR)
+    return errors.DatabaseError(msg=message)
+
+def translate_sql(query, params=None):
+    """Rewrite one MariaDB statement for SQLite.
+
+    Returns None for statements that have no SQLite equivalent and can be
+    skipped (e.g. SET UNIQUE_CHECKS).
+    """
+    stripped = query.strip()
+    session = re.match(r'SET\s+@soms_skip_(audit|history)\s*=\s*(.+)$', stripped, re.IGNORECASE)
+    if session:
+        # A SELECT, so setting a flag neither opens nor joins a transaction, as with SET
+        return f"SELECT soms_set_session('skip_{session.group(1).lower()}', COALESCE({session.group(2)}, 0))"
+    foreign_keys = re.match(r'SET\s+FOREIGN_KEY_CHECKS\s*=\s*(\d)$', stripped, re.IGNORECASE)
+    if foreign_keys:
+        return f"PRAGMA foreign_keys = {'ON' if foreign_keys.group(1) == '1' else 'OFF'}"
+    if re.match(r'SET\s', stripped, re.IGNORECASE):
+        return None
+
+    query = re.sub(r'^\s*TRUNCATE\s+TABLE\s+', 'DELETE FROM ', query, flags=re.IGNORECASE)
+    query = re.sub(r'\bDROP\s+TEMPORARY\s+TABLE\b', 'DROP TABLE', query, flags=re.IGNORECASE)
+    query = re.sub(r'\bIF\s*\(', 'IIF(', query, flags=re.IGNORECASE)
+    query = re.sub(r'\bDATE_(ADD|SUB)\(([^,()]+(?:\([^()]*\))?),\s*INTERVAL\s+(\d+)\s+DAY\)',
+                   lambda match: f"DATE({match.group(2)}, '{'+' if match.group(1).upper() == 'ADD' else '-'}"
+                                 f"{match.group(3)} days')",
+                   query, flags=re.IGNORECASE)
+    # MariaDB's / never truncates; SQLite divides integers as integers
+    query = re.sub(r'\s/\s', ' * 1.0 / ', query)
+    if re.search(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', query, re.IGNORECASE):
+        query = re.sub(r'\bON\s+DUPLICATE\s+KEY\s+UPDATE\b', 'ON CONFLICT DO UPDATE SET', query,
+                       flags=re.IGNORECASE)
+        query = re.sub(r'\bVALUES\((\w+)\)', r'excluded.\1', query)
+    if params is not None:
+        query = query.replace('%s', '?')
+    return query
+
+class StoredResult:
+    """One result set from callproc(), as returned by stored_results()"""
+
+    def __init__(self, rows, description=None):
+        self.rows = rows
+        self.description = description
+        self.position = 0
+
+    def fetchall(self):
+        rows = self.rows[self.position:]
+        self.position = len(self.rows)
+        return rows
+
+    def fetchmany(self, size=1):
+        rows = self.rows[self.position:self.position + size]
+        self.position += len(rows)
+        return rows
+
+    def fetchone(self):
+        rows = self.fetchmany(1)
+        return rows[0] if rows else None
+
+    def __iter__(self):
+        return iter(self.rows)
+
+class SQLiteCursor:
+    """A cursor speaking the subset of MySQLCursorDict (or MySQLCursor) the app uses"""
+
+    def __init__(self, connection, dictionary=True):
+        self.connection = connection
+        self.cursor = connection.sqlite.cursor()
+        self.cursor.row_factory = dict_row if dictionary else tuple_row
+        self.lastrowid = None
+        self.rowcount = -1
+        self._stored_results = []
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    def execute(self, query, params=None):
+        translated = translate_sql(query, params)
+        if translated is None:
+            return
+        try:
+            self.cursor.execute(translated, tuple(params) if params is not None else ())
+        except sqlite3.Error as e:
+            raise translate_error(e) from e
+        self.rowcount = self.cursor.rowcount
+        self.lastrowid = self.cursor.lastrowid
+        # MariaDB reports the first id of a multi-row INSERT, SQLite the last
+        if translated.lstrip().upper().startswith('INSERT') and self.rowcount > 1 and self.lastrowid:
+            self.lastrowid -= self.rowcount - 1
+
+    def executemany(self, query, seq_params):
+        translated = translate_sql(query, ())
+        if translated is None:
+            return
+        try:
+            self.cursor.executemany(translated, [tuple(params) for params in seq_params])
+        except sqlite3.Error as e:
+            raise translate_error(e) from e
+        self.rowcount = self.cursor.rowcount
+
+    def callproc(self, procedure, args=()):
+        """Run a stored procedure's SELECTs; results are read with stored_results()"""
+        statements = self.connection.procedures.get(procedure)
+        if statements is None:
+            raise errors.ProgrammingError(msg=f"PROCEDURE {procedure} does not exist",
+                                          errno=errorcode.ER_SP_DOES_NOT_EXIST)
+        params = self.connection.procedure_params[procedure]
+        values = dict(zip((name for name, _ in params), args))
+        self._stored_results = []
+        for statement in statements:
+            # MariaDB compares a string column with a YEAR parameter numerically
+            for name, kind in params:
+                if kind == 'YEAR':
+                    statement = re.sub(rf'(\b\w+\.\w+)\s*=\s*{name}\b', rf'CAST(\1 AS INTEGER) = {name}', statement)
+            bound = []
+
+            def bind(match):
+                name = match.group(0)
+                if name not in values:
+                    return name
+                bound.append(values[name])
+                return '?'
+
+            query = re.sub(r'\bp_\w+\b', bind, translate_sql(statement))
+            try:
+                self.cursor.execute(query, bound)
+            except sqlite3.Error as e:
+                raise translate_error(e) from e
+            self._stored_results.append(StoredResult(self.cursor.fetchall(), self.cursor.description))
+        return args
+
+    def stored_results(self):
+        return iter(self._stored_results)
+
+    def fetchone(self):
+        return self.cursor.fetchone()
+
+    def fetchmany(self, size=1):
+        return self.cursor.fetchmany(size)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def __iter__(self):
+        return iter(self.cursor)
+
+    def close(self):
+        self.cursor.close()
+
+class SQLiteConnection:
+    """The subset of MySQLConnection the app uses, over sqlite3"""
+
+    # Procedures are run by callproc() from their parsed SELECTs; there is no CALL
+    emulates_procedures = True
+    # archive.py moves rows into the archive tables without partitioning them
+    supports_partitions = False
+
+    def __init__(self, path=':memory:'):
+        self.sqlite = sqlite3.connect(path, detect_types=sqlite3.PARSE_DECLTYPES)
+        for name, narg, function in (('CONCAT', -1, sql_concat), ('DATEDIFF', 2, sql_datediff),
+                                     ('STR_TO_DATE', 2, sql_str_to_date),
+                                     ('SUBSTRING_INDEX', 3, sql_substring_index)):
+            self.sqlite.create_function(name, narg, function, deterministic=True)
+        # Session variables live outside transactions: a rollback does not reset them
+        self.session = {'skip_audit': 0, 'skip_history': 0}
+        self.sqlite.create_function('soms_session', 1, self.session.get)
+        self.sqlite.create_function('soms_set_session', 2, self.session.__setitem__)
+        self.sqlite.execute("PRAGMA foreign_keys = ON")
+        self.sqlite.executescript(SQLITE_SCHEMA)
+        for statement in session_ddl():
+            self.sqlite.execute(statement)
+        self.sqlite.commit()
+        self.procedures = parse_procedures()
+        self.procedure_params = procedure_parameters()
+
+    @property
+    def in_transaction(self):
+        return self.sqlite.in_transaction
+
+    def start_transaction(self, **kwargs):
+        if self.sqlite.in_transaction:
+            raise errors.ProgrammingError(msg="Transaction already in progress")
+        self.sqlite.execute("BEGIN")
+
+    def cursor(self, dictionary=True, **kwargs):
+        return SQLiteCursor(self, dictionary)
+
+    def commit(self):
+        self.sqlite.commit()
+
+    def rollback(self):
+        self.sqlite.rollback()
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        self.sqlite.close()
+
+class SQLiteDatabase:
+    """Drop-in replacement for main.DatabaseManager backed by a SQLite file"""
+
+    def __init__(self, path=':memory:'):
+        self.path = path
+        self.connection = SQLiteConnection(path)
+        self.cursor = self.connection.cursor(dictionary=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if self.cursor:
+            self.cursor.close()
+        if self.connection:
+            self.connection.close()
+
+def open_database(sqlite_path=None):
+    """A SQLiteDatabase for sqlite_path, otherwise the MariaDB DatabaseManager"""
+    if sqlite_path:
+        return SQLiteDatabase(sqlite_path)
+    from main import DatabaseManager
+    return DatabaseManager()
+
+SNAPSHOT_TABLES = ('organization', 'student', 'belongs_to', 'payment', 'belongs_to_archive', 'payment_archive',
+                   'belongs_to_history', 'payment_history')
+
+def copy_snapshot(source, target, tables=SNAPSHOT_TABLES, batch_size=5000):
+    """Copy tables from a MariaDB database into a SQLiteDatabase. Returns {table: rows}"""
+    counts = {}
+    target.cursor.execute("SET @soms_skip_audit = 1")
+    # The history is copied as it is rather than restarted from the copy
+    target.cursor.execute("SET @soms_skip_history = 1")
+    try:
+        for table in tables:
+            target.cursor.execute(f"DELETE FROM {table}")
+        for table in tables:
+            source.cursor.execute(f"SELECT * FROM {table}")
+            counts[table] = 0
+            while True:
+                rows = source.cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                columns = list(rows[0].keys())
+                target.cursor.executemany(
+                    f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join(['%s'] * len(columns))})",
+                    [[row[column] for column in columns] for row in rows])
+                counts[table] += len(rows)
+            target.connection.commit()
+    finally:
+        target.cursor.execute("SET @soms_skip_audit = NULL")
+        target.cursor.execute("SET @soms_skip_history = NULL")
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite snapshots of the SOMS database")
+    commands = parser.add_subparsers(dest='command', required=True)
+    snapshot = commands.add_parser('snapshot', help="copy the MariaDB tables into a SQLite file")
+    snapshot.add_argument('path')
+    snapshot.add_argument('--with-log', action='store_true', help="also copy studentorg_log")
+    create = commands.add_parser('create', help="create a SQLite database, optionally with generated data")
+    create.add_argument('path')
+    create.add_argument('--scale', help="datagen scale to load")
+    create.add_argument('--seed', type=int, default=127)
+    args = parser.parse_args()
+
+    with SQLiteDatabase(args.path) as target:
+        if args.command == 'snapshot':
+            from main import DatabaseManager
+            tables = SNAPSHOT_TABLES
+            if args.with_log:
+                tables += ('studentorg_log',)
+            with DatabaseManager() as source:
+                counts = copy_snapshot(source, target, tables)
+            print(f"✓ Copied {sum(counts.values())} rows into {args.path}")
+        elif args.scale:
+            from datagen import SCALES, DatasetGenerator, load_dataset
+            # SQLite allows at most 32766 bound parameters per statement
+            counts = load_dataset(target, DatasetGenerator(seed=args.seed, **SCALES[args.scale]),
+                                  batch_size=1000, reset=True)
+            print(f"✓ Loaded {sum(counts.values())} rows into {args.path}")
+        else:
+            print(f"✓ Created {args.path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,285 @@
+"""
+Benchmark suite for the Student Organization Management System
+
+Times every AdvancedReports query, the stored procedures called from
+FeesManager, the student search and fee/payment processing against a
+generated dataset. Results (p50/p95 latency, rows/sec, peak RSS) are
+appended to a JSON history file and compared with a stored baseline:
+
+    python benchmark.py --scales tiny,small --iterations 20
+    python benchmark.py --save-baseline
+    python benchmark.py --threshold 0.25     # exit status 1 on regressions
+    python benchmark.py --row-formats 100000 # dict rows vs compact records
+"""
+
+import argparse
+import json
+import math
+import os
+import resource
+import subprocess
+import time
+import tracemalloc
+from datetime import date, datetime
+from io import StringIO
+
+from database import iter_rows
+from fees import FEE_REPORTS, FeesManager
+from reports import REPORTS, AdvancedReports
+
+HISTORY_FILE = os.path.join('benchmarks', 'history.json')
+BASELINE_FILE = os.path.join('benchmarks', 'baseline.json')
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, math.ceil(fraction * len(ordered)) - 1))
+    return ordered[index]
+
+def peak_rss_kb():
+    """Peak resident set size of this process in KB"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+def sample_params(db_manager):
+    """Pick realistic report parameters from the loaded dataset"""
+    cursor = db_manager.cursor
+    cursor.execute("""SELECT org_id, acad_year, COUNT(*) AS members
+                      FROM belongs_to
+                      GROUP BY org_id, acad_year
+                      ORDER BY members DESC
+                      LIMIT 1""")
+    busiest = cursor.fetchone()
+    if not busiest:
+        raise RuntimeError("No memberships loaded; run datagen.py first")
+    cursor.execute("""SELECT stud_no FROM payment
+                      WHERE org_id = %s AND payment_status != 'Paid'
+                      ORDER BY stud_no
+                      LIMIT 1""", (busiest['org_id'],))
+    debtor = cursor.fetchone()
+    if not debtor:
+        cursor.execute("SELECT stud_no FROM belongs_to WHERE org_id = %s ORDER BY stud_no LIMIT 1",
+                       (busiest['org_id'],))
+        debtor = cursor.fetchone()
+    cursor.execute("SELECT lastname FROM student ORDER BY stud_no LIMIT 1")
+    student = cursor.fetchone()
+    acad_year = busiest['acad_year']
+    return {
+        'org_id': busiest['org_id'],
+        'acad_year': acad_year,
+        'semester': 1,
+        'batch_year': int(acad_year.split('-')[0]),
+        'stud_no': debtor['stud_no'],
+        'role': 'President',
+        'n_semesters': 6,
+        'as_of_date': date.today().isoformat(),
+        'name': student['lastname'] if student else 'a',
+    }
+
+def benchmark_cases(db_manager, params):
+    """Yield (name, callable returning a row count) for every benchmarked operation"""
+    reports = AdvancedReports(db_manager)
+    fees = FeesManager(db_manager)
+
+    for name, (method, spec) in REPORTS.items():
+        kwargs = {param: params[param] for param, _, _ in spec if param in params}
+        yield f"report.{name}", lambda method=method, kwargs=kwargs: len(getattr(reports, method)(**kwargs))
+
+    for name, (method, spec) in FEE_REPORTS.items():
+        kwargs = {param: params[param] for param, _, _ in spec if param in params}
+        yield f"procedure.{name}", lambda method=method, kwargs=kwargs: len(getattr(fees, method)(**kwargs))
+
+    yield "search_student.stud_no", lambda: len(fees.find_students(stud_no=params['stud_no']))
+    yield "search_student.name", lambda: len(fees.find_students(name=params['name']))
+    yield "search_student.all", lambda: len(fees.find_students())
+
+    created = []
+    unpaid = []
+
+    def add_fee():
+        payment_id = fees.assign_fee(params['stud_no'], params['org_id'], 100, params['as_of_date'])
+        created.append(payment_id)
+        unpaid.append(payment_id)
+        return 1
+
+    def process_payment():
+        # Pays the fees created by add_fee, one per call
+        if not unpaid:
+            add_fee()
+        fees.apply_payment(unpaid.pop(), 100)
+        return 1
+
+    yield "fees.add_fee", add_fee
+    yield "fees.process_payment", process_payment
+
+    # Remove the fees created by the write benchmarks
+    if created:
+        db_manager.cursor.execute(
+            f"DELETE FROM payment WHERE payment_id IN ({', '.join(['%s'] * len(created))})", created)
+        db_manager.connection.commit()
+
+def run_suite(db_manager, iterations=10, warmup=1):
+    """Run every case and return {case: metrics}"""
+    params = sample_params(db_manager)
+    results = {}
+    for name, case in benchmark_cases(db_manager, params):
+        for _ in range(warmup):
+            case()
+        latencies = []
+        rows = 0
+        for _ in range(iterations):
+            start = time.perf_counter()
+            rows = case()
+            latencies.append(time.perf_counter() - start)
+        mean = sum(latencies) / len(latencies)
+        results[name] = {
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+            'rows': rows,
+            'rows_per_sec': round(rows / mean, 1) if mean > 0 else None,
+            'peak_rss_kb': peak_rss_kb(),
+        }
+    return results
+
+# Wide enough to reach any row count on small datasets; LIMIT stops the cross join early
+ROW_FORMAT_QUERY = """
+    SELECT p.payment_id, p.stud_no, p.org_id, p.amount, p.amount_paid, p.due_date,
+           p.payment_status, s.firstname, s.lastname, s.degrprog
+    FROM payment p
+    CROSS JOIN student s
+    LIMIT %s
+"""
+
+def row_format_benchmark(db_manager, rows=100000):
+    """Fetch and CSV-render one large result as dict rows and as compact records"""
+    from soms import write_output
+
+    results = {}
+    for name, compact in (('dict', False), ('compact', True)):
+        start = time.perf_counter()
+        fetched = list(iter_rows(db_manager, ROW_FORMAT_QUERY, (rows,), compact=compact))
+        fetch_s = time.perf_counter() - start
+        start = time.perf_counter()
+        write_output(fetched, 'csv', out=StringIO())
+        render_s = time.perf_counter() - start
+        del fetched
+
+        # Measured separately: tracing allocations slows the timed runs down
+        tracemalloc.start()
+        fetched = list(iter_rows(db_manager, ROW_FORMAT_QUERY, (rows,), compact=compact))
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        results[name] = {
+            'rows': len(fetched),
+            'fetch_ms': round(fetch_s * 1000, 1),
+            'render_ms': round(render_s * 1000, 1),
+            'peak_kb': peak // 1024,
+        }
+        del fetched
+    return results
+
+def dataset_counts(db_manager):
+    counts = {}
+    for table in ('student', 'organization', 'belongs_to', 'payment'):
+        db_manager.cursor.execute(f"SELECT COUNT(*) AS total FROM {table}")
+        counts[table] = db_manager.cursor.fetchone()['total']
+    return counts
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def load_json(path, default):
+    if not os.path.exists(path):
+        return default
+    with open(path, encoding='utf-8') as json_file:
+        return json.load(json_file)
+
+def save_json(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temp_path = f"{path}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as json_file:
+        json.dump(data, json_file, indent=2)
+    os.replace(temp_path, path)
+
+def find_regressions(results, baseline, threshold, min_delta_ms=1.0):
+    """Cases whose p95 grew by more than threshold (and min_delta_ms) over the baseline"""
+    regressions = []
+    for name, metrics in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        delta = metrics['p95_ms'] - previous['p95_ms']
+        if delta > min_delta_ms and metrics['p95_ms'] > previous['p95_ms'] * (1 + threshold):
+            regressions.append((name, previous['p95_ms'], metrics['p95_ms']))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark SOMS reports and fee operations")
+    parser.add_argument('--scales', help="comma-separated datagen scales to load before each run "
+                                         "(default: use the data already loaded)")
+    parser.add_argument('--seed', type=int, default=127)
+    parser.add_argument('--iterations', type=int, default=10)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--threshold', type=float, default=0.2, help="allowed p95 growth over baseline")
+    parser.add_argument('--save-baseline', action='store_true', help="store this run as the baseline")
+    parser.add_argument('--row-formats', type=int, default=0, metavar='ROWS',
+                        help="also compare dict rows with compact records on a ROWS-row result (e.g. 100000)")
+    args = parser.parse_args()
+
+    from tabulate import tabulate
+    from main import DatabaseManager
+
+    history = load_json(HISTORY_FILE, [])
+    baseline = load_json(BASELINE_FILE, {})
+    regressed = False
+
+    with DatabaseManager() as db_manager:
+        for scale in (args.scales.split(',') if args.scales else [None]):
+            if scale:
+                from datagen import SCALES, DatasetGenerator, load_dataset
+                print(f"\nLoading '{scale}' dataset...")
+                load_dataset(db_manager, DatasetGenerator(seed=args.seed, **SCALES[scale]), reset=True)
+            label = scale or 'current'
+
+            results = run_suite(db_manager, iterations=args.iterations, warmup=args.warmup)
+            entry = {
+                'timestamp': datetime.now().isoformat(timespec='seconds'),
+                'revision': git_revision(),
+                'scale': label,
+                'dataset': dataset_counts(db_manager),
+                'results': results,
+            }
+            history.append(entry)
+
+            print(f"\nBenchmark results ({label}):")
+            print(tabulate([[name, m['p50_ms'], m['p95_ms'], m['rows'], m['rows_per_sec'], m['peak_rss_kb']]
+                            for name, m in results.items()],
+                           headers=["Case", "p50 ms", "p95 ms", "Rows", "Rows/sec", "Peak RSS KB"],
+                           tablefmt="grid"))
+
+            if args.row_formats:
+                entry['row_formats'] = row_format_benchmark(db_manager, args.row_formats)
+                print(f"\nRow formats ({label}):")
+                print(tabulate([[name, m['rows'], m['fetch_ms'], m['render_ms'], m['peak_kb']]
+                                for name, m in entry['row_formats'].items()],
+                               headers=["Format", "Rows", "Fetch ms", "CSV ms", "Peak KB"], tablefmt="grid"))
+
+            if args.save_baseline:
+                baseline[label] = results
+            elif label in baseline:
+                regressions = find_regressions(results, baseline[label], args.threshold)
+                for name, before, after in regressions:
+                    print(f"✗ Regression in {name}: p95 {before:.2f}ms -> {after:.2f}ms")
+                regressed = regressed or bool(regressions)
+
+    save_json(HISTORY_FILE, history)
+    if args.save_baseline:
+        save_json(BASELINE_FILE, baseline)
+        print(f"✓ Baseline saved to {BASELINE_FILE}")
+    return 1 if regressed else 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
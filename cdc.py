@@ -0,0 +1,350 @@
+"""
+Change-data-capture feed for the Student Organization Management System
+
+Tails studentorg_log by log_id, re-fetches the changed rows in batches and
+publishes them to pluggable subscribers (caches, summaries, export files).
+The last applied log_id is kept in a checkpoint file, so a restarted
+consumer resumes where it stopped:
+
+    python cdc.py --checkpoint cdc/export.json --export changes.jsonl
+    python cdc.py --checkpoint cdc/summary.json --subscriber mymodule:MySubscriber --once
+
+Delivery is at-least-once: the checkpoint is written after every
+subscriber has applied a batch, so subscribers must be idempotent. Bulk
+summary rows (BULK_INS/BULK_UPD) are expanded by re-fetching every row in
+their key range, which may include unchanged rows.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from archive import ARCHIVE_TABLES, live_and_archived
+from audit import belongs_to_key, parse_bulk_identifier
+
+def select_current(table, where, params):
+    """A query for the current rows of a table matching where, and its parameters.
+
+    archive.py moves rows of closed years without logging them, so payment
+    and belongs_to rows are looked up in their archive tables as well;
+    otherwise an archived row would be published as deleted.
+    """
+    if table in ARCHIVE_TABLES:
+        return f"SELECT * FROM {live_and_archived(table, where, 't')}", list(params) * 2
+    return f"SELECT * FROM {table} t WHERE {where}", params
+
+def split_membership_key(key):
+    """Split a belongs_to record_identifier; stud_no and acad_year contain hyphens"""
+    stud_no, org_id, semester, start_year, end_year = key.rsplit('-', 4)
+    return stud_no, int(org_id), semester, f"{start_year}-{end_year}"
+
+# Table -> (key columns, how to split a record_identifier into key values)
+TABLE_KEYS = {
+    'student': (('stud_no',), lambda key: (key,)),
+    'organization': (('org_id',), lambda key: (int(key),)),
+    'payment': (('payment_id',), lambda key: (int(key),)),
+    'belongs_to': (('stud_no', 'org_id', 'semester', 'acad_year'), split_membership_key),
+}
+
+class ChangeEvent:
+    """One changed row: row is None when it was deleted"""
+
+    __slots__ = ('log_id', 'table', 'change_type', 'key', 'row')
+
+    def __init__(self, log_id, table, change_type, key, row):
+        self.log_id = log_id
+        self.table = table
+        self.change_type = change_type
+        self.key = key
+        self.row = row
+
+    @property
+    def deleted(self):
+        return self.row is None
+
+    def as_dict(self):
+        return {'log_id': self.log_id, 'table': self.table, 'change_type': self.change_type,
+                'key': list(self.key), 'row': self.row}
+
+class Subscriber(ABC):
+    """Receives batches of ChangeEvents in log order"""
+
+    name = 'subscriber'
+
+    def bind(self, db_manager):
+        """Called with the feed's database before the first batch"""
+
+    @abstractmethod
+    def apply(self, events):
+        """Apply one batch; may see the same events again after a restart"""
+
+    def close(self):
+        pass
+
+class JsonLinesExporter(Subscriber):
+    """Appends every change to a JSON Lines file"""
+
+    name = 'jsonl'
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'a', encoding='utf-8')
+
+    def apply(self, events):
+        from soms import to_json
+        for event in events:
+            self.file.write(json.dumps(event.as_dict(), default=to_json) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def close(self):
+        self.file.close()
+
+class ReportCache(Subscriber):
+    """Memoized report results, evicted per organization as their rows change"""
+
+    name = 'report-cache'
+
+    def __init__(self, reports, max_entries=256):
+        self.reports = reports
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def run_report(self, name, **params):
+        key = (name, tuple(sorted(params.items())))
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+        rows = self.reports.run_report(name, **params)
+        self.entries[key] = rows
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+        return rows
+
+    def apply(self, events):
+        org_ids = set()
+        for event in events:
+            if event.table in ('payment', 'belongs_to', 'organization') and event.row is not None:
+                org_ids.add(event.row['org_id'])
+            else:
+                # Student changes and deletes cannot be narrowed to one organization
+                self.entries.clear()
+                return
+        for key in [key for key in self.entries if dict(key[1]).get('org_id') in org_ids]:
+            del self.entries[key]
+        # member-unpaid-fees is keyed by student and spans organizations
+        for key in [key for key in self.entries if 'org_id' not in dict(key[1])]:
+            del self.entries[key]
+
+class ChangeFeed:
+    """Tails studentorg_log and publishes re-fetched rows to subscribers"""
+
+    def __init__(self, db_manager, subscribers, checkpoint_path, batch_size=500, gap_grace=5.0):
+        self.db_manager = db_manager
+        self.subscribers = subscribers
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self.gap_grace = gap_grace
+        self.log_id = self.load_checkpoint()
+        for subscriber in subscribers:
+            subscriber.bind(db_manager)
+
+    def load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return None
+        with open(self.checkpoint_path, encoding='utf-8') as checkpoint_file:
+            return json.load(checkpoint_file)['log_id']
+
+    def save_checkpoint(self, log_id):
+        directory = os.path.dirname(self.checkpoint_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.checkpoint_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump({'log_id': log_id, 'updated_at': datetime.now().isoformat(timespec='seconds')},
+                      checkpoint_file)
+        os.replace(temp_path, self.checkpoint_path)
+        self.log_id = log_id
+
+    def start_from_latest(self):
+        """Checkpoint at the current end of the log, skipping its history"""
+        self.db_manager.cursor.execute("SELECT COALESCE(MAX(log_id), 0) AS log_id FROM studentorg_log")
+        self.save_checkpoint(self.db_manager.cursor.fetchone()['log_id'])
+        self.db_manager.connection.commit()
+
+    def read_log(self):
+        """The next log entries after the checkpoint, stopping at recent gaps.
+
+        A missing log_id may belong to a transaction that has not committed
+        yet. Entries after such a gap are held back for gap_grace seconds so
+        the late row is not skipped; older gaps are rolled-back inserts.
+        Ages are measured on the database clock that stamped the entries
+        (UTC on SQLite), not on this host's.
+        """
+        cursor = self.db_manager.cursor
+        cursor.execute("SELECT CURRENT_TIMESTAMP AS now")
+        now = cursor.fetchone()['now']
+        if isinstance(now, str):
+            now = datetime.fromisoformat(now)
+        cursor.execute("""SELECT log_id, table_name, record_identifier, change_type, change_timestamp
+                          FROM studentorg_log
+                          WHERE log_id > %s
+                          ORDER BY log_id
+                          LIMIT %s""", (self.log_id or 0, self.batch_size))
+        entries = cursor.fetchall()
+        accepted = []
+        expected = (self.log_id or 0) + 1
+        cutoff = now - timedelta(seconds=self.gap_grace)
+        for entry in entries:
+            if entry['log_id'] != expected and entry['change_timestamp'] and entry['change_timestamp'] > cutoff:
+                break
+            accepted.append(entry)
+            expected = entry['log_id'] + 1
+        return accepted
+
+    def fetch_rows(self, table, keys):
+        """Current rows for a list of keys, as {key: row}"""
+        columns, _ = TABLE_KEYS[table]
+        rows = {}
+        cursor = self.db_manager.cursor
+        for start in range(0, len(keys), self.batch_size):
+            chunk = keys[start:start + self.batch_size]
+            if len(columns) == 1:
+                where = f"t.{columns[0]} IN ({', '.join(['%s'] * len(chunk))})"
+                params = [key[0] for key in chunk]
+            else:
+                tuple_placeholder = f"({', '.join(['%s'] * len(columns))})"
+                key_columns = ', '.join(f"t.{column}" for column in columns)
+                where = f"({key_columns}) IN ({', '.join([tuple_placeholder] * len(chunk))})"
+                params = [value for key in chunk for value in key]
+            cursor.execute(*select_current(table, where, params))
+            for row in cursor.fetchall():
+                rows[tuple(row[column] for column in columns)] = row
+        return rows
+
+    def fetch_range(self, table, first, last):
+        """Current rows whose record_identifier lies in a bulk summary's range"""
+        columns, split = TABLE_KEYS[table]
+        cursor = self.db_manager.cursor
+        if table == 'belongs_to':
+            # The primary key starts with stud_no, so read by stud_no and trim in Python
+            first_key, last_key = split(first), split(last)
+            cursor.execute(*select_current('belongs_to', "t.stud_no BETWEEN %s AND %s",
+                                           (first_key[0], last_key[0])))
+            return {tuple(row[column] for column in columns): row for row in cursor.fetchall()
+                    if first <= belongs_to_key(row['stud_no'], row['org_id'], row['semester'],
+                                               row['acad_year']) <= last}
+        cursor.execute(*select_current(table, f"t.{columns[0]} BETWEEN %s AND %s",
+                                       (split(first)[0], split(last)[0])))
+        return {tuple(row[column] for column in columns): row for row in cursor.fetchall()}
+
+    def build_events(self, entries):
+        """Turn log entries into ChangeEvents with the rows' current values"""
+        changes = OrderedDict()
+        ranges = []
+        for entry in entries:
+            table = entry['table_name']
+            if table not in TABLE_KEYS:
+                continue
+            bulk = parse_bulk_identifier(entry['record_identifier'])
+            if bulk:
+                ranges.append((entry, bulk))
+                continue
+            key = TABLE_KEYS[table][1](entry['record_identifier'])
+            # Only the latest change to a row matters within one batch
+            changes.pop((table, key), None)
+            changes[(table, key)] = entry
+
+        keys_by_table = {}
+        for table, key in changes:
+            keys_by_table.setdefault(table, []).append(key)
+        current = {table: self.fetch_rows(table, keys) for table, keys in keys_by_table.items()}
+
+        events = []
+        for (table, key), entry in changes.items():
+            row = current[table].get(key)
+            events.append(ChangeEvent(entry['log_id'], table, entry['change_type'], key, row))
+        for entry, (first, last, _) in ranges:
+            table = entry['table_name']
+            if entry['change_type'] == 'BULK_DEL':
+                events.append(ChangeEvent(entry['log_id'], table, entry['change_type'], (first, last), None))
+                continue
+            for key, row in self.fetch_range(table, first, last).items():
+                events.append(ChangeEvent(entry['log_id'], table, entry['change_type'], key, row))
+        events.sort(key=lambda event: event.log_id)
+        return events
+
+    def poll(self):
+        """Apply one batch of changes; returns the number of log entries consumed"""
+        if self.log_id is None:
+            self.start_from_latest()
+        entries = self.read_log()
+        if not entries:
+            self.db_manager.connection.commit()
+            return 0
+        events = self.build_events(entries)
+        # End the read snapshot so the next poll sees newly committed changes
+        self.db_manager.connection.commit()
+        for subscriber in self.subscribers:
+            subscriber.apply(events)
+        self.save_checkpoint(entries[-1]['log_id'])
+        return len(entries)
+
+    def run(self, poll_interval=2.0, once=False):
+        """Poll until interrupted (or until caught up when once is True)"""
+        try:
+            while True:
+                consumed = self.poll()
+                if consumed:
+                    print(f"✓ Applied {consumed} log entries (log_id {self.log_id})")
+                elif once:
+                    return
+                if not consumed:
+                    time.sleep(poll_interval)
+        finally:
+            for subscriber in self.subscribers:
+                subscriber.close()
+
+def load_subscriber(spec):
+    """Instantiate a subscriber from 'module:Class'"""
+    module_name, _, class_name = spec.partition(':')
+    return getattr(importlib.import_module(module_name), class_name)()
+
+def main():
+    parser = argparse.ArgumentParser(description="Tail studentorg_log and publish changed rows")
+    parser.add_argument('--checkpoint', required=True, help="checkpoint file for this consumer")
+    parser.add_argument('--export', metavar='PATH', help="append changes to a JSON Lines file")
+    parser.add_argument('--subscriber', action='append', default=[], metavar='MODULE:CLASS',
+                        help="additional subscriber class (repeatable)")
+    parser.add_argument('--from-start', action='store_true', help="replay the whole log on first run")
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--interval', type=float, default=2.0, help="seconds between polls when idle")
+    parser.add_argument('--once', action='store_true', help="stop when caught up")
+    parser.add_argument('--sqlite', metavar='PATH', help="follow a SQLite database instead of MariaDB")
+    args = parser.parse_args()
+
+    subscribers = [load_subscriber(spec) for spec in args.subscriber]
+    if args.export:
+        subscribers.insert(0, JsonLinesExporter(args.export))
+    if not subscribers:
+        parser.error("give --export or at least one --subscriber")
+
+    from backend import open_database
+    with open_database(args.sqlite) as db_manager:
+        feed = ChangeFeed(db_manager, subscribers, args.checkpoint, batch_size=args.batch_size)
+        if feed.log_id is None and args.from_start:
+            feed.save_checkpoint(0)
+        try:
+            feed.run(poll_interval=args.interval, once=args.once)
+        except KeyboardInterrupt:
+            print(f"\nStopped at log_id {feed.log_id}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
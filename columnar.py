@@ -0,0 +1,625 @@
+"""
+In-memory columnar engine for the advanced reports
+
+Loads belongs_to and payment once into array-backed columns and answers
+the AdvancedReports queries from memory; the as-of reports read the row
+versions of belongs_to_history and payment_history, loaded the same way.
+Low-cardinality strings (status, role, committee, acad_year, semester,
+payment_status) and student numbers are dictionary-encoded to small integer
+codes, money is stored as integer cents, dates as ordinals and version
+periods as microsecond instants. Per-organization, per-term and per-student
+row indexes mean a report only touches the rows of its org.
+
+Report methods have the same names, parameters and row shapes as
+AdvancedReports, so REPORTS works for both (for the ten reports the engine
+implements):
+
+    engine = ColumnarEngine.from_database(db_manager)
+    engine.run_report('highest-debt', org_id=1001, acad_year='2024-2025', semester=1)
+
+    python columnar.py                      # time every report, engine vs SQL
+    python columnar.py --snapshot snapshots/2025-06-01
+"""
+
+import argparse
+import time
+from array import array
+from collections import defaultdict
+from datetime import date, datetime
+from decimal import Decimal
+
+from history import as_of_cutoff
+from reports import REPORTS
+
+NULL_CENTS = -2 ** 63
+NULL_DATE = 0
+EXECUTIVE_ROLES = ('President', 'Vice President', 'Secretary', 'Treasurer', 'Auditor')
+
+class Dictionary:
+    """Dictionary encoding of a string column: value <-> small integer code"""
+
+    def __init__(self):
+        self.values = []
+        self.codes = {}
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def code(self, value):
+        """The code of value, or None if it never occurs"""
+        return self.codes.get(value)
+
+    def matching(self, predicate):
+        """Codes of every value satisfying predicate"""
+        return {code for code, value in enumerate(self.values) if value is not None and predicate(value)}
+
+def to_cents(value):
+    return NULL_CENTS if value is None else int(round(Decimal(value) * 100))
+
+def from_cents(cents):
+    return None if cents == NULL_CENTS else Decimal(cents).scaleb(-2)
+
+def to_ordinal(value):
+    if value is None:
+        return NULL_DATE
+    if isinstance(value, str):
+        value = date.fromisoformat(value[:10])
+    return value.toordinal()
+
+def from_ordinal(ordinal):
+    return None if ordinal == NULL_DATE else date.fromordinal(ordinal)
+
+def to_instant(value):
+    """A date or timestamp as microseconds since 0001-01-01, the unit of valid_from/valid_to"""
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if not isinstance(value, datetime):
+        value = datetime.combine(value, datetime.min.time())
+    return ((value.toordinal() * 86400 + value.hour * 3600 + value.minute * 60 + value.second) * 1000000
+            + value.microsecond)
+
+def like(pattern):
+    """Case-insensitive LIKE '%pattern%' (the reports' default collation)"""
+    needle = pattern.lower()
+    return lambda value: needle in value.lower()
+
+def sort_rows(rows, keys):
+    """Sort dict rows by [(column, descending)] with MariaDB NULL ordering (NULLs first ascending)"""
+    for column, descending in reversed(keys):
+        rows.sort(key=lambda row: (row[column] is not None, row[column] if row[column] is not None else 0),
+                  reverse=descending)
+    return rows
+
+class ColumnarEngine:
+    def __init__(self):
+        self.students = Dictionary()
+        self.student_names = []
+        self.student_info = []
+        self.org_names = {}
+
+        # Shared dictionaries for the membership and payment code columns
+        self.semesters = Dictionary()
+        self.acad_years = Dictionary()
+        self.statuses = Dictionary()
+        self.roles = Dictionary()
+        self.committees = Dictionary()
+        self.payment_statuses = Dictionary()
+
+        # belongs_to
+        self.m_student = array('I')
+        self.m_org = array('i')
+        self.m_semester = array('H')
+        self.m_acad_year = array('H')
+        self.m_status = array('H')
+        self.m_role = array('H')
+        self.m_committee = array('H')
+        self.m_batch_year = array('i')
+
+        # payment
+        self.p_student = array('I')
+        self.p_org = array('i')
+        self.p_amount = array('q')
+        self.p_amount_paid = array('q')
+        self.p_status = array('H')
+        self.p_due_date = array('i')
+        self.p_payment_date = array('i')
+
+        self.memberships_by_org = defaultdict(lambda: array('I'))
+        self.memberships_by_term = defaultdict(lambda: array('I'))
+        self.memberships_by_student_org = defaultdict(lambda: array('I'))
+        self.payments_by_org = defaultdict(lambda: array('I'))
+        self.payments_by_student = defaultdict(lambda: array('I'))
+
+        # belongs_to_history: the membership columns the as-of reports read, plus the version period
+        self.mh_student = array('I')
+        self.mh_semester = array('H')
+        self.mh_acad_year = array('H')
+        self.mh_status = array('H')
+        self.mh_role = array('H')
+        self.mh_committee = array('H')
+        self.mh_valid_from = array('q')
+        self.mh_valid_to = array('q')
+
+        # payment_history
+        self.ph_amount = array('q')
+        self.ph_amount_paid = array('q')
+        self.ph_status = array('H')
+        self.ph_due_date = array('i')
+        self.ph_valid_from = array('q')
+        self.ph_valid_to = array('q')
+
+        self.membership_versions_by_org = defaultdict(lambda: array('I'))
+        self.payment_versions_by_org = defaultdict(lambda: array('I'))
+
+        self.loaded_at = None
+        self.log_id = None
+
+    # Loading
+
+    def add_student(self, row):
+        code = self.students.encode(row['stud_no'])
+        if code == len(self.student_names):
+            self.student_names.append(None)
+            self.student_info.append(None)
+        self.student_names[code] = (row['firstname'], row['lastname'])
+        self.student_info[code] = (row['gender'], row['degrprog'])
+
+    def add_organization(self, row):
+        self.org_names[row['org_id']] = row['org_name']
+
+    def add_membership(self, row):
+        index = len(self.m_student)
+        student = self.students.encode(row['stud_no'])
+        org_id = row['org_id']
+        semester = self.semesters.encode(str(row['semester']) if row['semester'] is not None else None)
+        acad_year = self.acad_years.encode(row['acad_year'])
+        self.m_student.append(student)
+        self.m_org.append(org_id)
+        self.m_semester.append(semester)
+        self.m_acad_year.append(acad_year)
+        self.m_status.append(self.statuses.encode(row['status']))
+        self.m_role.append(self.roles.encode(row['role']))
+        self.m_committee.append(self.committees.encode(row['committee']))
+        self.m_batch_year.append(row['batch_year'] if row['batch_year'] is not None else -1)
+        self.memberships_by_org[org_id].append(index)
+        self.memberships_by_term[(org_id, acad_year, semester)].append(index)
+        self.memberships_by_student_org[(student, org_id)].append(index)
+
+    def add_payment(self, row):
+        index = len(self.p_student)
+        student = self.students.encode(row['stud_no'])
+        self.p_student.append(student)
+        self.p_org.append(row['org_id'])
+        self.p_amount.append(to_cents(row['amount']))
+        self.p_amount_paid.append(to_cents(row['amount_paid']))
+        self.p_status.append(self.payment_statuses.encode(row['payment_status']))
+        self.p_due_date.append(to_ordinal(row['due_date']))
+        self.p_payment_date.append(to_ordinal(row['payment_date']))
+        self.payments_by_org[row['org_id']].append(index)
+        self.payments_by_student[student].append(index)
+
+    def add_membership_version(self, row):
+        index = len(self.mh_student)
+        self.mh_student.append(self.students.encode(row['stud_no']))
+        self.mh_semester.append(self.semesters.encode(str(row['semester'])))
+        self.mh_acad_year.append(self.acad_years.encode(row['acad_year']))
+        self.mh_status.append(self.statuses.encode(row['status']))
+        self.mh_role.append(self.roles.encode(row['role']))
+        self.mh_committee.append(self.committees.encode(row['committee']))
+        self.mh_valid_from.append(to_instant(row['valid_from']))
+        self.mh_valid_to.append(to_instant(row['valid_to']))
+        self.membership_versions_by_org[row['org_id']].append(index)
+
+    def add_payment_version(self, row):
+        index = len(self.ph_amount)
+        self.ph_amount.append(to_cents(row['amount']))
+        self.ph_amount_paid.append(to_cents(row['amount_paid']))
+        self.ph_status.append(self.payment_statuses.encode(row['payment_status']))
+        self.ph_due_date.append(to_ordinal(row['due_date']))
+        self.ph_valid_from.append(to_instant(row['valid_from']))
+        self.ph_valid_to.append(to_instant(row['valid_to']))
+        self.payment_versions_by_org[row['org_id']].append(index)
+
+    @classmethod
+    def from_rows(cls, organizations, students, memberships, payments, membership_versions=(),
+                  payment_versions=()):
+        """Build an engine from iterables of row dicts"""
+        engine = cls()
+        for row in organizations:
+            engine.add_organization(row)
+        for row in students:
+            engine.add_student(row)
+        for row in memberships:
+            engine.add_membership(row)
+        for row in payments:
+            engine.add_payment(row)
+        for row in membership_versions:
+            engine.add_membership_version(row)
+        for row in payment_versions:
+            engine.add_payment_version(row)
+        engine.loaded_at = time.time()
+        return engine
+
+    @classmethod
+    def from_database(cls, db_manager, batch_size=10000):
+        """Load the engine from a database with streamed fetchmany reads"""
+        db_manager.cursor.execute("SELECT COALESCE(MAX(log_id), 0) AS log_id FROM studentorg_log")
+        log_id = db_manager.cursor.fetchone()['log_id']
+
+        def stream(query):
+            cursor = db_manager.connection.cursor(dictionary=True)
+            try:
+                cursor.execute(query)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    yield from rows
+            finally:
+                cursor.close()
+
+        engine = cls.from_rows(
+            stream("SELECT org_id, org_name FROM organization"),
+            stream("SELECT stud_no, firstname, lastname, gender, degrprog FROM student"),
+            stream("""SELECT stud_no, org_id, semester, acad_year, status, role, committee, batch_year
+                      FROM belongs_to_all"""),
+            stream("""SELECT stud_no, org_id, amount, amount_paid, payment_status, due_date, payment_date
+                      FROM payment_all"""),
+            stream("""SELECT stud_no, org_id, semester, acad_year, status, role, committee, valid_from, valid_to
+                      FROM belongs_to_history"""),
+            stream("""SELECT org_id, amount, amount_paid, payment_status, due_date, valid_from, valid_to
+                      FROM payment_history"""),
+        )
+        engine.log_id = log_id
+        return engine
+
+    @classmethod
+    def from_snapshot(cls, directory):
+        """Load the engine from a Parquet snapshot written by snapshot.py"""
+        from snapshot import load_table
+
+        def stream(table, columns):
+            for batch in load_table(directory, table, columns=columns).to_batches():
+                yield from batch.to_pylist()
+
+        return cls.from_rows(
+            stream('organization', ['org_id', 'org_name']),
+            stream('student', ['stud_no', 'firstname', 'lastname', 'gender', 'degrprog']),
+            stream('belongs_to', ['stud_no', 'org_id', 'semester', 'acad_year', 'status', 'role', 'committee',
+                                  'batch_year']),
+            stream('payment', ['stud_no', 'org_id', 'amount', 'amount_paid', 'payment_status', 'due_date',
+                               'payment_date']),
+            stream('belongs_to_history', ['stud_no', 'org_id', 'semester', 'acad_year', 'status', 'role',
+                                          'committee', 'valid_from', 'valid_to']),
+            stream('payment_history', ['org_id', 'amount', 'amount_paid', 'payment_status', 'due_date',
+                                       'valid_from', 'valid_to']),
+        )
+
+    # Helpers
+
+    def run_report(self, name, **params):
+        """Run a report from REPORTS by name with keyword parameters"""
+        method, _ = REPORTS[name]
+        return getattr(self, method)(**params)
+
+    def full_name(self, student):
+        firstname, lastname = self.student_names[student]
+        return f"{firstname} {lastname}"
+
+    def term_rows(self, org_id, acad_year, semester):
+        """Membership row ids of an organization in one term"""
+        acad_year_code = self.acad_years.code(acad_year)
+        semester_code = self.semesters.code(str(semester))
+        if acad_year_code is None or semester_code is None:
+            return array('I')
+        return self.memberships_by_term.get((org_id, acad_year_code, semester_code), array('I'))
+
+    def term_members(self, org_id, acad_year, semester):
+        """{student code: membership row id} for an organization in one term"""
+        return {self.m_student[index]: index for index in self.term_rows(org_id, acad_year, semester)}
+
+    def membership_row(self, index, *columns):
+        values = {
+            'semester': self.semesters.values[self.m_semester[index]],
+            'acad_year': self.acad_years.values[self.m_acad_year[index]],
+            'status': self.statuses.values[self.m_status[index]],
+            'role': self.roles.values[self.m_role[index]],
+            'committee': self.committees.values[self.m_committee[index]],
+            'batch_year': self.m_batch_year[index] if self.m_batch_year[index] != -1 else None,
+        }
+        return {column: values[column] for column in columns}
+
+    def payment_row(self, index, today_ordinal):
+        due_date = self.p_due_date[index]
+        return {
+            'amount': from_cents(self.p_amount[index]),
+            'amount_paid': from_cents(self.p_amount_paid[index]),
+            'payment_status': self.payment_statuses.values[self.p_status[index]],
+            'due_date': from_ordinal(due_date),
+            'days_overdue': today_ordinal - due_date if due_date != NULL_DATE else None,
+        }
+
+    # Reports
+
+    def members_by_criteria(self, org_id, role=None, status=None, gender=None, degrprog=None, batch_year=None):
+        """Members of an organization, optionally filtered by role, status, gender, degree program and batch"""
+        roles = self.roles.matching(like(role)) if role else None
+        statuses = self.statuses.matching(like(status)) if status else None
+        gender = gender.upper() if gender else None
+        rows = []
+        for index in self.memberships_by_org.get(org_id, ()):
+            if roles is not None and self.m_role[index] not in roles:
+                continue
+            if statuses is not None and self.m_status[index] not in statuses:
+                continue
+            if batch_year and self.m_batch_year[index] != int(batch_year):
+                continue
+            student = self.m_student[index]
+            student_gender, student_degrprog = self.student_info[student]
+            if gender and student_gender != gender:
+                continue
+            if degrprog and (student_degrprog is None or degrprog.lower() not in student_degrprog.lower()):
+                continue
+            firstname, lastname = self.student_names[student]
+            rows.append({
+                'stud_no': self.students.values[student],
+                'firstname': firstname,
+                'lastname': lastname,
+                'gender': student_gender,
+                'degrprog': student_degrprog,
+                **self.membership_row(index, 'role', 'status', 'committee', 'batch_year', 'semester'),
+            })
+        return sort_rows(rows, [('batch_year', True), ('semester', True), ('role', False), ('lastname', False),
+                                ('firstname', False)])
+
+    def unpaid_fees_by_semester(self, org_id, acad_year, semester):
+        """Members with unpaid fees in an organization for a semester"""
+        members = self.term_members(org_id, acad_year, semester)
+        unpaid = self.payment_statuses.code('Unpaid')
+        today = date.today().toordinal()
+        rows = []
+        for index in self.payments_by_org.get(org_id, ()):
+            student = self.p_student[index]
+            if self.p_status[index] != unpaid or student not in members:
+                continue
+            payment = self.payment_row(index, today)
+            rows.append({
+                'stud_no': self.students.values[student],
+                'name': self.full_name(student),
+                'payment_status': payment['payment_status'],
+                'amount': payment['amount'],
+                'amount_paid': payment['amount_paid'],
+                'due_date': payment['due_date'],
+                'days_overdue': payment['days_overdue'],
+                **self.membership_row(members[student], 'semester', 'acad_year'),
+                'org_name': self.org_names.get(org_id),
+            })
+        return sort_rows(rows, [('days_overdue', True), ('due_date', False)])
+
+    def member_unpaid_fees(self, stud_no):
+        """A member's unpaid fees across all organizations"""
+        student = self.students.code(stud_no)
+        if student is None:
+            return []
+        unpaid = self.payment_statuses.code('Unpaid')
+        today = date.today().toordinal()
+        rows = []
+        for index in self.payments_by_student.get(student, ()):
+            if self.p_status[index] != unpaid:
+                continue
+            org_id = self.p_org[index]
+            payment = self.payment_row(index, today)
+            for membership in self.memberships_by_student_org.get((student, org_id), ()):
+                rows.append({
+                    'stud_no': stud_no,
+                    'name': self.full_name(student),
+                    'org_name': self.org_names.get(org_id),
+                    'amount': payment['amount'],
+                    'amount_paid': payment['amount_paid'],
+                    'payment_status': payment['payment_status'],
+                    'due_date': payment['due_date'],
+                    'days_overdue': payment['days_overdue'],
+                    **self.membership_row(membership, 'acad_year', 'semester'),
+                })
+        return sort_rows(rows, [('due_date', False)])
+
+    def executive_committee(self, org_id, acad_year):
+        """Executive committee members of an organization for an academic year"""
+        acad_year_code = self.acad_years.code(acad_year)
+        ranks = {self.roles.code(role): rank for rank, role in enumerate(EXECUTIVE_ROLES, 1)
+                 if self.roles.code(role) is not None}
+        rows = []
+        for index in self.memberships_by_org.get(org_id, ()):
+            if self.m_acad_year[index] != acad_year_code or self.m_role[index] not in ranks:
+                continue
+            student = self.m_student[index]
+            rows.append((ranks[self.m_role[index]], {
+                'stud_no': self.students.values[student],
+                'name': self.full_name(student),
+                **self.membership_row(index, 'role', 'committee', 'semester', 'acad_year'),
+                'org_name': self.org_names.get(org_id),
+            }))
+        rows.sort(key=lambda item: (item[0], item[1]['semester']))
+        return [row for _, row in rows]
+
+    def role_history(self, org_id, role):
+        """Everyone who held a role in an organization, most recent first"""
+        roles = self.roles.matching(like(role))
+        rows = []
+        for index in self.memberships_by_org.get(org_id, ()):
+            if self.m_role[index] not in roles:
+                continue
+            student = self.m_student[index]
+            rows.append({
+                'stud_no': self.students.values[student],
+                'name': self.full_name(student),
+                **self.membership_row(index, 'role', 'acad_year', 'semester', 'committee'),
+                'org_name': self.org_names.get(org_id),
+            })
+        return sort_rows(rows, [('acad_year', True), ('semester', True)])
+
+    def late_payments(self, org_id, acad_year, semester):
+        """Late partial payments in an organization for a semester"""
+        members = self.term_members(org_id, acad_year, semester)
+        partial = self.payment_statuses.code('Partial')
+        rows = []
+        for index in self.payments_by_org.get(org_id, ()):
+            student = self.p_student[index]
+            due_date, payment_date = self.p_due_date[index], self.p_payment_date[index]
+            if (self.p_status[index] != partial or student not in members
+                    or payment_date == NULL_DATE or payment_date <= due_date):
+                continue
+            amount, amount_paid = self.p_amount[index], self.p_amount_paid[index]
+            membership = self.membership_row(members[student], 'acad_year', 'semester')
+            rows.append({
+                'stud_no': self.students.values[student],
+                'name': self.full_name(student),
+                'late_payment': from_cents(amount - (0 if amount_paid == NULL_CENTS else amount_paid))
+                                if amount != NULL_CENTS else None,
+                'ay_sem': f"{membership['acad_year']} - {membership['semester']}",
+                'due_date': from_ordinal(due_date),
+                'payment_date': from_ordinal(payment_date),
+                'days_late': payment_date - due_date,
+                'org_name': self.org_names.get(org_id),
+            })
+        return sort_rows(rows, [('days_late', True), ('payment_date', True)])
+
+    def active_inactive_percentage(self, org_id, n_semesters):
+        """Active and inactive member counts for the last n semesters"""
+        active = self.statuses.code('Active')
+        inactive = {self.statuses.code(status) for status in ('Inactive', 'Alumni')} - {None}
+        terms = defaultdict(lambda: [0, 0, 0])
+        for index in self.memberships_by_org.get(org_id, ()):
+            counts = terms[(self.m_acad_year[index], self.m_semester[index])]
+            counts[0] += 1
+            counts[1] += self.m_status[index] == active
+            counts[2] += self.m_status[index] in inactive
+        rows = [{
+            'acad_year': self.acad_years.values[acad_year],
+            'semester': self.semesters.values[semester],
+            'total_members': total,
+            'active_members': active_members,
+            'inactive_members': inactive_members,
+        } for (acad_year, semester), (total, active_members, inactive_members) in terms.items()]
+        return sort_rows(rows, [('acad_year', True), ('semester', True)])[:n_semesters]
+
+    def alumni_members(self, org_id, as_of_date):
+        """Alumni members of an organization as recorded at the end of a date (belongs_to_history)"""
+        cutoff = to_instant(as_of_cutoff(as_of_date))
+        alumni = self.statuses.code('Alumni')
+        rows = []
+        for index in self.membership_versions_by_org.get(org_id, ()):
+            if (self.mh_status[index] != alumni
+                    or not self.mh_valid_from[index] < cutoff <= self.mh_valid_to[index]):
+                continue
+            student = self.mh_student[index]
+            role, committee, semester = (self.roles.values[self.mh_role[index]],
+                                         self.committees.values[self.mh_committee[index]],
+                                         self.semesters.values[self.mh_semester[index]])
+            rows.append({
+                'stud_no': self.students.values[student],
+                'name': self.full_name(student),
+                'alumni_record': None if None in (role, committee) else f"{role}, {committee}, {semester} sem",
+                'org_name': self.org_names.get(org_id),
+                'acad_year': self.acad_years.values[self.mh_acad_year[index]],
+                'semester': semester,
+            })
+        sort_rows(rows, [('acad_year', True), ('semester', True)])
+        for row in rows:
+            del row['acad_year'], row['semester']
+        return rows
+
+    def fees_summary_by_date(self, org_id, as_of_date):
+        """Paid and unpaid fee totals per due date as recorded at the end of a date (payment_history)"""
+        cutoff = to_instant(as_of_cutoff(as_of_date))
+        paid = self.payment_statuses.code('Paid')
+        unpaid = self.payment_statuses.code('Unpaid')
+        totals = defaultdict(lambda: [0, 0])
+        for index in self.payment_versions_by_org.get(org_id, ()):
+            if not self.ph_valid_from[index] < cutoff <= self.ph_valid_to[index]:
+                continue
+            day = totals[self.ph_due_date[index]]
+            if self.ph_status[index] == paid and self.ph_amount_paid[index] != NULL_CENTS:
+                day[0] += self.ph_amount_paid[index]
+            elif self.ph_status[index] == unpaid and self.ph_amount[index] != NULL_CENTS:
+                day[1] += self.ph_amount[index]
+        return [{
+            'org_name': self.org_names.get(org_id),
+            'due_date': from_ordinal(due_date),
+            'total_paid': from_cents(total_paid),
+            'total_unpaid': from_cents(total_unpaid),
+        } for due_date, (total_paid, total_unpaid) in sorted(totals.items())]
+
+    def highest_debt(self, org_id, acad_year, semester):
+        """Members ordered by total debt for a semester"""
+        members = self.term_members(org_id, acad_year, semester)
+        paid = self.payment_statuses.code('Paid')
+        debts = defaultdict(int)
+        for index in self.payments_by_org.get(org_id, ()):
+            student = self.p_student[index]
+            status = self.p_status[index]
+            if student not in members or status == paid or self.payment_statuses.values[status] is None:
+                continue
+            amount, amount_paid = self.p_amount[index], self.p_amount_paid[index]
+            if amount != NULL_CENTS:
+                debts[student] += amount - (0 if amount_paid == NULL_CENTS else amount_paid)
+        rows = [{
+            'stud_no': self.students.values[student],
+            'name': self.full_name(student),
+            **self.membership_row(members[student], 'acad_year', 'semester'),
+            'total_debt': from_cents(debt),
+            'org_name': self.org_names.get(org_id),
+        } for student, debt in debts.items()]
+        return sort_rows(rows, [('total_debt', True)])
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the advanced reports on the columnar engine vs SQL")
+    parser.add_argument('--snapshot', help="load the engine from a Parquet snapshot instead of the database")
+    parser.add_argument('--sqlite', metavar='PATH', help="use a SQLite snapshot instead of MariaDB")
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    from tabulate import tabulate
+    from backend import open_database
+    from benchmark import percentile, sample_params
+    from reports import AdvancedReports
+
+    with open_database(args.sqlite) as db_manager:
+        start = time.perf_counter()
+        if args.snapshot:
+            engine = ColumnarEngine.from_snapshot(args.snapshot)
+        else:
+            engine = ColumnarEngine.from_database(db_manager)
+        print(f"✓ Loaded {len(engine.m_student)} memberships and {len(engine.p_student)} payments "
+              f"({len(engine.mh_student)} and {len(engine.ph_amount)} versions) "
+              f"in {time.perf_counter() - start:.2f}s")
+
+        params = sample_params(db_manager)
+        reports = AdvancedReports(db_manager)
+        results = []
+        for name, (method, spec) in REPORTS.items():
+            if not hasattr(engine, method):
+                continue
+            kwargs = {param: params[param] for param, _, _ in spec if param in params}
+            timings = {}
+            counts = {}
+            for label, target in (('sql', reports), ('engine', engine)):
+                latencies = []
+                for _ in range(args.iterations):
+                    start = time.perf_counter()
+                    rows = getattr(target, method)(**kwargs)
+                    latencies.append(time.perf_counter() - start)
+                timings[label] = percentile(latencies, 0.50) * 1000
+                counts[label] = len(rows)
+            results.append([name, counts['sql'], counts['engine'], f"{timings['sql']:.3f}",
+                            f"{timings['engine']:.3f}", '✓' if counts['sql'] == counts['engine'] else '✗'])
+
+    print(tabulate(results, headers=["Report", "SQL rows", "Engine rows", "SQL p50 ms", "Engine p50 ms", "Match"],
+                   tablefmt="grid"))
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,8 @@
 Database management module for the Organization Management System
 """
 
+from collections import namedtuple
+from functools import lru_cache
 from types import TracebackType
 from mysql.connector import connect
 from mysql.connector.connection import MySQLConnection
@@ -44,3 +46,124 @@ class DatabaseManager:
         if exc_type is not None:
             print(f"An error occurred: {exc_value}")
         return False
+
+DEFAULT_BATCH_SIZE = 1000
+
+@lru_cache(maxsize=256)
+def record_type(columns):
+    """A tuple class for rows with these column names.
+
+    Records take the memory of a tuple (no per-row dict or key strings) but
+    still read like the dictionary cursor's rows: row['org_name'],
+    row.org_name and row[0] all work. Unnamed columns are renamed _0, _1...
+    """
+    base = namedtuple('Record', columns, rename=True)
+
+    class Record(base):
+        __slots__ = ()
+
+        def __getitem__(self, key):
+            if isinstance(key, str):
+                return getattr(self, key)
+            return tuple.__getitem__(self, key)
+
+        def get(self, key, default=None):
+            return getattr(self, key, default)
+
+        def keys(self):
+            return self._fields
+
+    return Record
+
+def column_names(cursor):
+    return tuple(column[0] for column in cursor.description)
+
+def _fetch_batches(cursor, batch_size, compact):
+    make = record_type(column_names(cursor))._make if compact else None
+    while True:
+        rows = cursor.fetchmany(batch_size)
+        if not rows:
+            break
+        if make:
+            yield from map(make, rows)
+        else:
+            yield from rows
+
+def iter_rows(db_manager, query, params=(), batch_size=DEFAULT_BATCH_SIZE, unbuffered=True, compact=False):
+    """Yield the rows of a query, fetching batch_size rows at a time.
+
+    Rows are read through a dedicated cursor, so peak memory is bounded by
+    batch_size instead of the result size. With unbuffered=True the server
+    streams the result as it is fetched; the connection cannot run other
+    statements until the generator is exhausted or closed. Rows are dicts,
+    or records from record_type() when compact is True.
+    """
+    cursor = db_manager.connection.cursor(dictionary=not compact, buffered=not unbuffered)
+    try:
+        cursor.execute(query, params)
+        yield from _fetch_batches(cursor, batch_size, compact)
+    finally:
+        cursor.close()
+
+def iter_procedure(db_manager, procedure, args=(), batch_size=DEFAULT_BATCH_SIZE, unbuffered=True, compact=False):
+    """Yield the first result set of a stored procedure in batches.
+
+    callproc() buffers every result set client-side, so the procedure is
+    run with a plain CALL instead and its first result set is fetched
+    batch_size rows at a time. Backends without CALL support (the SQLite
+    backend) fall back to callproc().
+
+    A CALL always ends with an OK packet after its result sets, which the
+    connector only reads while the multi-statement iterator is advanced.
+    The iterator is therefore drained before the cursor is closed, also when
+    the caller stops early, so the next statement on the connection does
+    not read that packet as its own reply.
+    """
+    cursor = db_manager.connection.cursor(dictionary=not compact, buffered=not unbuffered)
+    results = result = None
+    try:
+        if getattr(db_manager.connection, 'emulates_procedures', False):
+            cursor.callproc(procedure, args)
+            result = next(cursor.stored_results())
+        else:
+            placeholders = ', '.join(['%s'] * len(args))
+            results = cursor.execute(f"CALL {procedure}({placeholders})", args, multi=True)
+            result = next((result for result in results if result.with_rows), None)
+        if result is not None:
+            yield from _fetch_batches(result, batch_size, compact)
+    finally:
+        if results is not None:
+            if result is not None:
+                # Rows a caller left unread block the iterator from moving on
+                while result.fetchmany(batch_size):
+                    pass
+            for _ in results:
+                pass
+        cursor.close()
+
+def batched(rows, size=DEFAULT_BATCH_SIZE):
+    """Group an iterable of rows into lists of at most size rows"""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def fetch_rows(db_manager, query, params=(), stream=False, batch_size=DEFAULT_BATCH_SIZE, compact=False):
+    """A query's rows: a list from the shared cursor, or a batched generator when stream is True"""
+    if stream or compact:
+        rows = iter_rows(db_manager, query, params, batch_size=batch_size, compact=compact)
+        return rows if stream else list(rows)
+    db_manager.cursor.execute(query, params)
+    return db_manager.cursor.fetchall()
+
+def fetch_procedure(db_manager, procedure, args=(), stream=False, batch_size=DEFAULT_BATCH_SIZE, compact=False):
+    """A stored procedure's first result set, as a list or a batched generator"""
+    if stream or compact:
+        rows = iter_procedure(db_manager, procedure, args, batch_size=batch_size, compact=compact)
+        return rows if stream else list(rows)
+    db_manager.cursor.callproc(procedure, args)
+    return next(db_manager.cursor.stored_results()).fetchall()
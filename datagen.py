@@ -0,0 +1,275 @@
+"""
+Synthetic data generator for the Student Organization Management System
+
+Produces a deterministic dataset of students, organizations, multi-term
+belongs_to histories and payments, and bulk-loads it into the local
+database. The same seed and scale always produce the same rows, so the
+dataset can be shared as the fixture for performance work:
+
+    python datagen.py --scale small --reset
+    python datagen.py --students 200000 --orgs 500 --payments 5000000 --seed 127 --reset
+"""
+
+import argparse
+import random
+import time
+from datetime import date, timedelta
+
+from audit import BulkAudit
+from history import seed_history
+from term_summary import refresh_all
+
+SCALES = {
+    'tiny': {'students': 200, 'orgs': 5, 'payments': 2000},
+    'small': {'students': 2000, 'orgs': 20, 'payments': 50000},
+    'medium': {'students': 20000, 'orgs': 100, 'payments': 500000},
+    'large': {'students': 200000, 'orgs': 500, 'payments': 5000000},
+}
+
+FIRST_NAMES = ['Juan', 'Maria', 'Jose', 'Ana', 'Mark', 'Angelica', 'Jerome', 'Emman', 'Paolo', 'Bea',
+               'Carlo', 'Denise', 'Enzo', 'Faith', 'Gab', 'Hannah', 'Ivan', 'Joy', 'Kyle', 'Lara',
+               'Miguel', 'Nina', 'Oscar', 'Patricia', 'Rafael', 'Sofia', 'Tomas', 'Trisha', 'Vince', 'Ysa']
+LAST_NAMES = ['Santos', 'Reyes', 'Cruz', 'Bautista', 'Ocampo', 'Garcia', 'Mendoza', 'Torres', 'Tomas',
+              'Andrada', 'Castillo', 'Flores', 'Villanueva', 'Ramos', 'Aquino', 'Navarro', 'Dela Cruz',
+              'Gonzales', 'Lopez', 'Marquez', 'Pascual', 'Salazar', 'Soriano', 'Valdez', 'Yap']
+DEGREE_PROGRAMS = [('BSCS', 30), ('BSStat', 10), ('BSMath', 8), ('BSBio', 15), ('BSChem', 8),
+                   ('BSAgri', 12), ('BSEE', 9), ('BACA', 8)]
+ORG_PREFIXES = ['Young', 'United', 'Society of', 'Circle of', 'League of', 'Alliance of', 'Guild of']
+ORG_SUBJECTS = ['Computer Scientists', 'Statisticians', 'Biologists', 'Chemists', 'Writers',
+                'Engineers', 'Mathematicians', 'Artists', 'Debaters', 'Musicians', 'Agriculturists']
+OFFICER_ROLES = ['President', 'Vice President', 'Secretary', 'Treasurer', 'Auditor']
+COMMITTEES = ['Executive', 'Membership', 'Finance', 'Publicity', 'Academics', 'Logistics', 'Events']
+FEE_AMOUNTS = [50, 100, 150, 200, 250, 300, 500]
+
+# (number of organizations joined, weight)
+ORGS_PER_STUDENT = [(0, 20), (1, 45), (2, 25), (3, 10)]
+# (payment_status, weight)
+PAYMENT_STATUSES = [('Paid', 60), ('Partial', 15), ('Unpaid', 22), ('Not Paid', 3)]
+
+class DatasetGenerator:
+    """Deterministic generator of SOMS rows.
+
+    Every student gets its own random stream derived from the seed, so the
+    memberships and payments of a student do not depend on batch sizes or on
+    how many rows were generated before it.
+    """
+
+    def __init__(self, students, orgs, payments, seed=127, first_year=2018, years=7):
+        self.students = students
+        self.orgs = orgs
+        self.payments = payments
+        self.seed = seed
+        self.first_year = first_year
+        self.years = years
+        self.batches = list(range(first_year - 3, first_year + years))
+        if students / len(self.batches) >= 100000:
+            raise ValueError("Too many students for 5-digit student numbers per batch")
+        self.org_ids = [1001 + index for index in range(orgs)]
+        # Popular organizations attract more members (Zipf-like)
+        self.org_weights = [1 / (rank + 1) ** 0.8 for rank in range(orgs)]
+        self._payment_rate = None
+
+    def _rng(self, *parts):
+        return random.Random(":".join(str(part) for part in (self.seed, *parts)))
+
+    def stud_no(self, index):
+        batch = self.batches[index % len(self.batches)]
+        return f"{batch}-{index // len(self.batches) + 1:05d}", batch
+
+    def organization_rows(self):
+        rng = self._rng('organizations')
+        for org_id in self.org_ids:
+            name = f"{rng.choice(ORG_PREFIXES)} {rng.choice(ORG_SUBJECTS)} {org_id}"
+            established = date(rng.randint(1960, self.first_year), rng.randint(1, 12), rng.randint(1, 28))
+            yield (org_id, name[:50], established)
+
+    def student_rows(self):
+        programs, weights = zip(*DEGREE_PROGRAMS)
+        for index in range(self.students):
+            rng = self._rng('student', index)
+            stud_no, batch = self.stud_no(index)
+            birthday = date(batch - 18, rng.randint(1, 12), rng.randint(1, 28))
+            yield (stud_no, rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES),
+                   rng.choices(programs, weights)[0], batch, rng.choice('MF'), birthday)
+
+    def _memberships(self, index):
+        """Yield (org_id, semester, acad_year, status, role, committee, batch_year) for one student"""
+        rng = self._rng('memberships', index)
+        _, batch = self.stud_no(index)
+        counts, count_weights = zip(*ORGS_PER_STUDENT)
+        joined = set()
+        for _ in range(rng.choices(counts, count_weights)[0]):
+            joined.add(rng.choices(self.org_ids, self.org_weights)[0])
+
+        last_year = self.first_year + self.years - 1
+        for org_id in sorted(joined):
+            join_year = batch + rng.choice([0, 0, 1, 1, 2])
+            leave_year = min(batch + 4, last_year + 1)
+            role = 'Member'
+            committee = rng.choice(COMMITTEES[1:])
+            for year in range(max(join_year, self.first_year), last_year + 1):
+                for semester in ('1', '2'):
+                    if year >= leave_year:
+                        status = 'Alumni'
+                    else:
+                        status = 'Active' if rng.random() < 0.85 else 'Inactive'
+                    if status == 'Active' and rng.random() < 0.05:
+                        role, committee = rng.choice(OFFICER_ROLES), 'Executive'
+                    elif role != 'Member' and rng.random() < 0.5:
+                        role, committee = 'Member', rng.choice(COMMITTEES[1:])
+                    yield (org_id, semester, f"{year}-{year + 1}", status, role, committee, join_year)
+                if year >= leave_year and rng.random() < 0.5:
+                    break
+
+    def membership_rows(self):
+        for index in range(self.students):
+            stud_no, _ = self.stud_no(index)
+            for membership in self._memberships(index):
+                yield (stud_no, *membership)
+
+    @property
+    def payment_rate(self):
+        """Mean number of fees per membership term needed to reach the payment target"""
+        if self._payment_rate is None:
+            terms = sum(1 for row in self.membership_rows() if row[4] != 'Alumni')
+            self._payment_rate = self.payments / terms if terms else 0
+        return self._payment_rate
+
+    def payment_rows(self):
+        statuses, status_weights = zip(*PAYMENT_STATUSES)
+        rate = self.payment_rate
+        for index in range(self.students):
+            rng = self._rng('payments', index)
+            stud_no, _ = self.stud_no(index)
+            for org_id, semester, acad_year, status, *_ in self._memberships(index):
+                if status == 'Alumni':
+                    continue
+                fees = int(rate) + (1 if rng.random() < rate - int(rate) else 0)
+                start_year = int(acad_year[:4])
+                term_start = date(start_year, 8, 15) if semester == '1' else date(start_year + 1, 1, 15)
+                for _ in range(fees):
+                    amount = rng.choice(FEE_AMOUNTS)
+                    due_date = term_start + timedelta(days=rng.randint(14, 120))
+                    payment_status = rng.choices(statuses, status_weights)[0]
+                    if payment_status == 'Paid':
+                        amount_paid = amount
+                    elif payment_status == 'Partial':
+                        amount_paid = round(amount * rng.choice([0.25, 0.5, 0.75]), 2)
+                    else:
+                        amount_paid = 0
+                    payment_date = None
+                    if amount_paid:
+                        payment_date = due_date + timedelta(days=rng.randint(-30, 45))
+                    yield (amount_paid, payment_date, payment_status, amount, due_date, org_id, stud_no)
+
+TABLES = {
+    'organization': ('org_id', 'org_name', 'year_established'),
+    'student': ('stud_no', 'firstname', 'lastname', 'degrprog', 'batch', 'gender', 'birthday'),
+    'belongs_to': ('stud_no', 'org_id', 'semester', 'acad_year', 'status', 'role', 'committee', 'batch_year'),
+    'payment': ('amount_paid', 'payment_date', 'payment_status', 'amount', 'due_date', 'org_id', 'stud_no'),
+}
+
+def bulk_insert(db_manager, table, rows, batch_size=5000, audit_key=None):
+    """Insert rows into table with batched multi-row INSERTs.
+
+    Per-row audit triggers are suppressed and one summary log row is written
+    per batch; audit_key maps a row to its record identifier (payment rows
+    use their auto-increment range). Returns the number of rows inserted.
+    """
+    columns = TABLES[table]
+    placeholder = f"({', '.join(['%s'] * len(columns))})"
+    cursor = db_manager.cursor
+    total = 0
+
+    def flush(batch, audit):
+        cursor.execute(f"INSERT INTO {table} ({', '.join(columns)}) VALUES {', '.join([placeholder] * len(batch))}",
+                       [value for row in batch for value in row])
+        if audit_key is None:
+            first_id = cursor.lastrowid
+            audit.record('INSERT', first_id, first_id + len(batch) - 1, len(batch))
+        else:
+            audit.record_keys('INSERT', [audit_key(row) for row in batch])
+        db_manager.connection.commit()
+
+    with BulkAudit(db_manager, table) as audit:
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush(batch, audit)
+                total += len(batch)
+                batch = []
+        if batch:
+            flush(batch, audit)
+            total += len(batch)
+    return total
+
+def load_dataset(db_manager, generator, batch_size=5000, reset=False, progress=print):
+    """Bulk-load a generated dataset and return {table: rows inserted}"""
+    cursor = db_manager.cursor
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    cursor.execute("SET UNIQUE_CHECKS = 0")
+    # The generated rows get backdated history once loaded, not a version per row at load time
+    cursor.execute("SET @soms_skip_history = 1")
+    try:
+        if reset:
+            for table in ('payment', 'belongs_to', 'student', 'organization', 'studentorg_log',
+                          'payment_history', 'belongs_to_history', 'payment_archive', 'belongs_to_archive'):
+                cursor.execute(f"TRUNCATE TABLE {table}")
+
+        counts = {}
+        for table, rows, key in (
+            ('organization', generator.organization_rows(), lambda row: row[0]),
+            ('student', generator.student_rows(), lambda row: row[0]),
+            ('belongs_to', generator.membership_rows(), lambda row: f"{row[0]}-{row[1]}-{row[2]}-{row[3]}"),
+            ('payment', generator.payment_rows(), None),
+        ):
+            start = time.perf_counter()
+            counts[table] = bulk_insert(db_manager, table, rows, batch_size=batch_size, audit_key=key)
+            elapsed = time.perf_counter() - start
+            rate = counts[table] / elapsed if elapsed > 0 else 0
+            progress(f"✓ {table}: {counts[table]} rows in {elapsed:.1f}s ({rate:.0f} rows/sec)")
+
+        progress(f"✓ term_membership_summary: {refresh_all(db_manager)} organization terms")
+        versions = seed_history(db_manager, backdate=True)
+        progress(f"✓ history: {versions['payment']} payment and {versions['belongs_to']} membership versions")
+        return counts
+    finally:
+        cursor.execute("SET @soms_skip_history = NULL")
+        cursor.execute("SET UNIQUE_CHECKS = 1")
+        cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate and load a synthetic SOMS dataset")
+    parser.add_argument('--scale', choices=sorted(SCALES), default='small')
+    parser.add_argument('--students', type=int)
+    parser.add_argument('--orgs', type=int)
+    parser.add_argument('--payments', type=int)
+    parser.add_argument('--seed', type=int, default=127)
+    parser.add_argument('--first-year', type=int, default=2018, help="first academic year with memberships")
+    parser.add_argument('--years', type=int, default=7, help="number of academic years")
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--reset', action='store_true', help="truncate existing data first")
+    parser.add_argument('--dry-run', action='store_true', help="count rows without loading")
+    args = parser.parse_args()
+
+    scale = dict(SCALES[args.scale])
+    for key in ('students', 'orgs', 'payments'):
+        if getattr(args, key) is not None:
+            scale[key] = getattr(args, key)
+    generator = DatasetGenerator(seed=args.seed, first_year=args.first_year, years=args.years, **scale)
+
+    if args.dry_run:
+        print(f"Organizations: {generator.orgs}")
+        print(f"Students: {generator.students}")
+        print(f"Memberships: {sum(1 for _ in generator.membership_rows())}")
+        print(f"Payments: {sum(1 for _ in generator.payment_rows())}")
+        return
+
+    from main import DatabaseManager
+    with DatabaseManager() as db_manager:
+        counts = load_dataset(db_manager, generator, batch_size=args.batch_size, reset=args.reset)
+    print(f"✓ Loaded {sum(counts.values())} rows (seed {args.seed})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,301 @@
+"""
+Database drivers for the Student Organization Management System
+
+The managers and reports are written against mysql.connector's
+connection/cursor API. Three drivers provide it:
+
+    mysql      mysql-connector-python on its pure-Python protocol
+    mysql-c    mysql-connector-python on its C extension
+    mariadb    MariaDB Connector/Python (C), adapted to the mysql.connector API
+
+The driver is chosen with the SOMS_DB_DRIVER environment variable
+(main.DB_DRIVER, default mysql). Every configured driver can be checked
+for identical report results and compared on row decode throughput:
+
+    SOMS_DB_DRIVER=mariadb python main.py
+    python drivers.py parity --drivers mysql,mysql-c,mariadb
+    python drivers.py bench --rows 100000
+"""
+
+import argparse
+import sys
+import time
+
+from mysql.connector import errors
+
+DRIVERS = ('mysql', 'mysql-c', 'mariadb')
+DEFAULT_DRIVER = 'mysql'
+
+def require_mariadb():
+    """Import the MariaDB connector, explaining how to install it when missing"""
+    try:
+        import mariadb
+    except ImportError:
+        raise SystemExit("✗ The mariadb driver needs MariaDB Connector/Python: pip install mariadb")
+    return mariadb
+
+def connect(driver=DEFAULT_DRIVER, **config):
+    """Open a connection with the mysql.connector API through the given driver"""
+    if driver not in DRIVERS:
+        raise SystemExit(f"✗ Unknown database driver {driver!r}; choose one of {', '.join(DRIVERS)}")
+    if driver == 'mariadb':
+        return MariaDBConnection(**config)
+    import mysql.connector
+    if driver == 'mysql-c' and not mysql.connector.HAVE_CEXT:
+        raise SystemExit("✗ The mysql-c driver needs the C extension of mysql-connector-python "
+                         "(pip install mysql-connector-python on a platform with binary wheels)")
+    return mysql.connector.connect(use_pure=(driver == 'mysql'), **config)
+
+def translate_error(error):
+    """A mariadb error as the mysql.connector error the app handles"""
+    mariadb = require_mariadb()
+    options = {'msg': str(error), 'errno': getattr(error, 'errno', None),
+               'sqlstate': getattr(error, 'sqlstate', None)}
+    for name in ('IntegrityError', 'DataError', 'OperationalError', 'ProgrammingError',
+                 'NotSupportedError', 'InterfaceError', 'InternalError'):
+        if isinstance(error, getattr(mariadb, name)):
+            return getattr(errors, name)(**options)
+    return errors.DatabaseError(**options)
+
+class MariaDBCursor:
+    """A MariaDB Connector/Python cursor speaking the subset of MySQLCursor the app uses"""
+
+    def __init__(self, connection, cursor):
+        self.connection = connection
+        self.cursor = cursor
+        self._stored_results = []
+
+    def _run(self, method, *args):
+        try:
+            return method(*args)
+        except require_mariadb().Error as e:
+            raise translate_error(e) from e
+
+    @property
+    def description(self):
+        return self.cursor.description
+
+    @property
+    def lastrowid(self):
+        return self.cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    def execute(self, query, params=None):
+        self.connection.dirty = True
+        self._run(self.cursor.execute, query, tuple(params) if params is not None else ())
+
+    def executemany(self, query, seq_params):
+        self.connection.dirty = True
+        self._run(self.cursor.executemany, query, [tuple(params) for params in seq_params])
+
+    def callproc(self, procedure, args=()):
+        """Call a stored procedure; its result sets are read with stored_results()"""
+        from backend import StoredResult
+        self.connection.dirty = True
+        self._run(self.cursor.callproc, procedure, tuple(args))
+        self._stored_results = []
+        while True:
+            if self.cursor.description:
+                self._stored_results.append(StoredResult(self._run(self.cursor.fetchall),
+                                                         self.cursor.description))
+            if not self._run(self.cursor.nextset):
+                break
+        return args
+
+    def stored_results(self):
+        return iter(self._stored_results)
+
+    def fetchone(self):
+        return self._run(self.cursor.fetchone)
+
+    def fetchmany(self, size=1):
+        return self._run(self.cursor.fetchmany, size)
+
+    def fetchall(self):
+        return self._run(self.cursor.fetchall)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self.cursor.close()
+
+class MariaDBConnection:
+    """The subset of MySQLConnection the app uses, over MariaDB Connector/Python"""
+
+    # Procedures are read with callproc(); there is no multi-statement execute()
+    emulates_procedures = True
+
+    def __init__(self, host='localhost', user=None, password=None, database=None, port=3306, **_):
+        mariadb = require_mariadb()
+        try:
+            self.raw = mariadb.connect(host=host, user=user, password=password, database=database,
+                                       port=port, autocommit=False)
+        except mariadb.Error as e:
+            raise translate_error(e) from e
+        # mysql.connector reports a transaction as soon as a statement runs without autocommit
+        self.dirty = False
+
+    @property
+    def in_transaction(self):
+        return self.dirty
+
+    def start_transaction(self, consistent_snapshot=False, isolation_level=None, readonly=None):
+        if self.dirty:
+            raise errors.ProgrammingError(msg="Transaction already in progress")
+        cursor = self.cursor()
+        try:
+            if isolation_level:
+                cursor.execute(f"SET TRANSACTION ISOLATION LEVEL {isolation_level}")
+            characteristics = []
+            if consistent_snapshot:
+                characteristics.append("WITH CONSISTENT SNAPSHOT")
+            if readonly is not None:
+                characteristics.append("READ ONLY" if readonly else "READ WRITE")
+            cursor.execute(f"START TRANSACTION {', '.join(characteristics)}")
+        finally:
+            cursor.close()
+
+    def cursor(self, dictionary=False, buffered=None, **kwargs):
+        options = {'dictionary': dictionary}
+        if buffered is not None:
+            options['buffered'] = buffered
+        return MariaDBCursor(self, self.raw.cursor(**options))
+
+    def commit(self):
+        try:
+            self.raw.commit()
+        except require_mariadb().Error as e:
+            raise translate_error(e) from e
+        self.dirty = False
+
+    def rollback(self):
+        try:
+            self.raw.rollback()
+        except require_mariadb().Error as e:
+            raise translate_error(e) from e
+        self.dirty = False
+
+    def is_connected(self):
+        try:
+            self.raw.ping()
+            return True
+        except require_mariadb().Error:
+            return False
+
+    def close(self):
+        self.raw.close()
+
+def normalize(value):
+    """A driver-independent form of a result value for parity checks"""
+    from decimal import Decimal
+    if isinstance(value, (Decimal, float)):
+        return Decimal(value).quantize(Decimal('0.0001'))
+    if isinstance(value, (bytes, bytearray)):
+        return value.decode()
+    return value
+
+def report_cases(db_manager, params):
+    """Yield (name, callable returning rows) for every report and fee procedure"""
+    from fees import FEE_REPORTS, FeesManager
+    from reports import REPORTS, AdvancedReports
+
+    reports = AdvancedReports(db_manager)
+    fees = FeesManager(db_manager)
+    for registry, manager in ((REPORTS, reports), (FEE_REPORTS, fees)):
+        for name, (method, spec) in registry.items():
+            kwargs = {param: params[param] for param, _, _ in spec if param in params}
+            yield name, lambda manager=manager, method=method, kwargs=kwargs: getattr(manager, method)(**kwargs)
+
+def check_parity(drivers):
+    """Run every report under each driver; returns [(report, driver, problem)]"""
+    from benchmark import sample_params
+    from main import DatabaseManager
+
+    results = {}
+    params = None
+    for driver in drivers:
+        with DatabaseManager(driver=driver) as db_manager:
+            params = params or sample_params(db_manager)
+            results[driver] = {name: [{column: normalize(value) for column, value in row.items()} for row in case()]
+                               for name, case in report_cases(db_manager, params)}
+
+    reference, *others = drivers
+    problems = []
+    for driver in others:
+        for name, expected in results[reference].items():
+            actual = results[driver][name]
+            if len(actual) != len(expected):
+                problems.append((name, driver, f"{len(actual)} rows, {reference} returned {len(expected)}"))
+            elif actual != expected:
+                index = next(i for i, (a, b) in enumerate(zip(actual, expected)) if a != b)
+                problems.append((name, driver, f"row {index} differs: {actual[index]} != {expected[index]}"))
+    return problems
+
+def decode_benchmark(drivers, rows=100000, iterations=3):
+    """Rows/sec fetching the large result and every report under each driver"""
+    from benchmark import ROW_FORMAT_QUERY, percentile, sample_params
+    from database import iter_rows
+    from main import DatabaseManager
+
+    results = {}
+    for driver in drivers:
+        with DatabaseManager(driver=driver) as db_manager:
+            params = sample_params(db_manager)
+            cases = [(f"scan.{rows}.dict", lambda db_manager=db_manager: list(
+                         iter_rows(db_manager, ROW_FORMAT_QUERY, (rows,)))),
+                     (f"scan.{rows}.compact", lambda db_manager=db_manager: list(
+                         iter_rows(db_manager, ROW_FORMAT_QUERY, (rows,), compact=True)))]
+            cases += list(report_cases(db_manager, params))
+            for name, case in cases:
+                latencies = []
+                count = 0
+                for _ in range(iterations):
+                    start = time.perf_counter()
+                    count = len(case())
+                    latencies.append(time.perf_counter() - start)
+                p50 = percentile(latencies, 0.50)
+                results.setdefault(name, {})[driver] = {
+                    'rows': count,
+                    'p50_ms': round(p50 * 1000, 2),
+                    'rows_per_sec': round(count / p50) if p50 > 0 else None,
+                }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and compare the SOMS database drivers")
+    commands = parser.add_subparsers(dest='command', required=True)
+    parity = commands.add_parser('parity', help="check every report returns the same rows under each driver")
+    bench = commands.add_parser('bench', help="compare row decode throughput")
+    for command in (parity, bench):
+        command.add_argument('--drivers', default=','.join(DRIVERS), help="comma-separated drivers")
+    bench.add_argument('--rows', type=int, default=100000, help="rows in the large scan")
+    bench.add_argument('--iterations', type=int, default=3)
+    args = parser.parse_args()
+
+    from tabulate import tabulate
+    drivers = args.drivers.split(',')
+    unknown = [driver for driver in drivers if driver not in DRIVERS]
+    if unknown:
+        parser.error(f"unknown driver(s) {', '.join(unknown)}; choose from {', '.join(DRIVERS)}")
+
+    if args.command == 'parity':
+        problems = check_parity(drivers)
+        for name, driver, problem in problems:
+            print(f"✗ {name} under {driver}: {problem}")
+        if not problems:
+            print(f"✓ All reports match across {', '.join(drivers)}")
+        return 1 if problems else 0
+
+    results = decode_benchmark(drivers, rows=args.rows, iterations=args.iterations)
+    print(tabulate([[name, *(f"{metrics[driver]['rows_per_sec']} ({metrics[driver]['p50_ms']} ms)"
+                             for driver in drivers)]
+                    for name, metrics in results.items()],
+                   headers=["Case", *(f"{driver} rows/s" for driver in drivers)], tablefmt="grid"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
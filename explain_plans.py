@@ -0,0 +1,317 @@
+"""
+Query plan snapshots for the Student Organization Management System
+
+Captures EXPLAIN FORMAT=JSON for the statements run by the report, fee,
+membership, login and search code paths, and for every SELECT in the
+stored procedures of SOMS.sql, then compares them with a stored snapshot:
+
+    python explain_plans.py --scales medium --save    # record the snapshot
+    python explain_plans.py --scales medium           # exit status 1 on regressions
+
+Plans are normalized to (table, access type, key, estimated rows) per
+table. A statement whose plan turns an index lookup on payment or
+belongs_to into a full scan (access type ALL) is flagged together with the
+change in estimated rows. Statements are captured through a cursor that
+explains every statement before running it; writes are explained but
+never executed.
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import re
+import sys
+from datetime import date
+from decimal import Decimal
+
+from backend import SCHEMA_FILE, parse_procedures
+from benchmark import load_json, sample_params, save_json
+from fees import FeeError, FeesManager
+from main import search_student
+from membership import MembershipManager, next_term
+from reports import REPORTS, AdvancedReports
+from session import UserSession
+
+PLANS_FILE = os.path.join('benchmarks', 'plans.json')
+
+# Tables where losing an index to a full scan is flagged
+WATCHED_TABLES = ('payment', 'belongs_to')
+
+EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE', 'REPLACE')
+READ_ONLY = ('SELECT', 'WITH')
+
+# Stored procedure parameter -> sample parameter
+PROCEDURE_PARAMS = {
+    'p_org_id': 'org_id',
+    'p_semester': 'semester',
+    'p_batch_year': 'batch_year',
+    'p_acad_year': 'acad_year',
+    'p_stud_no': 'stud_no',
+    'p_role': 'role',
+    'p_num_semesters': 'n_semesters',
+    'p_as_of_date': 'as_of_date',
+}
+
+TABLE_REFERENCE = re.compile(r'\b(?:FROM|JOIN|INTO|UPDATE)\s+(\w+)(?:\s+(?:AS\s+)?(\w+))?', re.IGNORECASE)
+SQL_KEYWORDS = {'ON', 'WHERE', 'JOIN', 'LEFT', 'RIGHT', 'INNER', 'GROUP', 'ORDER', 'LIMIT', 'SET',
+                'SELECT', 'VALUES', 'USING', 'HAVING', 'UNION', 'AND', 'OR'}
+
+def normalize_sql(query):
+    """Collapse whitespace so formatting changes do not look like new statements"""
+    return ' '.join(query.split())
+
+def table_aliases(query):
+    """Map the aliases used in a statement to their table names"""
+    aliases = {}
+    for table, alias in TABLE_REFERENCE.findall(query):
+        aliases[table] = table
+        if alias and alias.upper() not in SQL_KEYWORDS:
+            aliases[alias] = table
+    return aliases
+
+def plan_tables(plan):
+    """Walk an EXPLAIN FORMAT=JSON document and return its table accesses in order"""
+    tables = []
+
+    def walk(node):
+        if isinstance(node, dict):
+            table = node.get('table')
+            if isinstance(table, dict) and 'table_name' in table:
+                tables.append(table)
+            for value in node.values():
+                walk(value)
+        elif isinstance(node, list):
+            for value in node:
+                walk(value)
+
+    walk(plan)
+    return tables
+
+def normalize_plan(query, plan):
+    """Reduce a JSON plan to the per-table fields worth comparing"""
+    aliases = table_aliases(query)
+    return [{
+        'alias': table['table_name'],
+        'table': aliases.get(table['table_name'], table['table_name']),
+        'access_type': table.get('access_type'),
+        'key': table.get('key'),
+        # MariaDB reports "rows", MySQL "rows_examined_per_scan"
+        'rows': table.get('rows', table.get('rows_examined_per_scan')),
+    } for table in plan_tables(plan)]
+
+def sql_literal(value):
+    """Render a sample value as an SQL literal for procedure bodies"""
+    if value is None:
+        return 'NULL'
+    if isinstance(value, (int, float, Decimal)):
+        return str(value)
+    escaped = str(value).replace('\\', '\\\\').replace("'", "''")
+    return f"'{escaped}'"
+
+def procedure_statements(schema_file=SCHEMA_FILE):
+    """Yield (procedure, index, statement) for every SELECT in the stored procedures"""
+    for name, selects in parse_procedures(schema_file).items():
+        for index, statement in enumerate(selects, 1):
+            yield name, index, statement
+
+def bind_procedure(statement, params):
+    """Replace p_* procedure parameters with sample literals"""
+    def replace(match):
+        name = match.group(0)
+        if name not in PROCEDURE_PARAMS:
+            return name
+        return sql_literal(params[PROCEDURE_PARAMS[name]])
+    return re.sub(r'\bp_\w+\b', replace, statement)
+
+class ExplainCursor:
+    """Cursor wrapper that records a plan for every statement it is given.
+
+    Reads are explained and then executed, so the calling code carries on
+    as normal. Writes are only explained.
+    """
+
+    def __init__(self, cursor):
+        self.cursor = cursor
+        self.case = None
+        self.plans = []
+
+    def explain(self, query, params=None):
+        self.cursor.execute(f"EXPLAIN FORMAT=JSON {query}", params)
+        row = self.cursor.fetchone()
+        plan = json.loads(next(iter(row.values())))
+        self.plans.append((self.case, query, plan))
+
+    def execute(self, query, params=None):
+        verb = query.lstrip().split(None, 1)[0].upper()
+        if verb in EXPLAINABLE:
+            self.explain(query, params)
+            if verb not in READ_ONLY:
+                return
+        self.cursor.execute(query, params)
+
+    def executemany(self, query, seq_params):
+        rows = list(seq_params)
+        if rows:
+            self.execute(query, rows[0])
+
+    def __getattr__(self, name):
+        return getattr(self.cursor, name)
+
+class ExplainDatabase:
+    """The connection/cursor pair the managers expect, with an ExplainCursor"""
+
+    def __init__(self, db_manager):
+        self.connection = db_manager.connection
+        self.cursor = ExplainCursor(db_manager.cursor)
+
+def plan_cases(params):
+    """Yield (name, callable taking a database) for every captured code path"""
+    for name, (method, spec) in REPORTS.items():
+        kwargs = {param: params[param] for param, _, _ in spec if param in params}
+        yield f"report.{name}", lambda db, method=method, kwargs=kwargs: getattr(AdvancedReports(db), method)(**kwargs)
+    yield "report.list_organizations", lambda db: AdvancedReports(db).list_organizations()
+
+    yield "fees.find_students.stud_no", lambda db: FeesManager(db).find_students(stud_no=params['stud_no'])
+    yield "fees.find_students.name", lambda db: FeesManager(db).find_students(name=params['name'])
+    yield "fees.open_fees", lambda db: FeesManager(db).open_fees(params['stud_no'])
+    yield "fees.member_fees", lambda db: FeesManager(db).member_fees(params['stud_no'])
+    yield "fees.assign_fee", lambda db: FeesManager(db).assign_fee(params['stud_no'], params['org_id'], 100,
+                                                                   params['as_of_date'])
+    if params.get('payment_id'):
+        yield "fees.apply_payment", lambda db: FeesManager(db).apply_payment(params['payment_id'], 1)
+
+    to_semester, to_acad_year = next_term(str(params['semester']), params['acad_year'])
+    yield "membership.view_org_members", lambda db: MembershipManager(db).view_org_members(params['org_id'])
+    yield "membership.rollover_members", lambda db: MembershipManager(db).rollover_members(
+        str(params['semester']), params['acad_year'], to_semester, to_acad_year, org_id=params['org_id'])
+
+    yield "main.search_student", lambda db: search_student(db, params['name'])
+    yield "session.refresh", lambda db: UserSession(db, params['stud_no']).refresh()
+
+def capture_plans(db_manager):
+    """Return {statement id: {'sql', 'tables'}} for every case and stored procedure"""
+    params = sample_params(db_manager)
+    db_manager.cursor.execute("""SELECT payment_id FROM payment
+                                 WHERE stud_no = %s AND payment_status != 'Paid'
+                                 ORDER BY payment_id
+                                 LIMIT 1""", (params['stud_no'],))
+    open_payment = db_manager.cursor.fetchone()
+    params['payment_id'] = open_payment['payment_id'] if open_payment else None
+
+    db = ExplainDatabase(db_manager)
+    for name, case in plan_cases(params):
+        db.cursor.case = name
+        # Writes are only explained, so this ends nothing but the previous case's reads
+        db_manager.connection.rollback()
+        try:
+            # The interactive views print their results
+            with contextlib.redirect_stdout(io.StringIO()):
+                case(db)
+        except FeeError:
+            pass
+    db_manager.connection.rollback()
+
+    snapshot = {}
+    counts = {}
+    for case, query, plan in db.cursor.plans:
+        counts[case] = counts.get(case, 0) + 1
+        snapshot[f"{case}#{counts[case]}"] = {'sql': normalize_sql(query), 'tables': normalize_plan(query, plan)}
+
+    for procedure, index, statement in procedure_statements():
+        query = bind_procedure(statement, params)
+        db_manager.cursor.execute(f"EXPLAIN FORMAT=JSON {query}")
+        row = db_manager.cursor.fetchone()
+        plan = json.loads(next(iter(row.values())))
+        snapshot[f"procedure.{procedure}#{index}"] = {'sql': normalize_sql(statement),
+                                                      'tables': normalize_plan(statement, plan)}
+    return snapshot
+
+def compare_plans(baseline, current):
+    """Return (regressions, changes) between two snapshots.
+
+    A regression is a watched table going from an index access to a full
+    scan. Changes cover any other difference in access type or key.
+    """
+    regressions = []
+    changes = []
+    for statement, plan in current.items():
+        previous = baseline.get(statement)
+        if not previous:
+            continue
+        before = {table['alias']: table for table in previous['tables']}
+        for table in plan['tables']:
+            old = before.get(table['alias'])
+            if not old:
+                continue
+            delta = (table['rows'] or 0) - (old['rows'] or 0)
+            if (table['table'] in WATCHED_TABLES and table['access_type'] == 'ALL'
+                    and old['access_type'] != 'ALL'):
+                regressions.append((statement, table['table'], old, table, delta))
+            elif (table['access_type'], table['key']) != (old['access_type'], old['key']):
+                changes.append((statement, table['table'], old, table, delta))
+    return regressions, changes
+
+def describe_access(table):
+    return f"{table['access_type']}({table['key'] or '-'}) ~{table['rows']} rows"
+
+def main():
+    parser = argparse.ArgumentParser(description="Snapshot and compare SOMS query plans")
+    parser.add_argument('--scales', help="comma-separated datagen scales to load before each capture "
+                                         "(default: use the data already loaded)")
+    parser.add_argument('--seed', type=int, default=127)
+    parser.add_argument('--save', action='store_true', help="store the captured plans as the snapshot")
+    args = parser.parse_args()
+
+    from tabulate import tabulate
+    from main import DatabaseManager
+
+    snapshots = load_json(PLANS_FILE, {})
+    regressed = False
+
+    with DatabaseManager() as db_manager:
+        for scale in (args.scales.split(',') if args.scales else [None]):
+            if scale:
+                from datagen import SCALES, DatasetGenerator, load_dataset
+                print(f"\nLoading '{scale}' dataset...")
+                load_dataset(db_manager, DatasetGenerator(seed=args.seed, **SCALES[scale]), reset=True)
+            label = scale or 'current'
+
+            current = capture_plans(db_manager)
+            full_scans = [[statement, table['table'], describe_access(table)]
+                          for statement, plan in current.items() for table in plan['tables']
+                          if table['table'] in WATCHED_TABLES and table['access_type'] == 'ALL']
+            print(f"\nCaptured {len(current)} statement plans ({label})")
+            if full_scans:
+                print("Full scans of watched tables:")
+                print(tabulate(full_scans, headers=["Statement", "Table", "Access"], tablefmt="grid"))
+
+            if args.save:
+                snapshots[label] = {'captured': date.today().isoformat(), 'plans': current}
+                continue
+            if label not in snapshots:
+                print(f"No snapshot for '{label}'; run with --save first")
+                continue
+
+            baseline = snapshots[label]['plans']
+            regressions, changes = compare_plans(baseline, current)
+            for statement, table, old, new, delta in regressions:
+                print(f"✗ {statement}: {table} {describe_access(old)} -> {describe_access(new)} ({delta:+} rows)")
+            for statement, table, old, new, delta in changes:
+                print(f"  {statement}: {table} {describe_access(old)} -> {describe_access(new)} ({delta:+} rows)")
+            added = sorted(set(current) - set(baseline))
+            removed = sorted(set(baseline) - set(current))
+            if added:
+                print(f"  New statements: {', '.join(added)}")
+            if removed:
+                print(f"  Removed statements: {', '.join(removed)}")
+            regressed = regressed or bool(regressions)
+
+    if args.save:
+        save_json(PLANS_FILE, snapshots)
+        print(f"✓ Plans saved to {PLANS_FILE}")
+    return 1 if regressed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
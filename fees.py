@@ -3,10 +3,49 @@ from tabulate import tabulate
 from mysql.connector import Error
 from typing import Optional
 from decimal import Decimal  # Add this import at the top
+from database import DEFAULT_BATCH_SIZE, batched, fetch_procedure, fetch_rows
+from history import iso_date
+
+# Report name -> (method, [(parameter, type, required)]) for non-interactive callers
+FEE_REPORTS = {
+    'org-unpaid-fees': ('org_unpaid_fees', [('org_id', int, True), ('semester', int, True),
+                                            ('batch_year', int, True)]),
+    'org-fee-totals': ('org_fee_totals', [('org_id', int, True), ('as_of_date', iso_date, True)]),
+    'org-highest-debt': ('members_highest_debt', [('org_id', int, True), ('semester', int, True),
+                                                  ('batch_year', int, True)]),
+}
+
+class FeeError(Exception):
+    """Raised when a fee or payment operation is rejected"""
 
 class FeesManager:
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, stream=False, batch_size=DEFAULT_BATCH_SIZE, compact=False, router=None):
         self.db_manager = db_manager
+        # When stream is True the read methods return generators that fetch batch_size rows at a time
+        self.stream = stream
+        self.batch_size = batch_size
+        # When compact is True rows are tuple records (database.record_type) instead of dicts
+        self.compact = compact
+        # A routing.ReportRouter runs the report procedures (not the cashier reads) off the primary
+        self.router = router
+
+    def _rows(self, query, params=(), stream=None, compact=None):
+        stream = self.stream if stream is None else stream
+        compact = self.compact if compact is None else compact
+        return fetch_rows(self.db_manager, query, params, stream=stream, batch_size=self.batch_size,
+                          compact=compact)
+
+    def _print_students(self, title, students):
+        """Print compact student rows a page of batch_size rows at a time; returns how many were printed"""
+        count = 0
+        headers = ["Student No", "First Name", "Last Name", "Program", "Batch", "Gender", "Birthday"]
+        for page in batched(students, self.batch_size):
+            if not count:
+                print(f"\n{title}:")
+            # Records are already in column order, so they go to tabulate as they are
+            print(tabulate(page, headers=headers, tablefmt="grid"))
+            count += len(page)
+        return count
 
     def manage_fees(self):
         """Manage organization fees"""
@@ -49,35 +88,10 @@ class FeesManager:
             
             if choice == '1':
                 # Show existing student numbers first
-                self.db_manager.cursor.execute("""
-                    SELECT stud_no, firstname, lastname, degrprog, batch, gender, birthday 
-                    FROM student 
-                    ORDER BY stud_no
-                """)
-                students = self.db_manager.cursor.fetchall()
-                
-                if students:
-                    table_data = [[
-                        row['stud_no'],
-                        row['firstname'],
-                        row['lastname'],
-                        row['degrprog'],
-                        row['batch'],
-                        row['gender'],
-                        row['birthday']
-                    ] for row in students]
-                    headers = ["Student No", "First Name", "Last Name", "Program", "Batch", "Gender", "Birthday"]
-                    print("\nExisting Students:")
-                    print(tabulate(table_data, headers=headers, tablefmt="grid"))
+                self._print_students("Existing Students", self.find_students(order_by='stud_no', stream=True, compact=True))
                 
                 stud_no = input("\nEnter student number: ")
-                query = """
-                    SELECT stud_no, firstname, lastname, degrprog, batch, gender, birthday 
-                    FROM student 
-                    WHERE stud_no = %s
-                """
-                self.db_manager.cursor.execute(query, (stud_no,))
-                results = self.db_manager.cursor.fetchall()
+                results = self.find_students(stud_no=stud_no)
                 
                 if results:
                     table_data = [[
@@ -99,13 +113,7 @@ class FeesManager:
                     
             elif choice == '2':
                 name = input("Enter student name (first or last): ").strip()
-                query = """
-                    SELECT stud_no, firstname, lastname, degrprog, batch, gender, birthday 
-                    FROM student 
-                    WHERE firstname LIKE %s OR lastname LIKE %s
-                """
-                self.db_manager.cursor.execute(query, (f"%{name}%", f"%{name}%"))
-                results = self.db_manager.cursor.fetchall()
+                results = self.find_students(name=name)
                 
                 if results:
                     table_data = [[
@@ -133,28 +141,7 @@ class FeesManager:
             elif choice == '3':
                 try:
                     # Show all students with their details
-                    self.db_manager.cursor.execute("""
-                        SELECT stud_no, firstname, lastname, degrprog, batch, gender, birthday 
-                        FROM student 
-                        ORDER BY lastname, firstname
-                    """)
-                    results = self.db_manager.cursor.fetchall()
-                    
-                    if results:
-                        table_data = [[
-                            row['stud_no'],
-                            row['firstname'],
-                            row['lastname'],
-                            row['degrprog'],
-                            row['batch'],
-                            row['gender'],
-                            row['birthday']
-                        ] for row in results]
-                        
-                        headers = ["Student No", "First Name", "Last Name", "Program", "Batch", "Gender", "Birthday"]
-                        print("\nAll Students:")
-                        print(tabulate(table_data, headers=headers, tablefmt="grid"))
-                        
+                    if self._print_students("All Students", self.find_students(stream=True, compact=True)):
                         stud_no = input("\nEnter the student number from the list: ")
                         return stud_no
                     else:
@@ -170,6 +157,25 @@ class FeesManager:
             else:
                 print("Invalid choice!")
 
+    def find_students(self, stud_no=None, name=None, order_by='lastname, firstname', stream=None,
+                      compact=None):
+        """Students matching an exact student number or part of a name; all students if neither is given"""
+        query = """
+            SELECT stud_no, firstname, lastname, degrprog, batch, gender, birthday 
+            FROM student 
+        """
+        params = ()
+        if stud_no is not None:
+            query += " WHERE stud_no = %s"
+            params = (stud_no,)
+        elif name is not None:
+            query += " WHERE firstname LIKE %s OR lastname LIKE %s"
+            params = (f"%{name}%", f"%{name}%")
+        else:
+            query += f" ORDER BY {order_by}"
+
+        return self._rows(query, params, stream=stream, compact=compact)
+
     def add_fee(self):
         """Add a new fee"""
         print("\n=== Add New Fee ===")
@@ -209,41 +215,47 @@ class FeesManager:
             amount = float(input("Amount: "))
             due_date = input("Due Date (YYYY-MM-DD): ")
             
-            # Check if organization exists
-            self.db_manager.cursor.execute("SELECT org_name FROM organization WHERE org_id = %s", (org_id,))
-            org = self.db_manager.cursor.fetchone()
-            if not org:
-                print("✗ Organization not found!")
-                return
-            
-            # Check if student belongs to organization
-            self.db_manager.cursor.execute("""
-                SELECT status, semester, acad_year 
-                FROM belongs_to 
-                WHERE stud_no = %s AND org_id = %s
-            """, (stud_no, org_id))
-            membership = self.db_manager.cursor.fetchone()
-            
-            if not membership:
-                print("✗ Student is not a member of this organization!")
-                return
-            
-            query = """
-                INSERT INTO payment (
-                    amount, due_date, org_id, stud_no, 
-                    payment_status, amount_paid, payment_date
-                ) VALUES (%s, %s, %s, %s, 'Not Paid', 0, NULL)
-            """
-            
-            self.db_manager.cursor.execute(query, (amount, due_date, org_id, stud_no))
-            self.db_manager.connection.commit()
+            self.assign_fee(stud_no, org_id, amount, due_date)
             print(f"✓ Fee added successfully!")
             
+        except FeeError as e:
+            print(f"✗ {e}")
         except ValueError:
             print("✗ Invalid input. Please enter valid values.")
         except Error as e:
             print(f"✗ Error adding fee: {e}")
 
+    def assign_fee(self, stud_no, org_id, amount, due_date):
+        """Create an unpaid fee for a member and return its payment_id"""
+        # Check if organization exists
+        self.db_manager.cursor.execute("SELECT org_name FROM organization WHERE org_id = %s", (org_id,))
+        org = self.db_manager.cursor.fetchone()
+        if not org:
+            raise FeeError("Organization not found!")
+
+        # Check if student belongs to organization
+        self.db_manager.cursor.execute("""
+            SELECT status, semester, acad_year 
+            FROM belongs_to 
+            WHERE stud_no = %s AND org_id = %s
+            LIMIT 1
+        """, (stud_no, org_id))
+        membership = self.db_manager.cursor.fetchone()
+
+        if not membership:
+            raise FeeError("Student is not a member of this organization!")
+
+        query = """
+            INSERT INTO payment (
+                amount, due_date, org_id, stud_no, 
+                payment_status, amount_paid, payment_date
+            ) VALUES (%s, %s, %s, %s, 'Not Paid', 0, NULL)
+        """
+
+        self.db_manager.cursor.execute(query, (amount, due_date, org_id, stud_no))
+        self.db_manager.connection.commit()
+        return self.db_manager.cursor.lastrowid
+
     def process_payment(self):
         """Process a payment"""
         print("\n=== Process Payment ===")
@@ -254,20 +266,7 @@ class FeesManager:
                 return
                 
             # Show unpaid fees for the student with more details
-            query = """
-                SELECT 
-                    p.payment_id, p.amount, p.amount_paid, p.due_date, 
-                    p.payment_status, p.payment_date,
-                    o.org_name,
-                    DATEDIFF(CURRENT_DATE, p.due_date) as days_overdue
-                FROM payment p
-                JOIN organization o ON p.org_id = o.org_id
-                WHERE p.stud_no = %s AND p.payment_status != 'Paid'
-                ORDER BY p.due_date
-            """
-            
-            self.db_manager.cursor.execute(query, (stud_no,))
-            results = self.db_manager.cursor.fetchall()
+            results = self.open_fees(stud_no)
             
             if not results:
                 print("No unpaid fees found for this student!")
@@ -292,16 +291,7 @@ class FeesManager:
             payment_id = int(input("\nEnter Payment ID to process: "))
             
             # Process the payment
-            query = """
-                SELECT p.*, s.firstname, s.lastname, o.org_name 
-                FROM payment p
-                JOIN student s ON p.stud_no = s.stud_no
-                JOIN organization o ON p.org_id = o.org_id
-                WHERE p.payment_id = %s AND p.payment_status != 'Paid'
-            """
-            
-            self.db_manager.cursor.execute(query, (payment_id,))
-            payment = self.db_manager.cursor.fetchone()
+            payment = self.get_open_payment(payment_id)
             
             if not payment:
                 print("✗ Payment record not found or already paid!")
@@ -315,34 +305,75 @@ class FeesManager:
             print(f"Due Date: {payment['due_date']}")
             
             amount_paid = Decimal(input("Enter amount to pay: "))  # Change this line
-            payment_date = datetime.now().strftime('%Y-%m-%d')
-            
-            # Calculate new total paid amount
-            new_amount_paid = (payment['amount_paid'] or Decimal('0')) + amount_paid
-            
-            # Determine payment status
-            if new_amount_paid >= payment['amount']:
-                status = 'Paid'
-            elif new_amount_paid > 0:
-                status = 'Partial'
-            else:
-                status = 'Not Paid'
-            
-            update_query = """
-                UPDATE payment 
-                SET amount_paid = %s, payment_date = %s, payment_status = %s
-                WHERE payment_id = %s
-            """
-            
-            self.db_manager.cursor.execute(update_query, (new_amount_paid, payment_date, status, payment_id))
-            self.db_manager.connection.commit()
+            self.apply_payment(payment_id, amount_paid)
             print("✓ Payment processed successfully!")
             
-        except ValueError:
+        except FeeError as e:
+            print(f"✗ {e}")
+        except (ValueError, ArithmeticError):
             print("✗ Invalid input. Please enter valid values.")
         except Error as e:
             print(f"✗ Error processing payment: {e}")
 
+    def open_fees(self, stud_no):
+        """A student's fees that are not fully paid, oldest due date first"""
+        query = """
+            SELECT 
+                p.payment_id, p.amount, p.amount_paid, p.due_date, 
+                p.payment_status, p.payment_date,
+                o.org_name,
+                DATEDIFF(CURRENT_DATE, p.due_date) as days_overdue
+            FROM payment p
+            JOIN organization o ON p.org_id = o.org_id
+            WHERE p.stud_no = %s AND p.payment_status != 'Paid'
+            ORDER BY p.due_date
+        """
+
+        return self._rows(query, (stud_no,))
+
+    def get_open_payment(self, payment_id):
+        """A payment that is not fully paid, with student and organization names"""
+        query = """
+            SELECT p.*, s.firstname, s.lastname, o.org_name 
+            FROM payment p
+            JOIN student s ON p.stud_no = s.stud_no
+            JOIN organization o ON p.org_id = o.org_id
+            WHERE p.payment_id = %s AND p.payment_status != 'Paid'
+        """
+
+        self.db_manager.cursor.execute(query, (payment_id,))
+        return self.db_manager.cursor.fetchone()
+
+    def apply_payment(self, payment_id, amount_paid):
+        """Add amount_paid to a payment and return its new status"""
+        payment = self.get_open_payment(payment_id)
+        if not payment:
+            raise FeeError("Payment record not found or already paid!")
+
+        amount_paid = Decimal(str(amount_paid))
+        payment_date = datetime.now().strftime('%Y-%m-%d')
+
+        # Calculate new total paid amount
+        new_amount_paid = (payment['amount_paid'] or Decimal('0')) + amount_paid
+
+        # Determine payment status
+        if new_amount_paid >= payment['amount']:
+            status = 'Paid'
+        elif new_amount_paid > 0:
+            status = 'Partial'
+        else:
+            status = 'Not Paid'
+
+        update_query = """
+            UPDATE payment 
+            SET amount_paid = %s, payment_date = %s, payment_status = %s
+            WHERE payment_id = %s
+        """
+
+        self.db_manager.cursor.execute(update_query, (new_amount_paid, payment_date, status, payment_id))
+        self.db_manager.connection.commit()
+        return {'payment_id': payment_id, 'amount_paid': new_amount_paid, 'payment_status': status}
+
     def view_member_fees(self):
         """View all fees for a member"""
         try:
@@ -352,29 +383,7 @@ class FeesManager:
                 return
                 
             # Show all unpaid and partial payments
-            query = """
-                SELECT 
-                    s.stud_no,
-                    CONCAT(s.firstname, ' ', s.lastname) AS name,
-                    o.org_name,
-                    b.acad_year,
-                    b.semester,
-                    p.payment_status,
-                    p.due_date,
-                    p.amount,
-                    p.amount_paid,
-                    (p.amount - p.amount_paid) as remaining_amount
-                FROM payment p
-                JOIN student s ON p.stud_no = s.stud_no
-                JOIN organization o ON p.org_id = o.org_id
-                JOIN belongs_to b ON b.stud_no = s.stud_no AND b.org_id = o.org_id
-                WHERE s.stud_no = %s 
-                AND p.payment_status IN ('Unpaid', 'Partial')
-                ORDER BY p.due_date
-            """
-            
-            self.db_manager.cursor.execute(query, (stud_no,))
-            results = self.db_manager.cursor.fetchall()
+            results = self.member_fees(stud_no)
             
             if results:
                 # Convert results to list of lists for tabulate
@@ -402,6 +411,31 @@ class FeesManager:
         except Error as e:
             print(f"✗ Error viewing member fees: {e}")
 
+    def member_fees(self, stud_no):
+        """A member's unpaid and partial fees with their live membership terms (none once archived)"""
+        query = """
+            SELECT 
+                s.stud_no,
+                CONCAT(s.firstname, ' ', s.lastname) AS name,
+                o.org_name,
+                b.acad_year,
+                b.semester,
+                p.payment_status,
+                p.due_date,
+                p.amount,
+                p.amount_paid,
+                (p.amount - p.amount_paid) as remaining_amount
+            FROM payment p
+            JOIN student s ON p.stud_no = s.stud_no
+            JOIN organization o ON p.org_id = o.org_id
+            LEFT JOIN belongs_to b ON b.stud_no = s.stud_no AND b.org_id = o.org_id
+            WHERE s.stud_no = %s 
+            AND p.payment_status IN ('Unpaid', 'Partial')
+            ORDER BY p.due_date
+        """
+
+        return self._rows(query, (stud_no,))
+
     def view_org_fees(self):
         """View all fees for an organization"""
         try:
@@ -423,9 +457,7 @@ class FeesManager:
             batch_year = int(acad_year.split('-')[0])
             
             # Use the GetOrgMembersWithUnpaidFees stored procedure
-            self.db_manager.cursor.callproc('GetOrgMembersWithUnpaidFees', (org_id, semester, batch_year))
-            results = self.db_manager.cursor.stored_results()
-            results = next(results).fetchall()
+            results = self.org_unpaid_fees(org_id, semester, batch_year)
             
             if results:
                 # Convert results to list of lists for tabulate
@@ -484,9 +516,7 @@ class FeesManager:
             as_of_date = input("Enter as of date (YYYY-MM-DD): ")
             
             # Use the GetOrgFeeTotalsAsOfDate stored procedure
-            self.db_manager.cursor.callproc('GetOrgFeeTotalsAsOfDate', (org_id, as_of_date))
-            results = self.db_manager.cursor.stored_results()
-            results = next(results).fetchall()
+            results = self.org_fee_totals(org_id, as_of_date)
             
             if results:
                 # Convert results to list of lists for tabulate
@@ -525,9 +555,7 @@ class FeesManager:
             batch_year = int(batch_year.split('-')[0])
             
             # Use the GetOrgMembersWithHighestDebt stored procedure
-            self.db_manager.cursor.callproc('GetOrgMembersWithHighestDebt', (org_id, semester, batch_year))
-            results = self.db_manager.cursor.stored_results()
-            results = next(results).fetchall()
+            results = self.members_highest_debt(org_id, semester, batch_year)
             
             if results:
                 # Convert results to list of lists for tabulate
@@ -551,3 +579,22 @@ class FeesManager:
             print("✗ Invalid input. Please enter valid values.")
         except Error as e:
             print(f"✗ Error generating report: {e}")
+
+    def _call_report(self, procedure, args):
+        """Call a report stored procedure and return its first result set"""
+        options = {'stream': self.stream, 'batch_size': self.batch_size, 'compact': self.compact}
+        if self.router:
+            return self.router.fetch_procedure(procedure, args, **options)
+        return fetch_procedure(self.db_manager, procedure, args, **options)
+
+    def org_unpaid_fees(self, org_id, semester, batch_year):
+        """Members of an organization with unpaid fees (GetOrgMembersWithUnpaidFees)"""
+        return self._call_report('GetOrgMembersWithUnpaidFees', (org_id, semester, batch_year))
+
+    def org_fee_totals(self, org_id, as_of_date):
+        """Paid and unpaid fee totals of an organization (GetOrgFeeTotalsAsOfDate)"""
+        return self._call_report('GetOrgFeeTotalsAsOfDate', (org_id, as_of_date))
+
+    def members_highest_debt(self, org_id, semester, batch_year):
+        """Members of an organization ordered by debt (GetOrgMembersWithHighestDebt)"""
+        return self._call_report('GetOrgMembersWithHighestDebt', (org_id, semester, batch_year))
@@ -0,0 +1,137 @@
+"""
+Row history for point-in-time reporting in the Student Organization Management System
+
+payment_history and belongs_to_history keep every version of the payment
+and belongs_to rows together with the period it was current,
+valid_from <= t < valid_to. Triggers on both tables close the current
+version and open a new one on every insert, update and delete (SOMS.sql,
+and backend.session_ddl for SQLite), so the "as of" reports read the exact
+state of a past date with one indexed range lookup instead of guessing it
+from due dates or replaying studentorg_log. The current version of a row
+has valid_to = OPEN_VERSION.
+
+Rows that existed before the history tables, or were bulk-loaded with
+@soms_skip_history set, get their first version with seed_history():
+
+    python history.py seed                  rows without history: current from now on
+    python history.py seed --backdate       generated data: from their term, due and payment dates
+    python soms.py report alumni --org 1001 --as-of 2024-01-15
+"""
+
+import argparse
+import sys
+from datetime import date, datetime, timedelta
+
+OPEN_VERSION = '9999-12-31 23:59:59.999999'
+
+# Table -> (history table, key columns, versioned columns)
+HISTORY_TABLES = {
+    'payment': ('payment_history', ('payment_id',),
+                ('payment_id', 'amount_paid', 'payment_date', 'payment_status', 'amount', 'due_date', 'org_id',
+                 'stud_no')),
+    'belongs_to': ('belongs_to_history', ('stud_no', 'org_id', 'semester', 'acad_year'),
+                   ('stud_no', 'org_id', 'semester', 'acad_year', 'status', 'role', 'committee', 'batch_year')),
+}
+
+# The versions current at the end of a day: compare against as_of_cutoff() twice
+AS_OF = "{alias}.valid_from < %s AND {alias}.valid_to >= %s"
+
+# Backdated first versions (seed --backdate): a fee is on record 30 days before it is due
+# and paid from its payment date; a membership from the start of its term
+FEE_RECORDED = "DATE_SUB(p.due_date, INTERVAL 30 DAY)"
+TERM_START = ("STR_TO_DATE(CONCAT(SUBSTRING_INDEX(b.acad_year, '-', 1), "
+              "IF(b.semester = '1', '-06-01', '-11-30')), '%Y-%m-%d')")
+
+def iso_date(value):
+    """A YYYY-MM-DD value as a date; the parameter type of the as-of reports"""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+def as_of_cutoff(as_of_date):
+    """The first instant after an as-of date, for AS_OF"""
+    return iso_date(as_of_date) + timedelta(days=1)
+
+def without_history(table, alias):
+    """Rows of table that have no current version in its history table"""
+    history_table, key, _ = HISTORY_TABLES[table]
+    match = ' AND '.join(f"h.{column} = {alias}.{column}" for column in key)
+    return (f"NOT EXISTS (SELECT 1 FROM {history_table} h "
+            f"WHERE {match} AND h.valid_to = '{OPEN_VERSION}')")
+
+def seed_history(db_manager, backdate=False):
+    """Give every row without history its current version; returns {table: versions written}.
+
+    By default the version starts now, like a table that has just been
+    put under versioning. With backdate, the first versions are
+    reconstructed from the rows' own dates (FEE_RECORDED, payment_date,
+    TERM_START), which is how generated datasets get a usable history.
+    """
+    cursor = db_manager.cursor
+    counts = {}
+
+    history_table, _, columns = HISTORY_TABLES['payment']
+    insert = f"INSERT INTO {history_table} ({', '.join(columns)}, valid_from, valid_to) "
+    selected = ', '.join(f"p.{column}" for column in columns)
+    counts['payment'] = 0
+    if backdate:
+        # Paid fees were first on record unpaid, until their payment date
+        cursor.execute(insert + f"""
+            SELECT p.payment_id, 0, NULL, 'Not Paid', p.amount, p.due_date, p.org_id, p.stud_no,
+                   {FEE_RECORDED}, p.payment_date
+            FROM payment p
+            WHERE p.amount_paid > 0
+              AND p.payment_date > {FEE_RECORDED}
+              AND {without_history('payment', 'p')}""")
+        counts['payment'] += cursor.rowcount
+        valid_from = (f"CASE WHEN p.amount_paid > 0 AND p.payment_date IS NOT NULL "
+                      f"THEN p.payment_date ELSE {FEE_RECORDED} END")
+        cursor.execute(insert + f"""
+            SELECT {selected}, {valid_from}, '{OPEN_VERSION}'
+            FROM payment p
+            WHERE {without_history('payment', 'p')}""")
+    else:
+        cursor.execute(insert + f"""
+            SELECT {selected}, %s, '{OPEN_VERSION}'
+            FROM payment p
+            WHERE {without_history('payment', 'p')}""", (datetime.now(),))
+    counts['payment'] += cursor.rowcount
+
+    history_table, _, columns = HISTORY_TABLES['belongs_to']
+    insert = f"INSERT INTO {history_table} ({', '.join(columns)}, valid_from, valid_to) "
+    selected = ', '.join(f"b.{column}" for column in columns)
+    if backdate:
+        cursor.execute(insert + f"""
+            SELECT {selected}, {TERM_START}, '{OPEN_VERSION}'
+            FROM belongs_to b
+            WHERE {without_history('belongs_to', 'b')}""")
+    else:
+        cursor.execute(insert + f"""
+            SELECT {selected}, %s, '{OPEN_VERSION}'
+            FROM belongs_to b
+            WHERE {without_history('belongs_to', 'b')}""", (datetime.now(),))
+    counts['belongs_to'] = cursor.rowcount
+
+    db_manager.connection.commit()
+    return counts
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the row history behind the as-of reports")
+    commands = parser.add_subparsers(dest='command', required=True)
+    seed = commands.add_parser('seed', help="write a first version for rows without history")
+    seed.add_argument('--backdate', action='store_true',
+                      help="start the versions at the rows' term, due and payment dates (generated data)")
+    seed.add_argument('--sqlite', metavar='PATH', help="use a SQLite database instead of MariaDB")
+    args = parser.parse_args()
+
+    from backend import open_database
+    with open_database(args.sqlite) as db_manager:
+        counts = seed_history(db_manager, backdate=args.backdate)
+    for table, count in counts.items():
+        print(f"✓ {HISTORY_TABLES[table][0]}: {count} versions written")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Concurrent cashier load test for the Student Organization Management System
+
+Simulates N clerks working at once through the real FeesManager code
+paths (assign_fee and apply_payment), each on its own connection with a
+random think time between operations. Payments are drawn from a small hot
+set so clerks contend for the same rows, as they do during enrollment week:
+
+    python loadtest.py --sessions 30 --duration 60 --think 0.5 --hot-payments 50
+
+Reports throughput, latency percentiles per operation, deadlocks, lock
+wait timeouts, server-side row lock waits and lost updates (payments whose
+final amount_paid is lower than the sum of the payments applied to them).
+Touched payments are restored and created fees removed afterwards unless
+--keep is given.
+"""
+
+import argparse
+import random
+import threading
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+from mysql.connector import Error, errorcode
+
+from benchmark import percentile
+from fees import FeeError, FeesManager
+from main import DatabaseManager
+
+PAYMENT_AMOUNT = Decimal('1.00')
+
+class LoadStats:
+    """Counters shared by all simulated sessions"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.applied = defaultdict(Decimal)
+        self.created = []
+
+    def record(self, operation, elapsed):
+        with self.lock:
+            self.latencies[operation].append(elapsed)
+
+    def error(self, kind):
+        with self.lock:
+            self.errors[kind] += 1
+
+def server_lock_counters(db_manager):
+    """InnoDB row lock and deadlock counters from the server"""
+    db_manager.cursor.execute("""SHOW GLOBAL STATUS
+                                 WHERE Variable_name IN ('Innodb_row_lock_waits', 'Innodb_row_lock_time',
+                                                         'Innodb_deadlocks')""")
+    return {row['Variable_name']: int(row['Value']) for row in db_manager.cursor.fetchall()}
+
+def cashier_session(seed, stop_at, think, members, hot_payments, fee_ratio, stats):
+    """One clerk assigning fees and processing payments until stop_at"""
+    rng = random.Random(seed)
+    with DatabaseManager() as db_manager:
+        fees = FeesManager(db_manager)
+        while time.monotonic() < stop_at:
+            time.sleep(rng.uniform(0, think * 2))
+            if rng.random() < fee_ratio:
+                operation = 'add_fee'
+                stud_no, org_id = rng.choice(members)
+            else:
+                operation = 'process_payment'
+                payment_id = rng.choice(hot_payments)
+
+            start = time.perf_counter()
+            try:
+                if operation == 'add_fee':
+                    created = fees.assign_fee(stud_no, org_id, rng.choice([100, 150, 200]), '2025-01-31')
+                    with stats.lock:
+                        stats.created.append(created)
+                else:
+                    fees.apply_payment(payment_id, PAYMENT_AMOUNT)
+                    with stats.lock:
+                        stats.applied[payment_id] += PAYMENT_AMOUNT
+                stats.record(operation, time.perf_counter() - start)
+            except FeeError:
+                stats.error('rejected')
+            except Error as e:
+                db_manager.connection.rollback()
+                if e.errno == errorcode.ER_LOCK_DEADLOCK:
+                    stats.error('deadlock')
+                elif e.errno == errorcode.ER_LOCK_WAIT_TIMEOUT:
+                    stats.error('lock_wait_timeout')
+                else:
+                    stats.error('other')
+
+def run_load_test(sessions, duration, think, hot_count, fee_ratio, seed=127, keep=False):
+    """Drive concurrent cashier sessions and return a results dict"""
+    with DatabaseManager() as db_manager:
+        cursor = db_manager.cursor
+        cursor.execute("""SELECT DISTINCT stud_no, org_id FROM belongs_to
+                          WHERE status = 'Active'
+                          ORDER BY stud_no, org_id
+                          LIMIT 1000""")
+        members = [(row['stud_no'], row['org_id']) for row in cursor.fetchall()]
+        cursor.execute("""SELECT payment_id, amount_paid, payment_status, payment_date
+                          FROM payment
+                          WHERE payment_status != 'Paid'
+                          ORDER BY amount - COALESCE(amount_paid, 0) DESC, payment_id
+                          LIMIT %s""", (hot_count,))
+        initial = {row['payment_id']: row for row in cursor.fetchall()}
+        if not members or not initial:
+            raise RuntimeError("Not enough data; load a dataset with datagen.py first")
+        db_manager.connection.commit()
+        counters_before = server_lock_counters(db_manager)
+
+    stats = LoadStats()
+    stop_at = time.monotonic() + duration
+    threads = [threading.Thread(target=cashier_session,
+                                args=(seed + index, stop_at, think, members, list(initial), fee_ratio, stats))
+               for index in range(sessions)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    with DatabaseManager() as db_manager:
+        cursor = db_manager.cursor
+        counters_after = server_lock_counters(db_manager)
+        ids = list(initial)
+        placeholders = ', '.join(['%s'] * len(ids))
+        cursor.execute(f"SELECT payment_id, amount_paid FROM payment WHERE payment_id IN ({placeholders})", ids)
+        final = {row['payment_id']: row['amount_paid'] or Decimal('0') for row in cursor.fetchall()}
+
+        lost_updates = 0
+        lost_amount = Decimal('0')
+        for payment_id, applied in stats.applied.items():
+            actual = final[payment_id] - (initial[payment_id]['amount_paid'] or Decimal('0'))
+            if actual < applied:
+                lost_updates += int((applied - actual) / PAYMENT_AMOUNT)
+                lost_amount += applied - actual
+
+        if not keep:
+            for row in initial.values():
+                cursor.execute("""UPDATE payment SET amount_paid = %s, payment_status = %s, payment_date = %s
+                                  WHERE payment_id = %s""",
+                               (row['amount_paid'], row['payment_status'], row['payment_date'], row['payment_id']))
+            if stats.created:
+                cursor.execute(f"DELETE FROM payment WHERE payment_id IN ({', '.join(['%s'] * len(stats.created))})",
+                               stats.created)
+            db_manager.connection.commit()
+
+    operations = {}
+    for operation, latencies in stats.latencies.items():
+        operations[operation] = {
+            'count': len(latencies),
+            'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+            'max_ms': round(max(latencies) * 1000, 2),
+        }
+    completed = sum(op['count'] for op in operations.values())
+    return {
+        'sessions': sessions,
+        'elapsed_s': round(elapsed, 2),
+        'throughput_ops': round(completed / elapsed, 1) if elapsed > 0 else 0,
+        'operations': operations,
+        'errors': dict(stats.errors),
+        'server': {name: counters_after.get(name, 0) - counters_before.get(name, 0) for name in counters_before},
+        'payments_applied': sum(int(amount / PAYMENT_AMOUNT) for amount in stats.applied.values()),
+        'lost_updates': lost_updates,
+        'lost_amount': lost_amount,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent cashier load test")
+    parser.add_argument('--sessions', type=int, default=20, help="simulated clerks")
+    parser.add_argument('--duration', type=float, default=30, help="seconds to run")
+    parser.add_argument('--think', type=float, default=0.5, help="mean think time between operations (s)")
+    parser.add_argument('--hot-payments', type=int, default=50, help="open payments the clerks work on")
+    parser.add_argument('--fee-ratio', type=float, default=0.3, help="share of operations that add fees")
+    parser.add_argument('--seed', type=int, default=127)
+    parser.add_argument('--keep', action='store_true', help="keep the changes made by the test")
+    args = parser.parse_args()
+
+    from tabulate import tabulate
+
+    results = run_load_test(args.sessions, args.duration, args.think, args.hot_payments, args.fee_ratio,
+                            seed=args.seed, keep=args.keep)
+
+    print(f"\nLoad test: {results['sessions']} sessions for {results['elapsed_s']}s")
+    print(tabulate([[name, op['count'], op['p50_ms'], op['p95_ms'], op['p99_ms'], op['max_ms']]
+                    for name, op in results['operations'].items()],
+                   headers=["Operation", "Count", "p50 ms", "p95 ms", "p99 ms", "Max ms"], tablefmt="grid"))
+    print(f"\nThroughput: {results['throughput_ops']} ops/sec")
+    print(f"Deadlocks: {results['errors'].get('deadlock', 0)} "
+          f"(server: {results['server'].get('Innodb_deadlocks', 0)})")
+    print(f"Lock wait timeouts: {results['errors'].get('lock_wait_timeout', 0)}")
+    print(f"Row lock waits (server): {results['server'].get('Innodb_row_lock_waits', 0)}, "
+          f"{results['server'].get('Innodb_row_lock_time', 0)}ms total")
+    print(f"Rejected operations: {results['errors'].get('rejected', 0)}")
+    print(f"Other errors: {results['errors'].get('other', 0)}")
+    print(f"Lost updates: {results['lost_updates']} of {results['payments_applied']} payments "
+          f"(₱{results['lost_amount']:.2f})")
+
+if __name__ == "__main__":
+    main()
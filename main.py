@@ -1,5 +1,6 @@
 # Main module for the Student Organization Management System
 
+import os
 import mysql.connector
 from datetime import datetime
 from typing import Tuple, Optional
@@ -8,17 +9,33 @@ from membership import MembershipManager
 from organization import OrganizationManager
 from fees import FeesManager
 from reports import AdvancedReports
+from student import StudentManager
+from session import UserSession
+from drivers import DEFAULT_DRIVER, connect
+from routing import ReportRouter
+
+DB_CONFIG = {
+    'host': "localhost",
+    'user': "admin",
+    'password': "admin",
+    'database': "studentorg",
+    'auth_plugin': 'mysql_native_password',
+}
+
+# mysql (pure Python), mysql-c (C extension) or mariadb; see drivers.py
+DB_DRIVER = os.environ.get('SOMS_DB_DRIVER', DEFAULT_DRIVER)
+
+# Reports run on this replica when set; see routing.py
+REPLICA_CONFIG = ({**DB_CONFIG, 'host': os.environ['SOMS_REPLICA_HOST'],
+                   'port': int(os.environ.get('SOMS_REPLICA_PORT', 3306))}
+                  if os.environ.get('SOMS_REPLICA_HOST') else None)
+# How many studentorg_log entries the replica may trail the primary by
+REPLICA_MAX_LAG = int(os.environ.get('SOMS_REPLICA_MAX_LAG', 100))
 
 class DatabaseManager:
-    def __init__(self):
+    def __init__(self, driver=None):
         try:
-            self.connection = mysql.connector.connect(
-                host="localhost",
-                user="admin",
-                password="admin",
-                database="studentorg",
-                auth_plugin='mysql_native_password'
-            )
+            self.connection = connect(driver or DB_DRIVER, **DB_CONFIG)
             self.cursor = self.connection.cursor(dictionary=True)
         except mysql.connector.Error as err:
             if err.errno == mysql.connector.errorcode.ER_ACCESS_DENIED_ERROR:
@@ -97,26 +114,17 @@ def search_student(db_manager: DatabaseManager, search_term: str) -> Optional[st
         print(f"✗ Error searching for student: {e}")
         return None
 
-def authenticate_user(db_manager: DatabaseManager, username: str, password: str) -> Tuple[bool, str]:
-    """Authenticate a user and return their role"""
+def authenticate_user(db_manager: DatabaseManager, username: str, password: str) -> Tuple[bool, Optional[UserSession]]:
+    """Authenticate a user and return their session"""
     # Check admin credentials
     if username == "admin" and password == "admin":
-        return True, "admin"
-    
-    # Check student credentials
-    query = """
-        SELECT s.stud_no, b.role, b.org_id, o.org_name
-        FROM student s
-        JOIN belongs_to b ON s.stud_no = b.stud_no
-        JOIN organization o ON b.org_id = o.org_id
-        WHERE s.stud_no = %s AND b.status = 'Active'
-    """
-    db_manager.cursor.execute(query, (username,))
-    result = db_manager.cursor.fetchone()
+        return True, UserSession(db_manager, username, is_admin=True)
     
-    if result:
-        return True, f"member_{result['role']}_{result['org_id']}"
-    return False, ""
+    # Check student credentials, loading all active memberships at once
+    session = UserSession(db_manager, username)
+    if session.memberships:
+        return True, session
+    return False, None
 
 def signup(db_manager: DatabaseManager) -> bool:
     """Handle student signup"""
@@ -150,8 +158,8 @@ def signup(db_manager: DatabaseManager) -> bool:
         print(f"\u2717 Error during signup: {e}")
         return False
 
-def login(db_manager: DatabaseManager) -> Tuple[bool, str]:
-    """Handle user login and return user role"""
+def login(db_manager: DatabaseManager) -> Tuple[bool, Optional[UserSession]]:
+    """Handle user login and return the user's session"""
     print("\n=== Login ===")
     print("1. Organization Login")
     print("2. Member Login")
@@ -161,17 +169,17 @@ def login(db_manager: DatabaseManager) -> Tuple[bool, str]:
     if choice == '1':
         username = input("Username: ")
         password = input("Password: ")
-        is_valid, role = authenticate_user(db_manager, username, password)
-        if is_valid and role == "admin":
+        is_valid, session = authenticate_user(db_manager, username, password)
+        if is_valid and session.is_admin:
             print("\u2713 Organization login successful!")
-            return True, role
+            return True, session
         else:
             print("\u2717 Invalid organization credentials!")
-            return False, ""
+            return False, None
 
     elif choice == '2':
         stud_no = input("Student Number: ")
-        is_valid, role = authenticate_user(db_manager, stud_no, "")
+        is_valid, session = authenticate_user(db_manager, stud_no, "")
         if not is_valid:
             # Check if student exists in the database
             db_manager.cursor.execute("SELECT stud_no FROM student WHERE stud_no = %s", (stud_no,))
@@ -180,13 +188,35 @@ def login(db_manager: DatabaseManager) -> Tuple[bool, str]:
                 print("\u2717 You are not yet an active organization member.")
             else:
                 print("\u2717 Invalid student number!")
-            return False, ""
+            return False, None
         else:
             print("\u2713 Login successful! Welcome to the organization.")
-            return True, role
+            return True, session
     else:
         print("Invalid choice!")
-        return False, ""
+        return False, None
+
+def switch_organization(session: UserSession) -> None:
+    """Let a member pick which of their organizations to work in"""
+    table_data = [[
+        row['org_id'],
+        row['org_name'],
+        row['role'],
+        f"{row['acad_year']} Sem {row['semester']}",
+        "*" if row['org_id'] == session.current_org_id else ""
+    ] for row in session.memberships]
+    print("\nYour Organizations:")
+    print(tabulate(table_data, headers=["ID", "Name", "Role", "Term", "Current"], tablefmt="grid"))
+
+    try:
+        org_id = int(input("\nEnter Organization ID: "))
+    except ValueError:
+        print("Please enter a valid number!")
+        return
+    if session.switch_org(org_id):
+        print(f"✓ Switched to {session.current_membership['org_name']}.")
+    else:
+        print("✗ You are not an active member of that organization.")
 
 def main():
     """Main function to run the Student Organization Management System"""
@@ -203,28 +233,32 @@ def main():
             choice = input("\nEnter your choice (1-3): ")
             
             if choice == '1':
-                is_valid, role = login(db_manager)
+                is_valid, session = login(db_manager)
                 if is_valid:
-                    # Initialize managers
+                    # Initialize managers; the menus read on the shared connection, so a report
+                    # can find it in a transaction and then reads on a connection of its own
+                    router = ReportRouter.from_config(db_manager, separate_primary=True)
                     membership_manager = MembershipManager(db_manager)
                     organization_manager = OrganizationManager(db_manager)
-                    fees_manager = FeesManager(db_manager)
-                    reports_manager = AdvancedReports(db_manager)
+                    fees_manager = FeesManager(db_manager, router=router)
+                    reports_manager = AdvancedReports(db_manager, router=router)
+                    student_manager = StudentManager(db_manager)
                     
                     while True:
                         print("\n" + "=" * 70)
                         print("                    MAIN MENU")
                         print("=" * 70)
                         
-                        if role == "admin":
+                        if session.is_admin:
                             print("1. Manage Members")
                             print("2. Manage Organizations")
                             print("3. Manage Fees")
                             print("4. Advanced Reports")
-                            print("5. Logout")
-                            print("6. Exit")
+                            print("5. Manage Students")
+                            print("6. Logout")
+                            print("7. Exit")
                             
-                            choice = input("\nEnter your choice (1-6): ")
+                            choice = input("\nEnter your choice (1-7): ")
                             
                             if choice == '1':
                                 membership_manager.manage_membership()
@@ -235,36 +269,46 @@ def main():
                             elif choice == '4':
                                 reports_manager.advanced_reports_menu()
                             elif choice == '5':
+                                student_manager.manage_students()
+                            elif choice == '6':
                                 print("\nLogging out...")
                                 print("✓ Successfully logged out!")
                                 break
-                            elif choice == '6':
+                            elif choice == '7':
                                 print("\nThank you for using the Student Organization Management System!")
                                 return
                             else:
                                 print("Invalid choice! Please try again.")
                         else:
                             # Organization member menu
-                            _, member_role, org_id = role.split("_")
+                            membership = session.current_membership
+                            if membership is None:
+                                print("✗ You are no longer an active organization member.")
+                                break
+                            org_id = membership['org_id']
+                            print(f"Organization: {membership['org_name']} ({session.role})")
                             print(f"1. View Organization Details")
                             print(f"2. View Member Fees")
                             print(f"3. View Organization Members")
-                            print(f"4. Logout")
-                            print(f"5. Exit")
+                            print(f"4. Switch Organization")
+                            print(f"5. Logout")
+                            print(f"6. Exit")
                             
-                            choice = input("\nEnter your choice (1-5): ")
+                            choice = input("\nEnter your choice (1-6): ")
                             
                             if choice == '1':
-                                organization_manager.view_organization_details(int(org_id))
+                                organization_manager.view_organization_details(org_id)
                             elif choice == '2':
                                 fees_manager.view_member_fees()
                             elif choice == '3':
-                                membership_manager.view_org_members(int(org_id))
+                                membership_manager.view_org_members(org_id)
                             elif choice == '4':
+                                switch_organization(session)
+                            elif choice == '5':
                                 print("\nLogging out...")
                                 print("✓ Successfully logged out!")
                                 break
-                            elif choice == '5':
+                            elif choice == '6':
                                 print("\nThank you for using the Student Organization Management System!")
                                 return
                             else:
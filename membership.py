@@ -1,5 +1,26 @@
+import csv
 from datetime import datetime
+from mysql.connector import errors
 from tabulate import tabulate
+from audit import BulkAudit, belongs_to_key
+from archive import live_and_archived
+from database import batched, iter_rows
+
+ROSTER_COLUMNS = ('stud_no', 'org_id', 'semester', 'acad_year', 'status', 'role', 'committee')
+
+def next_term(semester, acad_year):
+    """Return the (semester, acad_year) that follows the given term"""
+    if str(semester) == '1':
+        return '2', acad_year
+    start_year = int(acad_year.split('-')[0]) + 1
+    return '1', f"{start_year}-{start_year + 1}"
+
+def previous_term(semester, acad_year):
+    """Return the (semester, acad_year) that precedes the given term"""
+    if str(semester) == '2':
+        return '1', acad_year
+    start_year = int(acad_year.split('-')[0]) - 1
+    return '2', f"{start_year}-{start_year + 1}"
 
 class MembershipManager:
     def __init__(self, db_manager):
@@ -13,9 +34,11 @@ class MembershipManager:
             print("2. Update Member Status")
             print("3. View Member Details")
             print("4. View Organization Members")
-            print("5. Back to Main Menu")
+            print("5. Semester Rollover")
+            print("6. Import Roster (CSV)")
+            print("7. Back to Main Menu")
             
-            choice = input("\nEnter your choice (1-5): ")
+            choice = input("\nEnter your choice (1-7): ")
             
             if choice == '1':
                 self.add_member()
@@ -27,6 +50,10 @@ class MembershipManager:
                 org_id = input("Organization ID: ")
                 self.view_org_members(org_id)
             elif choice == '5':
+                self.rollover_semester()
+            elif choice == '6':
+                self.import_roster()
+            elif choice == '7':
                 break
 
     def add_member(self):
@@ -57,6 +84,14 @@ class MembershipManager:
         values = (stud_no, org_id, semester, acad_year, status, role, committee, datetime.now().year)
 
         try:
+            #checks the archive, which the primary key of belongs_to does not cover
+            self.db_manager.cursor.execute("""SELECT 1 FROM belongs_to_archive
+                                              WHERE stud_no = %s AND org_id = %s
+                                                AND semester = %s AND acad_year = %s""",
+                                           (stud_no, org_id, semester, acad_year))
+            if self.db_manager.cursor.fetchone():
+                print(f"✗ {stud_no} is already an archived member of organization {org_id} in that term.")
+                return
             self.db_manager.cursor.execute(query, values)
             self.db_manager.connection.commit()
             print("✓ Member added successfully!")
@@ -119,34 +154,300 @@ class MembershipManager:
                   WHERE b.org_id = %s
                   ORDER BY b.role, s.lastname, s.firstname"""
         
+        headers = ["Student No", "Name", "Role", "Status", "Gender",
+                   "Degree Program", "Batch Year", "Committee",
+                   "Organization", "Semester", "Academic Year"]
         try:
-            self.db_manager.cursor.execute(query, (org_id,))
-            results = self.db_manager.cursor.fetchall()
-            
-            if results:
-                # Convert results to list of lists for tabulate
-                table_data = [[
-                    row['stud_no'],
-                    row['full_name'],
-                    row['role'],
-                    row['status'],
-                    row['gender'],
-                    row['degrprog'],
-                    row['batch_year'],
-                    row['committee'],
-                    row['org_name'],
-                    row['semester'],
-                    row['acad_year']
-                ] for row in results]
-                
-                headers = ["Student No", "Name", "Role", "Status", "Gender", 
-                          "Degree Program", "Batch Year", "Committee", 
-                          "Organization", "Semester", "Academic Year"]
-                print("\nOrganization Members:")
-                print(tabulate(table_data, headers=headers, tablefmt="grid"))
-                print(f"\nTotal members: {len(results)}")
+            # Printed a page at a time so large organizations are never held in memory at once
+            total = 0
+            for page in batched(iter_rows(self.db_manager, query, (org_id,), compact=True)):
+                if not total:
+                    print("\nOrganization Members:")
+                # Compact records are already in column order, so they go to tabulate as they are
+                print(tabulate(page, headers=headers, tablefmt="grid"))
+                total += len(page)
+
+            if total:
+                print(f"\nTotal members: {total}")
             else:
                 print("No members found in this organization!")
                 
         except Exception as e:
-            print(f"✗ Error viewing organization members: {e}")
\ No newline at end of file
+            print(f"✗ Error viewing organization members: {e}")
+
+    def rollover_members(self, from_semester, from_acad_year, to_semester, to_acad_year,
+                         status='Active', org_id=None, dry_run=False, per_row_audit=False):
+        """Copy matching memberships into the target term with one INSERT ... SELECT.
+
+        Returns a summary dict with the number of eligible, already enrolled
+        and inserted rows. Nothing is written when dry_run is True. The
+        per-row audit triggers are replaced by one summary log row unless
+        per_row_audit is True. The rollover runs in its own transaction, so
+        the connection must not have one open: ProgrammingError otherwise.
+        """
+        filters = "b.semester = %s AND b.acad_year = %s AND b.status = %s"
+        params = [from_semester, from_acad_year, status]
+        if org_id:
+            filters += " AND b.org_id = %s"
+            params.append(org_id)
+
+        # Memberships of the target term, archived ones included, count as already enrolled
+        target_term = live_and_archived('belongs_to', "t.semester = %s AND t.acad_year = %s", 't')
+        count_query = f"""SELECT COUNT(*) AS eligible,
+                                COALESCE(SUM(t.stud_no IS NOT NULL), 0) AS already_enrolled
+                         FROM belongs_to b
+                         LEFT JOIN {target_term} ON t.stud_no = b.stud_no AND t.org_id = b.org_id
+                         WHERE {filters}"""
+        insert_query = f"""INSERT INTO belongs_to (stud_no, org_id, semester, acad_year, status, role, committee, batch_year)
+                          SELECT b.stud_no, b.org_id, %s, %s, b.status, b.role, b.committee, b.batch_year
+                          FROM belongs_to b
+                          WHERE {filters}
+                            AND NOT EXISTS (SELECT 1 FROM {target_term}
+                                            WHERE t.stud_no = b.stud_no AND t.org_id = b.org_id)"""
+        range_query = f"""SELECT MIN(CONCAT(b.stud_no, '-', b.org_id, '-', %s, '-', %s)) AS first_key,
+                                MAX(CONCAT(b.stud_no, '-', b.org_id, '-', %s, '-', %s)) AS last_key
+                         FROM belongs_to b
+                         WHERE {filters}"""
+        target = [to_semester, to_acad_year]
+
+        connection = self.db_manager.connection
+        cursor = self.db_manager.cursor
+        if connection.in_transaction:
+            raise errors.ProgrammingError(msg="Rollover needs a connection without an open transaction; "
+                                              "commit or roll back the pending work first")
+        connection.start_transaction()
+        try:
+            cursor.execute(count_query, target * 2 + params)
+            counts = cursor.fetchone()
+            summary = {
+                'eligible': int(counts['eligible']),
+                'already_enrolled': int(counts['already_enrolled']),
+                'inserted': 0,
+            }
+            if dry_run:
+                connection.rollback()
+                return summary
+            with BulkAudit(self.db_manager, 'belongs_to', per_row=per_row_audit) as audit:
+                cursor.execute(insert_query, target + params + target * 2)
+                summary['inserted'] = cursor.rowcount
+                cursor.execute(range_query, target + target + params)
+                bounds = cursor.fetchone()
+                audit.record('INSERT', bounds['first_key'], bounds['last_key'], summary['inserted'])
+            connection.commit()
+            return summary
+        except Exception:
+            connection.rollback()
+            raise
+
+    def rollover_semester(self):
+        """Carry memberships forward into the next semester"""
+        print("\n=== Semester Rollover ===")
+        org_id = input("Organization ID (press Enter for all organizations): ").strip() or None
+        from_semester = input("From Semester (1/2): ").strip()
+        from_acad_year = input("From Academic Year (YYYY-YYYY): ").strip()
+        status = input("Status to carry forward (default Active): ").strip() or 'Active'
+
+        try:
+            default_semester, default_acad_year = next_term(from_semester, from_acad_year)
+        except (ValueError, IndexError):
+            print("✗ Invalid academic year.")
+            return
+        to_semester = input(f"To Semester [{default_semester}]: ").strip() or default_semester
+        to_acad_year = input(f"To Academic Year [{default_acad_year}]: ").strip() or default_acad_year
+
+        preview_query = """SELECT b.stud_no,
+                                 CONCAT(s.firstname, ' ', s.lastname) AS full_name,
+                                 o.org_name, b.role, b.committee
+                          FROM belongs_to b
+                          JOIN student s ON b.stud_no = s.stud_no
+                          JOIN organization o ON b.org_id = o.org_id
+                          WHERE b.semester = %s AND b.acad_year = %s AND b.status = %s"""
+        params = [from_semester, from_acad_year, status]
+        if org_id:
+            preview_query += " AND b.org_id = %s"
+            params.append(org_id)
+        preview_query += " ORDER BY o.org_name, b.role, s.lastname LIMIT 20"
+
+        try:
+            self.db_manager.cursor.execute(preview_query, params)
+            preview = self.db_manager.cursor.fetchall()
+            # The preview only read; end its transaction so the rollover can start its own
+            self.db_manager.connection.commit()
+            summary = self.rollover_members(from_semester, from_acad_year, to_semester, to_acad_year,
+                                            status=status, org_id=org_id, dry_run=True)
+
+            if not summary['eligible']:
+                print("No memberships found to carry forward.")
+                return
+
+            table_data = [[
+                row['stud_no'],
+                row['full_name'],
+                row['org_name'],
+                row['role'],
+                row['committee']
+            ] for row in preview]
+            print(f"\nDry run: {from_acad_year} Sem {from_semester} -> {to_acad_year} Sem {to_semester}")
+            print(tabulate(table_data, headers=["Student No", "Name", "Organization", "Role", "Committee"],
+                           tablefmt="grid"))
+            if summary['eligible'] > len(preview):
+                print(f"... and {summary['eligible'] - len(preview)} more")
+            print(f"\nEligible memberships: {summary['eligible']}")
+            print(f"Already enrolled in target term: {summary['already_enrolled']}")
+            print(f"To be inserted: {summary['eligible'] - summary['already_enrolled']}")
+
+            if input("\nProceed with rollover? (y/N): ").strip().lower() != 'y':
+                print("Rollover cancelled.")
+                return
+
+            summary = self.rollover_members(from_semester, from_acad_year, to_semester, to_acad_year,
+                                            status=status, org_id=org_id)
+            print(f"✓ Rollover complete! {summary['inserted']} memberships carried forward, "
+                  f"{summary['already_enrolled']} already enrolled.")
+        except Exception as e:
+            print(f"✗ Error during rollover: {e}")
+
+    def load_roster(self, csv_file, batch_size=500, per_row_audit=False):
+        """Import memberships from a CSV roster in a single pass over the file.
+
+        Each batch is staged in a temporary table, validated against student,
+        organization and belongs_to with one join, and inserted with one
+        INSERT ... SELECT that is audited with a single summary log row.
+        Returns a summary dict of inserted and rejected rows.
+        """
+        summary = {
+            'read': 0,
+            'inserted': 0,
+            'invalid': [],
+            'missing_students': [],
+            'missing_orgs': [],
+            'duplicates': [],
+        }
+        cursor = self.db_manager.cursor
+        connection = self.db_manager.connection
+
+        cursor.execute("""CREATE TEMPORARY TABLE IF NOT EXISTS roster_import (
+                              line_no INT PRIMARY KEY,
+                              stud_no VARCHAR(10),
+                              org_id INT(10),
+                              semester VARCHAR(1),
+                              acad_year VARCHAR(9),
+                              status VARCHAR(50),
+                              role VARCHAR(50),
+                              committee VARCHAR(50)
+                          )""")
+
+        validate_query = """SELECT r.line_no, r.stud_no, r.org_id, r.semester, r.acad_year,
+                                   s.stud_no IS NULL AS missing_student,
+                                   o.org_id IS NULL AS missing_org,
+                                   b.stud_no IS NOT NULL OR a.stud_no IS NOT NULL AS duplicate
+                            FROM roster_import r
+                            LEFT JOIN student s ON s.stud_no = r.stud_no
+                            LEFT JOIN organization o ON o.org_id = r.org_id
+                            LEFT JOIN belongs_to b ON b.stud_no = r.stud_no AND b.org_id = r.org_id
+                                                  AND b.semester = r.semester AND b.acad_year = r.acad_year
+                            LEFT JOIN belongs_to_archive a ON a.stud_no = r.stud_no AND a.org_id = r.org_id
+                                                          AND a.semester = r.semester AND a.acad_year = r.acad_year
+                            WHERE s.stud_no IS NULL OR o.org_id IS NULL OR b.stud_no IS NOT NULL
+                               OR a.stud_no IS NOT NULL"""
+        insert_query = """INSERT INTO belongs_to (stud_no, org_id, semester, acad_year, status, role, committee, batch_year)
+                          SELECT r.stud_no, r.org_id, r.semester, r.acad_year, r.status, r.role, r.committee, %s
+                          FROM roster_import r
+                          JOIN student s ON s.stud_no = r.stud_no
+                          JOIN organization o ON o.org_id = r.org_id
+                          WHERE NOT EXISTS (SELECT 1 FROM belongs_to b
+                                            WHERE b.stud_no = r.stud_no AND b.org_id = r.org_id
+                                              AND b.semester = r.semester AND b.acad_year = r.acad_year)
+                            AND NOT EXISTS (SELECT 1 FROM belongs_to_archive a
+                                            WHERE a.stud_no = r.stud_no AND a.org_id = r.org_id
+                                              AND a.semester = r.semester AND a.acad_year = r.acad_year)"""
+        stage_query = f"""INSERT INTO roster_import (line_no, {', '.join(ROSTER_COLUMNS)})
+                          VALUES ({', '.join(['%s'] * (len(ROSTER_COLUMNS) + 1))})"""
+
+        def flush(batch, audit):
+            cursor.execute("DELETE FROM roster_import")
+            cursor.executemany(stage_query, batch)
+            cursor.execute(validate_query)
+            rejected = set()
+            for row in cursor.fetchall():
+                rejected.add(row['line_no'])
+                key = (row['line_no'], row['stud_no'], row['org_id'], row['semester'], row['acad_year'])
+                if row['missing_student']:
+                    summary['missing_students'].append(key)
+                elif row['missing_org']:
+                    summary['missing_orgs'].append(key)
+                else:
+                    summary['duplicates'].append(key)
+            cursor.execute(insert_query, (datetime.now().year,))
+            audit.record_keys('INSERT', [belongs_to_key(*row[1:5]) for row in batch if row[0] not in rejected],
+                              cursor.rowcount)
+            summary['inserted'] += cursor.rowcount
+            connection.commit()
+
+        seen = set()
+        batch = []
+        reader = csv.DictReader(csv_file)
+        try:
+            with BulkAudit(self.db_manager, 'belongs_to', per_row=per_row_audit) as audit:
+                for record in reader:
+                    summary['read'] += 1
+                    line_no = reader.line_num
+                    try:
+                        values = [(record.get(column) or '').strip() for column in ROSTER_COLUMNS]
+                        values[1] = int(values[1])
+                    except (ValueError, AttributeError):
+                        summary['invalid'].append((line_no, record.get('stud_no'), record.get('org_id'),
+                                                   record.get('semester'), record.get('acad_year')))
+                        continue
+                    if not all(values[:4]):
+                        summary['invalid'].append((line_no, *values[:4]))
+                        continue
+
+                    key = tuple(values[:4])
+                    if key in seen:
+                        summary['duplicates'].append((line_no, *key))
+                        continue
+                    seen.add(key)
+
+                    batch.append([line_no] + [value or None for value in values])
+                    if len(batch) >= batch_size:
+                        flush(batch, audit)
+                        batch = []
+                if batch:
+                    flush(batch, audit)
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            cursor.execute("DROP TEMPORARY TABLE IF EXISTS roster_import")
+        return summary
+
+    def import_roster(self):
+        """Import a membership roster from a CSV file"""
+        print("\n=== Import Roster ===")
+        print(f"Expected CSV header: {','.join(ROSTER_COLUMNS)}")
+        path = input("CSV file path: ").strip()
+
+        try:
+            with open(path, newline='', encoding='utf-8') as csv_file:
+                summary = self.load_roster(csv_file)
+        except OSError as e:
+            print(f"✗ Could not read file: {e}")
+            return
+        except Exception as e:
+            print(f"✗ Error importing roster: {e}")
+            return
+
+        headers = ["Line", "Student No", "Org ID", "Semester", "Academic Year"]
+        for title, key in (("Invalid rows", 'invalid'),
+                           ("Missing students", 'missing_students'),
+                           ("Missing organizations", 'missing_orgs'),
+                           ("Duplicate memberships", 'duplicates')):
+            if summary[key]:
+                print(f"\n{title}:")
+                print(tabulate(sorted(summary[key], key=lambda row: row[0]), headers=headers, tablefmt="grid"))
+
+        rejected = sum(len(summary[key]) for key in ('invalid', 'missing_students', 'missing_orgs', 'duplicates'))
+        print(f"\nRows read: {summary['read']}")
+        print(f"Rows rejected: {rejected}")
+        print(f"✓ Memberships imported: {summary['inserted']}")
@@ -4,11 +4,75 @@ Advanced reports module for the Student Organization Management System
 
 from mysql.connector import Error
 from tabulate import tabulate
-from datetime import datetime
+from collections import Counter
+from datetime import date, datetime
+from decimal import Decimal
+from archive import live_and_archived
+from database import DEFAULT_BATCH_SIZE, fetch_rows
+from history import AS_OF, as_of_cutoff, iso_date
+
+# Report name -> (method, [(parameter, type, required)]) for non-interactive callers
+REPORTS = {
+    'members-by-criteria': ('members_by_criteria', [('org_id', int, True), ('role', str, False),
+                                                    ('status', str, False), ('gender', str, False),
+                                                    ('degrprog', str, False), ('batch_year', int, False)]),
+    'unpaid-fees': ('unpaid_fees_by_semester', [('org_id', int, True), ('acad_year', str, True),
+                                                ('semester', int, True)]),
+    'member-unpaid-fees': ('member_unpaid_fees', [('stud_no', str, True)]),
+    'executive-committee': ('executive_committee', [('org_id', int, True), ('acad_year', str, True)]),
+    'role-history': ('role_history', [('org_id', int, True), ('role', str, True)]),
+    'late-payments': ('late_payments', [('org_id', int, True), ('acad_year', str, True), ('semester', int, True)]),
+    'active-inactive': ('active_inactive_percentage', [('org_id', int, True), ('n_semesters', int, True)]),
+    'alumni': ('alumni_members', [('org_id', int, True), ('as_of_date', iso_date, True)]),
+    'fees-summary': ('fees_summary_by_date', [('org_id', int, True), ('as_of_date', iso_date, True)]),
+    'highest-debt': ('highest_debt', [('org_id', int, True), ('acad_year', str, True), ('semester', int, True)]),
+    'member-facets': ('member_facets', [('org_id', int, True), ('acad_year', str, False), ('semester', int, False)]),
+    'members-drilldown': ('members_by_facets', [('org_id', int, True), ('acad_year', str, False),
+                                                ('semester', int, False), ('role', str, False),
+                                                ('status', str, False), ('gender', str, False),
+                                                ('degrprog', str, False), ('batch_year', int, False)]),
+    'activity-trend': ('activity_trend', [('org_id', int, False)]),
+    'top-debtors': ('top_debtors', [('k', int, False), ('org_id', int, False), ('from_acad_year', str, False),
+                                    ('to_acad_year', str, False), ('min_balance', Decimal, False)]),
+}
+
+# Member attributes counted by member_facets, as (facet, column)
+MEMBER_FACETS = (('role', 'b.role'), ('status', 'b.status'), ('gender', 's.gender'),
+                 ('degrprog', 's.degrprog'), ('batch_year', 'b.batch_year'))
+
+def acad_year_start(acad_year):
+    """The start year of a YYYY-YYYY academic year; ValueError for anything else"""
+    start, _, end = str(acad_year).partition('-')
+    if not (len(start) == 4 and start.isdigit() and end.isdigit() and int(end) == int(start) + 1):
+        raise ValueError(f"Invalid academic year: {acad_year!r} (expected YYYY-YYYY)")
+    return int(start)
 
 class AdvancedReports:
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, stream=False, batch_size=DEFAULT_BATCH_SIZE, compact=False, router=None):
         self.db = db_manager
+        # When stream is True the report methods return generators that fetch batch_size rows at a time
+        self.stream = stream
+        self.batch_size = batch_size
+        # When compact is True rows are tuple records (database.record_type) instead of dicts
+        self.compact = compact
+        # A routing.ReportRouter runs the report queries in read-only snapshots, on a replica if configured
+        self.router = router
+
+    def _rows(self, query, params=()):
+        options = {'stream': self.stream, 'batch_size': self.batch_size, 'compact': self.compact}
+        if self.router:
+            return self.router.fetch_rows(query, params, **options)
+        return fetch_rows(self.db, query, params, **options)
+
+    def run_report(self, name, **params):
+        """Run a report from REPORTS by name with keyword parameters"""
+        method, _ = REPORTS[name]
+        return getattr(self, method)(**params)
+
+    def list_organizations(self):
+        """All organizations as (org_id, org_name) rows"""
+        self.db.cursor.execute("SELECT org_id, org_name FROM organization ORDER BY org_id")
+        return self.db.cursor.fetchall()
     
     def advanced_reports_menu(self):
         """Advanced reports menu with all 10 reporting features"""
@@ -26,9 +90,12 @@ class AdvancedReports:
             print("8.  View alumni members as of specific date")
             print("9.  View total unpaid/paid fees as of specific date")
             print("10. View members with highest debt for specific semester")
-            print("11. Back to main menu")
+            print("11. View member breakdown (role, status, gender, program, batch) and drill down")
+            print("12. View activity and retention trend across all terms")
+            print("13. View top debtors (one organization or university-wide)")
+            print("14. Back to main menu")
             
-            choice = input("\nEnter your choice (1-11): ")
+            choice = input("\nEnter your choice (1-14): ")
             
             if choice == '1':
                 self.view_members_by_criteria()
@@ -51,6 +118,12 @@ class AdvancedReports:
             elif choice == '10':
                 self.view_highest_debt()
             elif choice == '11':
+                self.view_member_facets()
+            elif choice == '12':
+                self.view_activity_trend()
+            elif choice == '13':
+                self.view_top_debtors()
+            elif choice == '14':
                 break
             else:
                 print("Invalid choice! Please try again.")
@@ -76,35 +149,8 @@ class AdvancedReports:
             degprog_filter = input("Degree Program: ")
             batch_filter = input("Batch Year: ")
             
-            # Build dynamic query
-            base_query = """SELECT s.stud_no, s.firstname, s.lastname, s.gender, s.degrprog,
-                                  b.role, b.status, b.committee, b.batch_year, b.semester
-                           FROM student s
-                           JOIN belongs_to b ON s.stud_no = b.stud_no
-                           WHERE b.org_id = %s"""
-            
-            params = [org_id]
-            
-            if role_filter:
-                base_query += " AND b.role LIKE %s"
-                params.append(f"%{role_filter}%")
-            if status_filter:
-                base_query += " AND b.status LIKE %s"
-                params.append(f"%{status_filter}%")
-            if gender_filter:
-                base_query += " AND s.gender = %s"
-                params.append(gender_filter.upper())
-            if degprog_filter:
-                base_query += " AND s.degrprog LIKE %s"
-                params.append(f"%{degprog_filter}%")
-            if batch_filter:
-                base_query += " AND b.batch_year = %s"
-                params.append(int(batch_filter))
-            
-            base_query += " ORDER BY b.batch_year DESC, b.semester DESC, b.role, s.lastname, s.firstname"
-            
-            self.db.cursor.execute(base_query, params)
-            results = self.db.cursor.fetchall()
+            results = self.members_by_criteria(org_id, role_filter, status_filter, gender_filter,
+                                               degprog_filter, int(batch_filter) if batch_filter else None)
             
             if results:
                 # Convert dictionary results to list of lists
@@ -134,6 +180,36 @@ class AdvancedReports:
         except Error as e:
             print(f"✗ Error viewing members: {e}")
     
+    def members_by_criteria(self, org_id, role=None, status=None, gender=None, degrprog=None, batch_year=None):
+        """Members of an organization, optionally filtered by role, status, gender, degree program and batch"""
+        base_query = """SELECT s.stud_no, s.firstname, s.lastname, s.gender, s.degrprog,
+                              b.role, b.status, b.committee, b.batch_year, b.semester
+                       FROM student s
+                       JOIN belongs_to b ON s.stud_no = b.stud_no
+                       WHERE b.org_id = %s"""
+
+        params = [org_id]
+
+        if role:
+            base_query += " AND b.role LIKE %s"
+            params.append(f"%{role}%")
+        if status:
+            base_query += " AND b.status LIKE %s"
+            params.append(f"%{status}%")
+        if gender:
+            base_query += " AND s.gender = %s"
+            params.append(gender.upper())
+        if degrprog:
+            base_query += " AND s.degrprog LIKE %s"
+            params.append(f"%{degrprog}%")
+        if batch_year:
+            base_query += " AND b.batch_year = %s"
+            params.append(int(batch_year))
+
+        base_query += " ORDER BY b.batch_year DESC, b.semester DESC, b.role, s.lastname, s.firstname"
+
+        return self._rows(base_query, params)
+
     def view_unpaid_fees_by_semester(self):
         """2. View members with unpaid fees for specific semester/year"""
         print("\n=== Members with Unpaid Fees by Semester ===")
@@ -150,29 +226,7 @@ class AdvancedReports:
             acad_year = input("Academic Year (YYYY-YYYY): ")
             semester = int(input("Semester (1 or 2): "))
             
-            # Direct query for more detailed information
-            query = """SELECT s.stud_no, 
-                             CONCAT(s.firstname, ' ', s.lastname) AS name,
-                             p.payment_status,
-                             p.amount,
-                             p.amount_paid,
-                             p.due_date,
-                             DATEDIFF(CURRENT_DATE, p.due_date) as days_overdue,
-                             b.semester,
-                             b.acad_year,
-                             o.org_name
-                      FROM payment p
-                      JOIN student s ON s.stud_no = p.stud_no
-                      JOIN organization o ON o.org_id = p.org_id
-                      JOIN belongs_to b ON b.stud_no = p.stud_no AND b.org_id = p.org_id
-                      WHERE p.payment_status = 'Unpaid'
-                        AND b.semester = %s
-                        AND b.acad_year = %s
-                        AND o.org_id = %s
-                      ORDER BY days_overdue DESC, p.due_date ASC"""
-            
-            self.db.cursor.execute(query, (semester, acad_year, org_id))
-            results = self.db.cursor.fetchall()
+            results = self.unpaid_fees_by_semester(org_id, acad_year, semester)
             
             if results:
                 # Convert dictionary results to list of lists
@@ -206,33 +260,36 @@ class AdvancedReports:
         except Error as e:
             print(f"✗ Error viewing unpaid fees: {e}")
     
+    def unpaid_fees_by_semester(self, org_id, acad_year, semester):
+        """Members with unpaid fees in an organization for a semester"""
+        memberships = live_and_archived('belongs_to', "b.org_id = %s AND b.acad_year = %s AND b.semester = %s", 'b')
+        query = f"""SELECT s.stud_no, 
+                         CONCAT(s.firstname, ' ', s.lastname) AS name,
+                         p.payment_status,
+                         p.amount,
+                         p.amount_paid,
+                         p.due_date,
+                         DATEDIFF(CURRENT_DATE, p.due_date) as days_overdue,
+                         b.semester,
+                         b.acad_year,
+                         o.org_name
+                  FROM payment p
+                  JOIN student s ON s.stud_no = p.stud_no
+                  JOIN organization o ON o.org_id = p.org_id
+                  JOIN {memberships} ON b.stud_no = p.stud_no AND b.org_id = p.org_id
+                  WHERE p.payment_status = 'Unpaid'
+                    AND o.org_id = %s
+                  ORDER BY days_overdue DESC, p.due_date ASC"""
+
+        return self._rows(query, (org_id, acad_year, semester) * 2 + (org_id,))
+
     def view_member_unpaid_fees(self):
         """3. View member's unpaid fees across all organizations"""
         print("\n=== Member's Unpaid Fees (All Organizations) ===")
         try:
             stud_no = input("Student Number: ")
             
-            # Direct query for detailed fee information
-            query = """SELECT s.stud_no,
-                             CONCAT(s.firstname, ' ', s.lastname) AS name,
-                             o.org_name,
-                             p.amount,
-                             p.amount_paid,
-                             p.payment_status,
-                             p.due_date,
-                             DATEDIFF(CURRENT_DATE, p.due_date) as days_overdue,
-                             b.acad_year,
-                             b.semester
-                      FROM payment p
-                      JOIN student s ON p.stud_no = s.stud_no
-                      JOIN organization o ON p.org_id = o.org_id
-                      JOIN belongs_to b ON b.stud_no = s.stud_no AND b.org_id = o.org_id
-                      WHERE p.payment_status = 'Unpaid'
-                        AND s.stud_no = %s
-                      ORDER BY p.due_date ASC"""
-            
-            self.db.cursor.execute(query, (stud_no,))
-            results = self.db.cursor.fetchall()
+            results = self.member_unpaid_fees(stud_no)
             
             if results:
                 # Convert dictionary results to list of lists
@@ -264,6 +321,28 @@ class AdvancedReports:
         except Error as e:
             print(f"✗ Error viewing member unpaid fees: {e}")
     
+    def member_unpaid_fees(self, stud_no):
+        """A member's unpaid fees across all organizations"""
+        query = """SELECT s.stud_no,
+                         CONCAT(s.firstname, ' ', s.lastname) AS name,
+                         o.org_name,
+                         p.amount,
+                         p.amount_paid,
+                         p.payment_status,
+                         p.due_date,
+                         DATEDIFF(CURRENT_DATE, p.due_date) as days_overdue,
+                         b.acad_year,
+                         b.semester
+                  FROM payment p
+                  JOIN student s ON p.stud_no = s.stud_no
+                  JOIN organization o ON p.org_id = o.org_id
+                  LEFT JOIN belongs_to b ON b.stud_no = s.stud_no AND b.org_id = o.org_id
+                  WHERE p.payment_status = 'Unpaid'
+                    AND s.stud_no = %s
+                  ORDER BY p.due_date ASC"""
+
+        return self._rows(query, (stud_no,))
+
     def view_executive_committee(self):
         """4. View executive committee members for specific year"""
         print("\n=== Executive Committee Members ===")
@@ -279,33 +358,7 @@ class AdvancedReports:
             org_id = int(input("Organization ID: "))
             acad_year = input("Academic Year (YYYY-YYYY): ")
             
-            # Direct query for executive committee
-            query = """SELECT s.stud_no,
-                             CONCAT(s.firstname, ' ', s.lastname) AS name,
-                             b.role,
-                             b.committee,
-                             b.semester,
-                             b.acad_year,
-                             o.org_name
-                      FROM belongs_to b
-                      JOIN student s ON b.stud_no = s.stud_no
-                      JOIN organization o ON b.org_id = o.org_id
-                      WHERE b.org_id = %s
-                        AND b.acad_year = %s
-                        AND b.role IN ('President', 'Vice President', 'Secretary', 'Treasurer', 'Auditor')
-                      ORDER BY 
-                        CASE b.role
-                            WHEN 'President' THEN 1
-                            WHEN 'Vice President' THEN 2
-                            WHEN 'Secretary' THEN 3
-                            WHEN 'Treasurer' THEN 4
-                            WHEN 'Auditor' THEN 5
-                            ELSE 6
-                        END,
-                        b.semester"""
-            
-            self.db.cursor.execute(query, (org_id, acad_year))
-            results = self.db.cursor.fetchall()
+            results = self.executive_committee(org_id, acad_year)
             
             if results:
                 # Convert dictionary results to list of lists
@@ -330,6 +383,33 @@ class AdvancedReports:
         except Error as e:
             print(f"✗ Error viewing executive committee: {e}")
     
+    def executive_committee(self, org_id, acad_year):
+        """Executive committee members of an organization for an academic year"""
+        memberships = live_and_archived('belongs_to', "b.org_id = %s AND b.acad_year = %s", 'b')
+        query = f"""SELECT s.stud_no,
+                         CONCAT(s.firstname, ' ', s.lastname) AS name,
+                         b.role,
+                         b.committee,
+                         b.semester,
+                         b.acad_year,
+                         o.org_name
+                  FROM {memberships}
+                  JOIN student s ON b.stud_no = s.stud_no
+                  JOIN organization o ON b.org_id = o.org_id
+                  WHERE b.role IN ('President', 'Vice President', 'Secretary', 'Treasurer', 'Auditor')
+                  ORDER BY 
+                    CASE b.role
+                        WHEN 'President' THEN 1
+                        WHEN 'Vice President' THEN 2
+                        WHEN 'Secretary' THEN 3
+                        WHEN 'Treasurer' THEN 4
+                        WHEN 'Auditor' THEN 5
+                        ELSE 6
+                    END,
+                    b.semester"""
+
+        return self._rows(query, (org_id, acad_year) * 2)
+
     def view_role_history(self):
         """5. View all Presidents (or any role) by year (chronological)"""
         print("\n=== Role History (Chronological) ===")
@@ -345,23 +425,7 @@ class AdvancedReports:
             org_id = int(input("Organization ID: "))
             role = input("Role to search (e.g., President, Secretary): ")
             
-            # Direct query for role history
-            query = """SELECT s.stud_no,
-                             CONCAT(s.firstname, ' ', s.lastname) AS name,
-                             b.role,
-                             b.acad_year,
-                             b.semester,
-                             b.committee,
-                             o.org_name
-                      FROM belongs_to b
-                      JOIN student s ON b.stud_no = s.stud_no
-                      JOIN organization o ON b.org_id = o.org_id
-                      WHERE b.org_id = %s
-                        AND b.role LIKE %s
-                      ORDER BY b.acad_year DESC, b.semester DESC"""
-            
-            self.db.cursor.execute(query, (org_id, f"%{role}%"))
-            results = self.db.cursor.fetchall()
+            results = self.role_history(org_id, role)
             
             if results:
                 # Convert dictionary results to list of lists
@@ -386,6 +450,23 @@ class AdvancedReports:
         except Error as e:
             print(f"✗ Error viewing role history: {e}")
     
+    def role_history(self, org_id, role):
+        """Everyone who held a role in an organization, most recent first"""
+        memberships = live_and_archived('belongs_to', "b.org_id = %s AND b.role LIKE %s", 'b')
+        query = f"""SELECT s.stud_no,
+                         CONCAT(s.firstname, ' ', s.lastname) AS name,
+                         b.role,
+                         b.acad_year,
+                         b.semester,
+                         b.committee,
+                         o.org_name
+                  FROM {memberships}
+                  JOIN student s ON b.stud_no = s.stud_no
+                  JOIN organization o ON b.org_id = o.org_id
+                  ORDER BY b.acad_year DESC, b.semester DESC"""
+
+        return self._rows(query, (org_id, f"%{role}%") * 2)
+
     def view_late_payments(self):
         """6. View late payments for specific semester/year"""
         print("\n=== Late Payments Report ===")
@@ -402,28 +483,7 @@ class AdvancedReports:
             acad_year = input("Academic Year (YYYY-YYYY): ")
             semester = int(input("Semester (1 or 2): "))
             
-            # Direct query for late payments
-            query = """SELECT s.stud_no,
-                             CONCAT(s.firstname, ' ', s.lastname) AS name,
-                             p.amount - COALESCE(p.amount_paid, 0) as late_payment,
-                             CONCAT(b.acad_year, ' - ', b.semester) as ay_sem,
-                             p.due_date,
-                             p.payment_date,
-                             DATEDIFF(p.payment_date, p.due_date) as days_late,
-                             o.org_name
-                      FROM payment p
-                      JOIN student s ON p.stud_no = s.stud_no
-                      JOIN organization o ON p.org_id = o.org_id
-                      JOIN belongs_to b ON b.stud_no = p.stud_no AND b.org_id = p.org_id
-                      WHERE p.org_id = %s
-                        AND b.acad_year = %s
-                        AND b.semester = %s
-                        AND p.payment_status = 'Partial'
-                        AND p.payment_date > p.due_date
-                      ORDER BY days_late DESC, p.payment_date DESC"""
-            
-            self.db.cursor.execute(query, (org_id, acad_year, semester))
-            results = self.db.cursor.fetchall()
+            results = self.late_payments(org_id, acad_year, semester)
             
             if results:
                 # Convert dictionary results to list of lists
@@ -456,6 +516,28 @@ class AdvancedReports:
         except Error as e:
             print(f"✗ Error viewing late payments: {e}")
     
+    def late_payments(self, org_id, acad_year, semester):
+        """Late partial payments in an organization for a semester"""
+        memberships = live_and_archived('belongs_to', "b.org_id = %s AND b.acad_year = %s AND b.semester = %s", 'b')
+        query = f"""SELECT s.stud_no,
+                         CONCAT(s.firstname, ' ', s.lastname) AS name,
+                         p.amount - COALESCE(p.amount_paid, 0) as late_payment,
+                         CONCAT(b.acad_year, ' - ', b.semester) as ay_sem,
+                         p.due_date,
+                         p.payment_date,
+                         DATEDIFF(p.payment_date, p.due_date) as days_late,
+                         o.org_name
+                  FROM payment p
+                  JOIN student s ON p.stud_no = s.stud_no
+                  JOIN organization o ON p.org_id = o.org_id
+                  JOIN {memberships} ON b.stud_no = p.stud_no AND b.org_id = p.org_id
+                  WHERE p.org_id = %s
+                    AND p.payment_status = 'Partial'
+                    AND p.payment_date > p.due_date
+                  ORDER BY days_late DESC, p.payment_date DESC"""
+
+        return self._rows(query, (org_id, acad_year, semester) * 2 + (org_id,))
+
     def view_active_inactive_percentage(self):
         """7. View active vs inactive members percentage (last n semesters)"""
         print("\n=== Active vs Inactive Members Percentage ===")
@@ -471,21 +553,7 @@ class AdvancedReports:
             org_id = int(input("Organization ID: "))
             n_semesters = int(input("Number of semesters to analyze: "))
             
-            # Direct query for membership activity
-            query = """SELECT 
-                         acad_year,
-                         semester,
-                         COUNT(*) as total_members,
-                         SUM(CASE WHEN status = 'Active' THEN 1 ELSE 0 END) as active_members,
-                         SUM(CASE WHEN status IN ('Inactive', 'Alumni') THEN 1 ELSE 0 END) as inactive_members
-                      FROM belongs_to
-                      WHERE org_id = %s
-                      GROUP BY acad_year, semester
-                      ORDER BY acad_year DESC, semester DESC
-                      LIMIT %s"""
-            
-            self.db.cursor.execute(query, (org_id, n_semesters))
-            results = self.db.cursor.fetchall()
+            results = self.active_inactive_percentage(org_id, n_semesters)
             
             if results:
                 table_data = []
@@ -523,6 +591,21 @@ class AdvancedReports:
         except Error as e:
             print(f"✗ Error viewing active/inactive percentage: {e}")
     
+    def active_inactive_percentage(self, org_id, n_semesters):
+        """Active and inactive member counts for the last n semesters"""
+        query = f"""SELECT 
+                     acad_year,
+                     semester,
+                     COUNT(*) as total_members,
+                     SUM(CASE WHEN status = 'Active' THEN 1 ELSE 0 END) as active_members,
+                     SUM(CASE WHEN status IN ('Inactive', 'Alumni') THEN 1 ELSE 0 END) as inactive_members
+                  FROM {live_and_archived('belongs_to', "b.org_id = %s", 'b')}
+                  GROUP BY acad_year, semester
+                  ORDER BY acad_year DESC, semester DESC
+                  LIMIT %s"""
+
+        return self._rows(query, (org_id, org_id, n_semesters))
+
     def view_alumni_members(self):
         """8. View alumni members as of specific date"""
         print("\n=== Alumni Members Report ===")
@@ -538,22 +621,7 @@ class AdvancedReports:
             org_id = int(input("Organization ID: "))
             as_of_date = input("As of date (YYYY-MM-DD): ")
             
-            # Direct query for alumni members
-            query = """SELECT s.stud_no,
-                             CONCAT(s.firstname, ' ', s.lastname) AS name,
-                             CONCAT(b.role, ', ', b.committee, ', ', b.semester, ' sem') AS alumni_record,
-                             o.org_name
-                      FROM belongs_to b
-                      JOIN student s ON b.stud_no = s.stud_no
-                      JOIN organization o ON b.org_id = o.org_id
-                      WHERE b.org_id = %s
-                        AND b.status = 'Alumni'
-                        AND STR_TO_DATE(CONCAT(SUBSTRING_INDEX(b.acad_year, '-', 1), '-', 
-                                             IF(b.semester = '1', '06-01', '11-30')), '%Y-%m-%d') <= %s
-                      ORDER BY b.acad_year DESC, b.semester DESC"""
-            
-            self.db.cursor.execute(query, (org_id, as_of_date))
-            results = self.db.cursor.fetchall()
+            results = self.alumni_members(org_id, as_of_date)
             
             if results:
                 # Convert dictionary results to list of lists
@@ -571,9 +639,28 @@ class AdvancedReports:
             else:
                 print("No alumni members found!")
                 
+        except ValueError:
+            print("✗ Invalid input.")
         except Error as e:
             print(f"✗ Error viewing alumni members: {e}")
     
+    def alumni_members(self, org_id, as_of_date):
+        """Alumni members of an organization as recorded at the end of a date (belongs_to_history)"""
+        cutoff = as_of_cutoff(as_of_date)
+        query = f"""SELECT s.stud_no,
+                          CONCAT(s.firstname, ' ', s.lastname) AS name,
+                          CONCAT(b.role, ', ', b.committee, ', ', b.semester, ' sem') AS alumni_record,
+                          o.org_name
+                   FROM belongs_to_history b
+                   JOIN student s ON b.stud_no = s.stud_no
+                   JOIN organization o ON b.org_id = o.org_id
+                   WHERE b.org_id = %s
+                     AND {AS_OF.format(alias='b')}
+                     AND b.status = 'Alumni'
+                   ORDER BY b.acad_year DESC, b.semester DESC"""
+
+        return self._rows(query, (org_id, cutoff, cutoff))
+
     def view_fees_summary_by_date(self):
         """9. View total unpaid/paid fees as of specific date"""
         print("\n=== Fees Summary by Date ===")
@@ -589,19 +676,7 @@ class AdvancedReports:
             org_id = int(input("Organization ID: "))
             as_of_date = input("As of date (YYYY-MM-DD): ")
             
-            # Direct query for fees summary
-            query = """SELECT o.org_name,
-                             p.due_date,
-                             SUM(CASE WHEN p.payment_status = 'Paid' THEN p.amount_paid ELSE 0 END) as total_paid,
-                             SUM(CASE WHEN p.payment_status = 'Unpaid' THEN p.amount ELSE 0 END) as total_unpaid
-                      FROM payment p
-                      JOIN organization o ON o.org_id = p.org_id
-                      WHERE p.org_id = %s
-                        AND p.due_date <= %s
-                      GROUP BY o.org_name, p.due_date"""
-            
-            self.db.cursor.execute(query, (org_id, as_of_date))
-            results = self.db.cursor.fetchall()
+            results = self.fees_summary_by_date(org_id, as_of_date)
             
             if results:
                 # Convert dictionary results to list of lists
@@ -626,9 +701,26 @@ class AdvancedReports:
             else:
                 print("No fee data found!")
                 
+        except ValueError:
+            print("✗ Invalid input.")
         except Error as e:
             print(f"✗ Error viewing fees summary: {e}")
     
+    def fees_summary_by_date(self, org_id, as_of_date):
+        """Paid and unpaid fee totals per due date as recorded at the end of a date (payment_history)"""
+        cutoff = as_of_cutoff(as_of_date)
+        query = f"""SELECT o.org_name,
+                          p.due_date,
+                          SUM(CASE WHEN p.payment_status = 'Paid' THEN p.amount_paid ELSE 0 END) as total_paid,
+                          SUM(CASE WHEN p.payment_status = 'Unpaid' THEN p.amount ELSE 0 END) as total_unpaid
+                   FROM payment_history p
+                   JOIN organization o ON o.org_id = p.org_id
+                   WHERE p.org_id = %s
+                     AND {AS_OF.format(alias='p')}
+                   GROUP BY o.org_name, p.due_date"""
+
+        return self._rows(query, (org_id, cutoff, cutoff))
+
     def view_highest_debt(self):
         """10. View members with highest debt for specific semester"""
         print("\n=== Members with Highest Debt ===")
@@ -645,26 +737,7 @@ class AdvancedReports:
             acad_year = input("Academic Year (YYYY-YYYY): ")
             semester = int(input("Semester (1 or 2): "))
             
-            # Direct query for highest debt
-            query = """SELECT s.stud_no,
-                             CONCAT(s.firstname, ' ', s.lastname) AS name,
-                             b.acad_year,
-                             b.semester,
-                             SUM(p.amount - COALESCE(p.amount_paid, 0)) as total_debt,
-                             o.org_name
-                      FROM payment p
-                      JOIN student s ON p.stud_no = s.stud_no
-                      JOIN organization o ON p.org_id = o.org_id
-                      JOIN belongs_to b ON p.stud_no = b.stud_no AND p.org_id = b.org_id
-                      WHERE p.org_id = %s
-                        AND b.acad_year = %s
-                        AND b.semester = %s
-                        AND p.payment_status != 'Paid'
-                      GROUP BY s.stud_no, s.firstname, s.lastname, b.acad_year, b.semester, o.org_name
-                      ORDER BY total_debt DESC"""
-            
-            self.db.cursor.execute(query, (org_id, acad_year, semester))
-            results = self.db.cursor.fetchall()
+            results = self.highest_debt(org_id, acad_year, semester)
             
             if results:
                 # Convert dictionary results to list of lists
@@ -692,4 +765,283 @@ class AdvancedReports:
                 print("No unpaid fees found for this semester!")
                 
         except Error as e:
-            print(f"✗ Error viewing highest debt: {e}")
\ No newline at end of file
+            print(f"✗ Error viewing highest debt: {e}")
+    
+    def highest_debt(self, org_id, acad_year, semester):
+        """Members ordered by total debt for a semester"""
+        memberships = live_and_archived('belongs_to', "b.org_id = %s AND b.acad_year = %s AND b.semester = %s", 'b')
+        query = f"""SELECT s.stud_no,
+                         CONCAT(s.firstname, ' ', s.lastname) AS name,
+                         b.acad_year,
+                         b.semester,
+                         SUM(p.amount - COALESCE(p.amount_paid, 0)) as total_debt,
+                         o.org_name
+                  FROM payment p
+                  JOIN student s ON p.stud_no = s.stud_no
+                  JOIN organization o ON p.org_id = o.org_id
+                  JOIN {memberships} ON p.stud_no = b.stud_no AND p.org_id = b.org_id
+                  WHERE p.org_id = %s
+                    AND p.payment_status != 'Paid'
+                  GROUP BY s.stud_no, s.firstname, s.lastname, b.acad_year, b.semester, o.org_name
+                  ORDER BY total_debt DESC"""
+
+        return self._rows(query, (org_id, acad_year, semester) * 2 + (org_id,))
+
+    def view_member_facets(self):
+        """11. View member counts by role, status, gender, degree program and batch, then drill down"""
+        print("\n=== Member Breakdown ===")
+        try:
+            orgs = self.list_organizations()
+            
+            print("\nAvailable Organizations:")
+            for org in orgs:
+                print(f"{org['org_id']}. {org['org_name']}")
+            
+            org_id = int(input("Organization ID: "))
+            acad_year = input("Academic Year (YYYY-YYYY, Enter for all terms): ") or None
+            semester = input("Semester (1 or 2, Enter for both): ")
+            semester = int(semester) if semester else None
+            
+            facets = self.member_facets(org_id, acad_year, semester)
+            if not facets:
+                print("No members found for this organization!")
+                return
+
+            for facet, _ in MEMBER_FACETS:
+                print(f"\nBy {facet}:")
+                print(tabulate([[row['value'], row['members']] for row in facets if row['facet'] == facet],
+                               headers=[facet, "Members"], tablefmt="grid"))
+
+            print("\nDrill down (exact values from the tables above, press Enter to skip):")
+            filters = {facet: input(f"{facet}: ") for facet, _ in MEMBER_FACETS}
+            if not any(filters.values()):
+                return
+            if filters['batch_year']:
+                filters['batch_year'] = int(filters['batch_year'])
+            results = self.members_by_facets(org_id, acad_year, semester,
+                                             **{facet: value for facet, value in filters.items() if value})
+            
+            if results:
+                table_data = [[
+                    row['stud_no'],
+                    row['firstname'],
+                    row['lastname'],
+                    row['gender'],
+                    row['degrprog'],
+                    row['role'],
+                    row['status'],
+                    row['committee'],
+                    row['batch_year'],
+                    row['acad_year'],
+                    row['semester']
+                ] for row in results]
+                
+                headers = ["Student No", "First Name", "Last Name", "Gender", "Degree Program",
+                          "Role", "Status", "Committee", "Batch Year", "Academic Year", "Semester"]
+                print(tabulate(table_data, headers=headers, tablefmt="grid"))
+                print(f"\nTotal members found: {len(results)}")
+            else:
+                print("No members found matching the criteria!")
+                
+        except ValueError:
+            print("✗ Invalid input.")
+        except Error as e:
+            print(f"✗ Error viewing member breakdown: {e}")
+
+    def _term_filter(self, org_id, acad_year=None, semester=None):
+        """Membership filter and parameters for an organization, optionally one year or term"""
+        where, params = "b.org_id = %s", [org_id]
+        if acad_year:
+            where += " AND b.acad_year = %s"
+            params.append(acad_year)
+        if semester:
+            where += " AND b.semester = %s"
+            params.append(str(semester))
+        return where, params
+
+    def member_facets(self, org_id, acad_year=None, semester=None):
+        """Membership counts per role, status, gender, degree program and batch, from one grouped query.
+
+        MariaDB has no GROUPING SETS, so the members are grouped once by all
+        five attributes and each facet is rolled up from those groups.
+        Rows are (facet, value, members), largest first within a facet.
+        """
+        where, params = self._term_filter(org_id, acad_year, semester)
+        columns = ', '.join(f"{column} AS {facet}" for facet, column in MEMBER_FACETS)
+        query = f"""SELECT {columns}, COUNT(*) AS members
+                    FROM {live_and_archived('belongs_to', where, 'b')}
+                    JOIN student s ON s.stud_no = b.stud_no
+                    GROUP BY {', '.join(column for _, column in MEMBER_FACETS)}"""
+
+        counts = {facet: Counter() for facet, _ in MEMBER_FACETS}
+        for group in self._rows(query, params * 2):
+            for facet, _ in MEMBER_FACETS:
+                counts[facet][group[facet]] += group['members']
+
+        return [{'facet': facet, 'value': value, 'members': members}
+                for facet, _ in MEMBER_FACETS
+                for value, members in sorted(counts[facet].items(), key=lambda item: (-item[1], str(item[0])))]
+
+    def members_by_facets(self, org_id, acad_year=None, semester=None, role=None, status=None, gender=None,
+                          degrprog=None, batch_year=None):
+        """Members matching exact facet values (the drill-down of member_facets)"""
+        where, params = self._term_filter(org_id, acad_year, semester)
+        for value, column in ((role, 'b.role'), (status, 'b.status'), (batch_year, 'b.batch_year')):
+            if value is not None:
+                where += f" AND {column} = %s"
+                params.append(value)
+        # Membership filters go into both branches, student filters into the join
+        student_filters, student_params = "", []
+        for value, column in ((gender, 's.gender'), (degrprog, 's.degrprog')):
+            if value is not None:
+                student_filters += f" AND {column} = %s"
+                student_params.append(value)
+
+        query = f"""SELECT s.stud_no, s.firstname, s.lastname, s.gender, s.degrprog,
+                           b.role, b.status, b.committee, b.batch_year, b.acad_year, b.semester
+                    FROM {live_and_archived('belongs_to', where, 'b')}
+                    JOIN student s ON s.stud_no = b.stud_no{student_filters}
+                    ORDER BY b.acad_year DESC, b.semester DESC, b.role, s.lastname, s.firstname"""
+
+        return self._rows(query, params * 2 + student_params)
+
+    def view_activity_trend(self):
+        """12. View active/inactive/alumni ratios, term-over-term changes and retention for every term"""
+        print("\n=== Activity Trend ===")
+        try:
+            org_id = input("Organization ID (Enter for all organizations): ")
+            results = self.activity_trend(int(org_id) if org_id else None)
+            
+            if results:
+                table_data = [[
+                    row['org_name'],
+                    row['acad_year'],
+                    row['semester'],
+                    row['total_members'],
+                    row['active_pct'],
+                    row['inactive_pct'],
+                    row['alumni_pct'],
+                    row['total_delta'],
+                    row['active_delta'],
+                    row['retention_pct']
+                ] for row in results]
+                
+                headers = ["Organization", "Academic Year", "Semester", "Members", "Active %", "Inactive %",
+                          "Alumni %", "Δ Members", "Δ Active", "Retention %"]
+                print(tabulate(table_data, headers=headers, tablefmt="grid"))
+            else:
+                print("No term summary found! Run: python term_summary.py refresh")
+                
+        except ValueError:
+            print("✗ Invalid input.")
+        except Error as e:
+            print(f"✗ Error viewing activity trend: {e}")
+
+    def activity_trend(self, org_id=None):
+        """Status ratios, term-over-term deltas and retention for every term of every (or one) organization.
+
+        Reads term_membership_summary (see term_summary.py) and orders terms
+        by their number, not the acad_year string. retention_pct is the share
+        of the previous term's members still members this term; it is empty
+        when the previous term has no members.
+        """
+        where, params = "", ()
+        if org_id is not None:
+            where, params = "WHERE t.org_id = %s", (org_id,)
+        query = f"""SELECT t.org_id, o.org_name, t.acad_year, t.semester,
+                           t.total_members, t.active_members, t.inactive_members, t.alumni_members,
+                           ROUND(100.0 * t.active_members / t.total_members, 2) AS active_pct,
+                           ROUND(100.0 * t.inactive_members / t.total_members, 2) AS inactive_pct,
+                           ROUND(100.0 * t.alumni_members / t.total_members, 2) AS alumni_pct,
+                           t.total_members - LAG(t.total_members) OVER term AS total_delta,
+                           t.active_members - LAG(t.active_members) OVER term AS active_delta,
+                           CASE WHEN LAG(t.term_no) OVER term = t.term_no - 1
+                                THEN ROUND(100.0 * t.retained_members / LAG(t.total_members) OVER term, 2)
+                           END AS retention_pct
+                    FROM term_membership_summary t
+                    JOIN organization o ON o.org_id = t.org_id
+                    {where}
+                    WINDOW term AS (PARTITION BY t.org_id ORDER BY t.term_no)
+                    ORDER BY t.org_id, t.term_no"""
+
+        return self._rows(query, params)
+
+    def view_top_debtors(self):
+        """13. View the K members with the largest outstanding balance in any scope"""
+        print("\n=== Top Debtors ===")
+        try:
+            k = int(input("How many (default 100): ") or 100)
+            org_id = input("Organization ID (Enter for all organizations): ")
+            from_acad_year = input("From Academic Year (YYYY-YYYY, Enter for no limit): ") or None
+            to_acad_year = input("To Academic Year (YYYY-YYYY, Enter for no limit): ") or None
+            min_balance = Decimal(input("Minimum balance (default 0): ") or 0)
+            
+            results = self.top_debtors(k, int(org_id) if org_id else None, from_acad_year, to_acad_year,
+                                       min_balance)
+            
+            if results:
+                table_data = [[
+                    row['debt_rank'],
+                    row['stud_no'],
+                    row['name'],
+                    row['balance'],
+                    row['open_fees'],
+                    row['organizations']
+                ] for row in results]
+                
+                headers = ["Rank", "Student No", "Name", "Balance", "Open Fees", "Organizations"]
+                print(tabulate(table_data, headers=headers, tablefmt="grid"))
+            else:
+                print("No outstanding balances in this scope!")
+                
+        except (ValueError, ArithmeticError):
+            print("✗ Invalid input.")
+        except Error as e:
+            print(f"✗ Error viewing top debtors: {e}")
+
+    def top_debtors(self, k=100, org_id=None, from_acad_year=None, to_acad_year=None, min_balance=0):
+        """The k students with the largest unpaid balance, optionally in one organization or term range.
+
+        The academic years bound the fees' due dates (June 1 to May 31).
+        Balances are ranked by the server with ORDER BY ... LIMIT k, which
+        keeps only the current top k while it aggregates, so only k rows are
+        sorted, returned and joined to student. Raises ValueError for a k
+        below 1 or an academic year that is not YYYY-YYYY.
+        """
+        if k < 1:
+            raise ValueError(f"Invalid number of rows: {k} (expected 1 or more)")
+        first_year = acad_year_start(from_acad_year) if from_acad_year else None
+        last_year = acad_year_start(to_acad_year) if to_acad_year else None
+
+        filters, params = "", []
+        if org_id is not None:
+            filters += " AND p.org_id = %s"
+            params.append(org_id)
+        if from_acad_year:
+            filters += " AND p.due_date >= %s"
+            params.append(date(first_year, 6, 1))
+        if to_acad_year:
+            filters += " AND p.due_date <= %s"
+            params.append(date(last_year + 1, 5, 31))
+        params += [min_balance, k]
+
+        query = f"""SELECT ROW_NUMBER() OVER (ORDER BY d.balance DESC, d.stud_no) AS debt_rank,
+                           d.stud_no,
+                           CONCAT(s.firstname, ' ', s.lastname) AS name,
+                           d.balance,
+                           d.open_fees,
+                           d.organizations
+                    FROM (SELECT p.stud_no,
+                                 SUM(p.amount - COALESCE(p.amount_paid, 0)) AS balance,
+                                 COUNT(*) AS open_fees,
+                                 COUNT(DISTINCT p.org_id) AS organizations
+                          FROM payment p
+                          WHERE p.payment_status != 'Paid'{filters}
+                          GROUP BY p.stud_no
+                          HAVING SUM(p.amount - COALESCE(p.amount_paid, 0)) >= %s
+                          ORDER BY balance DESC, p.stud_no
+                          LIMIT %s) d
+                    JOIN student s ON s.stud_no = d.stud_no
+                    ORDER BY debt_rank"""
+
+        return self._rows(query, params)
@@ -0,0 +1,178 @@
+"""
+Read-replica routing for the Student Organization Management System
+
+Reports only read, so ReportRouter runs them on a replica when one is
+configured (main.REPLICA_CONFIG, from SOMS_REPLICA_HOST/SOMS_REPLICA_PORT)
+and keeps the primary connection free for cashier writes. Every report runs
+in a START TRANSACTION READ ONLY snapshot, wherever it is routed.
+
+Staleness is bounded with the studentorg_log high-water mark: a replica
+whose MAX(log_id) trails the primary's by more than max_lag entries (or is
+behind a log_id the caller has just written) is skipped and the report
+runs on the primary instead, as it does when the replica cannot be reached
+or queried. A transaction open on the primary connection belongs to the
+caller and is never committed or rolled back by a report.
+
+    SOMS_REPLICA_HOST=replica.local SOMS_REPLICA_MAX_LAG=50 python main.py
+    python soms.py report alumni --org 1001 --as-of 2025-01-01 --replica-sqlite soms.db
+"""
+
+from collections import Counter
+from contextlib import contextmanager
+
+from mysql.connector import Error, errors
+
+from database import DEFAULT_BATCH_SIZE, fetch_procedure, fetch_rows, iter_procedure, iter_rows
+
+def high_water_mark(cursor):
+    """The newest studentorg_log entry visible to this cursor"""
+    cursor.execute("SELECT COALESCE(MAX(log_id), 0) AS log_id FROM studentorg_log")
+    row = cursor.fetchone()
+    return row['log_id'] if isinstance(row, dict) else row[0]
+
+class ReadOnlySnapshot:
+    """A connection/cursor pair inside a READ ONLY consistent snapshot.
+
+    The connection must not be in a transaction: it may hold another
+    caller's uncommitted writes, so it is neither committed nor rolled back
+    here and ProgrammingError is raised instead.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.cursor = None
+
+    def __enter__(self):
+        if self.connection.in_transaction:
+            raise errors.ProgrammingError(msg="A report cannot start its read-only snapshot inside an open "
+                                              "transaction; commit or roll back the pending work first")
+        self.connection.start_transaction(consistent_snapshot=True, readonly=True)
+        self.cursor = self.connection.cursor(dictionary=True)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.cursor.close()
+        finally:
+            # Nothing was written, so ending the snapshot is a rollback
+            self.connection.rollback()
+        return False
+
+class ReportRouter:
+    """Sends report queries to a fresh-enough replica, otherwise to the primary.
+
+    connect_replica returns a new connection (or one from a pool) for each
+    report and is closed afterwards; None routes everything to the primary.
+    connect_primary does the same for reports routed to the primary while
+    its shared connection is in a transaction; without it those reports
+    raise ProgrammingError rather than touch the transaction.
+    """
+
+    def __init__(self, primary, connect_replica=None, max_lag=100, connect_primary=None):
+        self.primary = primary
+        self.connect_replica = connect_replica
+        self.max_lag = max_lag
+        self.connect_primary = connect_primary
+        # replica / primary / stale / unavailable
+        self.routes = Counter()
+
+    @classmethod
+    def from_config(cls, primary, separate_primary=False):
+        """A router for main.REPLICA_CONFIG, or primary-only when no replica is configured.
+
+        With separate_primary, reports that find the primary connection in a
+        transaction open their own connection with main.DB_CONFIG.
+        """
+        from drivers import connect
+        from main import DB_CONFIG, DB_DRIVER, REPLICA_CONFIG, REPLICA_MAX_LAG
+        connect_primary = (lambda: connect(DB_DRIVER, **DB_CONFIG)) if separate_primary else None
+        if not REPLICA_CONFIG:
+            return cls(primary, connect_primary=connect_primary)
+        return cls(primary, lambda: connect(DB_DRIVER, **REPLICA_CONFIG), max_lag=REPLICA_MAX_LAG,
+                   connect_primary=connect_primary)
+
+    def required_log_id(self, min_log_id=None):
+        """The log position a replica must have reached to serve a report"""
+        connection = self.primary.connection
+        pending = connection.in_transaction
+        required = high_water_mark(self.primary.cursor) - self.max_lag
+        if not pending:
+            # Ends the read this opened; a transaction the caller already had is left alone
+            connection.rollback()
+        return max(required, min_log_id or 0)
+
+    def _replica(self, min_log_id):
+        """A ReadOnlySnapshot on a fresh-enough replica, or None to use the primary"""
+        required = self.required_log_id(min_log_id)
+        try:
+            connection = self.connect_replica()
+        except Error:
+            self.routes['unavailable'] += 1
+            return None
+        snapshot = ReadOnlySnapshot(connection)
+        try:
+            snapshot.__enter__()
+            if high_water_mark(snapshot.cursor) >= required:
+                return snapshot
+            self.routes['stale'] += 1
+        except Error:
+            # e.g. the connection dropped or the replica has no studentorg_log
+            self.routes['unavailable'] += 1
+        self._close(snapshot, ignore_errors=True)
+        return None
+
+    def _close(self, snapshot, ignore_errors=False):
+        """End a snapshot and close its connection"""
+        try:
+            if snapshot.cursor is not None:
+                snapshot.__exit__(None, None, None)
+        except Error:
+            if not ignore_errors:
+                raise
+        finally:
+            snapshot.connection.close()
+
+    @contextmanager
+    def reports(self, min_log_id=None):
+        """A read-only database for one report: the replica if it is fresh enough"""
+        if self.connect_replica is not None:
+            replica = self._replica(min_log_id)
+            if replica is not None:
+                self.routes['replica'] += 1
+                try:
+                    yield replica
+                finally:
+                    self._close(replica)
+                return
+
+        self.routes['primary'] += 1
+        if self.primary.connection.in_transaction and self.connect_primary is not None:
+            # The shared connection's transaction is the caller's; the report reads on its own
+            connection = self.connect_primary()
+            try:
+                with ReadOnlySnapshot(connection) as primary:
+                    yield primary
+            finally:
+                connection.close()
+            return
+        with ReadOnlySnapshot(self.primary.connection) as primary:
+            yield primary
+
+    def fetch_rows(self, query, params=(), stream=False, batch_size=DEFAULT_BATCH_SIZE, compact=False):
+        """database.fetch_rows() on the routed connection"""
+        if stream:
+            return self._stream(iter_rows, query, params, batch_size=batch_size, compact=compact)
+        with self.reports() as db:
+            return fetch_rows(db, query, params, batch_size=batch_size, compact=compact)
+
+    def fetch_procedure(self, procedure, args=(), stream=False, batch_size=DEFAULT_BATCH_SIZE, compact=False):
+        """database.fetch_procedure() on the routed connection"""
+        if stream:
+            return self._stream(iter_procedure, procedure, args, batch_size=batch_size, compact=compact)
+        with self.reports() as db:
+            return fetch_procedure(db, procedure, args, batch_size=batch_size, compact=compact)
+
+    def _stream(self, iterate, *args, **kwargs):
+        # The snapshot stays open until the caller has consumed the rows
+        with self.reports() as db:
+            yield from iterate(db, *args, **kwargs)
@@ -0,0 +1,309 @@
+"""
+JSON service front-end for the Student Organization Management System
+
+Serves the managers and reports over HTTP to many concurrent clients from
+one shared connection pool:
+
+    SOMS_SERVICE_TOKEN=... python service.py --port 8080 --pool-size 10 --report-workers 4
+
+Every route except /health needs the header "Authorization: Bearer <token>"
+with the service token (SOMS_SERVICE_TOKEN, or --token). Without one, a
+random token is generated and printed at startup.
+
+    GET  /health
+    GET  /organizations
+    GET  /reports                          list reports and their parameters
+    GET  /reports/<name>?org_id=1001&...   run a report
+    GET  /students/<stud_no>               student profile
+    GET  /students/<stud_no>/fees          unpaid and partial fees
+    POST /fees                             {"stud_no", "org_id", "amount", "due_date"}
+    POST /payments/<payment_id>            {"amount"}
+"""
+
+import argparse
+import hmac
+import json
+import os
+import secrets
+import threading
+import time
+import traceback
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from mysql.connector import Error
+from mysql.connector.pooling import MySQLConnectionPool
+
+from fees import FEE_REPORTS, FeeError, FeesManager
+from main import DB_CONFIG, DB_DRIVER, REPLICA_CONFIG, REPLICA_MAX_LAG
+from reports import REPORTS, AdvancedReports
+from routing import ReportRouter
+from soms import to_json
+from student import StudentManager
+
+# Report name -> (manager class, method, parameter spec)
+REPORT_ROUTES = {
+    **{name: (AdvancedReports, method, params) for name, (method, params) in REPORTS.items()},
+    **{name: (FeesManager, method, params) for name, (method, params) in FEE_REPORTS.items()},
+}
+
+class ServiceError(Exception):
+    """An error returned to the client with an HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+class PooledDatabase:
+    """A pooled connection exposing the connection/cursor pair the managers expect"""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.connection = None
+        self.cursor = None
+
+    def __enter__(self):
+        self.connection = self.pool.get_connection()
+        self.cursor = self.connection.cursor(dictionary=True)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.cursor.close()
+            if exc_type is not None:
+                self.connection.rollback()
+        finally:
+            # Returns the connection to the pool
+            self.connection.close()
+        return False
+
+def parse_params(spec, source):
+    """Convert request values to report keyword arguments using a parameter spec"""
+    params = {}
+    for name, kind, required in spec:
+        value = source.get(name)
+        if value in (None, ''):
+            if required:
+                raise ServiceError(400, f"Missing parameter: {name}")
+            continue
+        try:
+            params[name] = kind(value)
+        except (TypeError, ValueError, ArithmeticError):
+            # Decimal raises InvalidOperation, an ArithmeticError, for text that is not a number
+            raise ServiceError(400, f"Invalid value for {name}: {value!r}")
+    return params
+
+class SOMSService(ThreadingHTTPServer):
+    """Threaded HTTP server sharing one connection pool between requests.
+
+    Every request holds one of pool_size connection slots, so bursts queue
+    instead of failing. Heavy reports additionally hold one of
+    report_workers slots, leaving connections free for fee writes, and
+    read from the replica pool when a replica is configured.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, address, token, pool_size=10, report_workers=4, wait_timeout=30):
+        super().__init__(address, ServiceHandler)
+        self.token = token
+        # The pool is mysql-connector's own, so only the mysql/mysql-c choice of DB_DRIVER applies
+        self.pool = MySQLConnectionPool(pool_name="soms_service", pool_size=pool_size,
+                                        use_pure=(DB_DRIVER != 'mysql-c'), **DB_CONFIG)
+        self.connection_slots = threading.BoundedSemaphore(pool_size)
+        self.report_slots = threading.BoundedSemaphore(max(1, min(report_workers, pool_size)))
+        self.wait_timeout = wait_timeout
+        # Reports read from the replica when one is configured (see routing.py)
+        self.replica_pool = None
+        if REPLICA_CONFIG:
+            try:
+                self.replica_pool = MySQLConnectionPool(pool_name="soms_replica",
+                                                        pool_size=max(1, min(report_workers, pool_size)),
+                                                        use_pure=(DB_DRIVER != 'mysql-c'), **REPLICA_CONFIG)
+            except Error as e:
+                print(f"✗ Replica unavailable, reports will run on the primary: {e}")
+
+    def report_router(self, db):
+        """A ReportRouter for one request's primary connection"""
+        connect_replica = self.replica_pool.get_connection if self.replica_pool else None
+        return ReportRouter(db, connect_replica, max_lag=REPLICA_MAX_LAG)
+
+    def database(self):
+        """Wait for a free connection slot and return a pooled database"""
+        if not self.connection_slots.acquire(timeout=self.wait_timeout):
+            raise ServiceError(503, "Server busy, try again later")
+        return _SlotDatabase(self, self.connection_slots)
+
+class _SlotDatabase(PooledDatabase):
+    """PooledDatabase that releases its connection slot on exit"""
+
+    def __init__(self, server, slots):
+        super().__init__(server.pool)
+        self.slots = slots
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            return super().__exit__(exc_type, exc_value, traceback)
+        finally:
+            self.slots.release()
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    server_version = "SOMS/1.0"
+
+    def do_GET(self):
+        self._handle(self._get)
+
+    def do_POST(self):
+        self._handle(self._post)
+
+    def _handle(self, route):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if parts != ['health']:
+                self._authorize()
+            status, body = route(parts, query)
+        except ServiceError as e:
+            status, body = e.status, {'error': str(e)}
+        except FeeError as e:
+            status, body = 409, {'error': str(e)}
+        except Error as e:
+            status, body = 500, {'error': f"Database error: {e}"}
+        except (ValueError, KeyError) as e:
+            # Malformed headers or values the routes did not validate themselves
+            status, body = 400, {'error': f"Bad request: {e}"}
+        except Exception as e:
+            # Every request gets a reply; the traceback goes to the server log
+            self.log_error('"%s %s" failed: %r', self.command, url.path, e)
+            traceback.print_exc()
+            status, body = 500, {'error': "Internal server error"}
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        payload = json.dumps(body, default=to_json).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('X-Response-Time-Ms', f"{elapsed_ms:.2f}")
+        self.end_headers()
+        self.wfile.write(payload)
+        self.log_message('"%s %s" %d %.2fms', self.command, url.path, status, elapsed_ms)
+
+    def log_request(self, code='-', size='-'):
+        # Requests are logged with their timing in _handle
+        pass
+
+    def _authorize(self):
+        """Reject requests without the service token"""
+        scheme, _, token = (self.headers.get('Authorization') or '').partition(' ')
+        if scheme.lower() != 'bearer' or not hmac.compare_digest(token.strip().encode(),
+                                                                 self.server.token.encode()):
+            raise ServiceError(401, "Missing or invalid service token")
+
+    def _read_json(self):
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            raise ServiceError(400, "Invalid Content-Length")
+        if length < 0:
+            raise ServiceError(400, "Invalid Content-Length")
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except ValueError:
+            raise ServiceError(400, "Request body must be JSON")
+        if not isinstance(body, dict):
+            raise ServiceError(400, "Request body must be a JSON object")
+        return body
+
+    def _get(self, parts, query):
+        if parts == ['health']:
+            return 200, {'status': 'ok'}
+
+        if parts == ['reports']:
+            return 200, [{
+                'name': name,
+                'params': [{'name': param, 'type': kind.__name__, 'required': required}
+                           for param, kind, required in spec]
+            } for name, (_, _, spec) in REPORT_ROUTES.items()]
+
+        if len(parts) == 2 and parts[0] == 'reports':
+            if parts[1] not in REPORT_ROUTES:
+                raise ServiceError(404, f"Unknown report: {parts[1]}")
+            manager_class, method, spec = REPORT_ROUTES[parts[1]]
+            params = parse_params(spec, query)
+            if not self.server.report_slots.acquire(timeout=self.server.wait_timeout):
+                raise ServiceError(503, "Too many reports running, try again later")
+            try:
+                with self.server.database() as db:
+                    rows = getattr(manager_class(db, router=self.server.report_router(db)), method)(**params)
+            finally:
+                self.server.report_slots.release()
+            return 200, {'report': parts[1], 'params': params, 'count': len(rows), 'rows': rows}
+
+        if parts == ['organizations']:
+            with self.server.database() as db:
+                return 200, AdvancedReports(db).list_organizations()
+
+        if len(parts) == 2 and parts[0] == 'students':
+            with self.server.database() as db:
+                profile = StudentManager(db).get_student_profile(parts[1])
+            if profile is None:
+                raise ServiceError(404, "Student not found")
+            return 200, profile
+
+        if len(parts) == 3 and parts[0] == 'students' and parts[2] == 'fees':
+            with self.server.database() as db:
+                return 200, FeesManager(db).member_fees(parts[1])
+
+        raise ServiceError(404, "Not found")
+
+    def _post(self, parts, query):
+        if parts != ['fees'] and not (len(parts) == 2 and parts[0] == 'payments'):
+            raise ServiceError(404, "Not found")
+        body = self._read_json()
+
+        if parts == ['fees']:
+            params = parse_params([('stud_no', str, True), ('org_id', int, True),
+                                   ('amount', Decimal, True), ('due_date', str, True)], body)
+            with self.server.database() as db:
+                payment_id = FeesManager(db).assign_fee(**params)
+            return 201, {'payment_id': payment_id}
+
+        if len(parts) == 2 and parts[0] == 'payments':
+            try:
+                payment_id = int(parts[1])
+            except ValueError:
+                raise ServiceError(404, "Not found")
+            params = parse_params([('amount', Decimal, True)], body)
+            with self.server.database() as db:
+                return 200, FeesManager(db).apply_payment(payment_id, params['amount'])
+
+        raise ServiceError(404, "Not found")
+
+def main():
+    parser = argparse.ArgumentParser(description="SOMS JSON service")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--pool-size', type=int, default=10, help="shared MySQL connections")
+    parser.add_argument('--report-workers', type=int, default=4, help="reports allowed to run at once")
+    parser.add_argument('--token', default=os.environ.get('SOMS_SERVICE_TOKEN'),
+                        help="bearer token clients must send (default $SOMS_SERVICE_TOKEN, else generated)")
+    args = parser.parse_args()
+
+    token = args.token or secrets.token_urlsafe(32)
+    server = SOMSService((args.host, args.port), token, pool_size=args.pool_size,
+                         report_workers=args.report_workers)
+    print(f"✓ SOMS service listening on http://{args.host}:{args.port}")
+    if not args.token:
+        print(f"  Service token: {token}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
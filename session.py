@@ -0,0 +1,81 @@
+"""
+Login session module for the Student Organization Management System
+"""
+
+import time
+from typing import List, Optional
+
+SESSION_TTL = 300  # seconds before memberships are reloaded
+
+class UserSession:
+    """A logged-in user with their active memberships cached for the session.
+
+    Memberships are loaded with one query and reused until the TTL expires,
+    so role and organization checks in the menus never hit the database.
+    """
+
+    def __init__(self, db_manager, username: str, is_admin: bool = False, ttl: float = SESSION_TTL):
+        self.db_manager = db_manager
+        self.username = username
+        self.is_admin = is_admin
+        self.ttl = ttl
+        self.current_org_id: Optional[int] = None
+        self._memberships: List[dict] = []
+        self._loaded_at: Optional[float] = None
+
+    def refresh(self) -> None:
+        """Reload the user's active memberships, keeping the latest term per organization"""
+        if self.is_admin:
+            self._loaded_at = time.monotonic()
+            return
+
+        query = """
+            SELECT b.org_id, o.org_name, b.role, b.committee, b.semester, b.acad_year
+            FROM belongs_to b
+            JOIN organization o ON b.org_id = o.org_id
+            WHERE b.stud_no = %s AND b.status = 'Active'
+            ORDER BY b.acad_year DESC, b.semester DESC, o.org_name
+        """
+        self.db_manager.cursor.execute(query, (self.username,))
+        memberships = {}
+        for row in self.db_manager.cursor.fetchall():
+            memberships.setdefault(row['org_id'], row)
+        self._memberships = sorted(memberships.values(), key=lambda row: row['org_name'])
+        self._loaded_at = time.monotonic()
+
+        if self.current_org_id not in memberships:
+            self.current_org_id = self._memberships[0]['org_id'] if self._memberships else None
+
+    @property
+    def memberships(self) -> List[dict]:
+        """Active memberships, one per organization"""
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl:
+            self.refresh()
+        return self._memberships
+
+    @property
+    def current_membership(self) -> Optional[dict]:
+        """The membership for the organization currently selected"""
+        for membership in self.memberships:
+            if membership['org_id'] == self.current_org_id:
+                return membership
+        return None
+
+    @property
+    def role(self) -> str:
+        """Role in the current organization, or 'admin'"""
+        if self.is_admin:
+            return "admin"
+        membership = self.current_membership
+        return membership['role'] if membership else ""
+
+    def has_role(self, *roles: str) -> bool:
+        """Check the role in the current organization"""
+        return self.is_admin or self.role in roles
+
+    def switch_org(self, org_id: int) -> bool:
+        """Select another organization the user is an active member of"""
+        if any(membership['org_id'] == org_id for membership in self.memberships):
+            self.current_org_id = org_id
+            return True
+        return False
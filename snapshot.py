@@ -0,0 +1,203 @@
+"""
+Columnar snapshot export for the Student Organization Management System
+
+Streams student, organization, belongs_to and payment with their row
+histories (optionally studentorg_log) out of the database in fetchmany batches and writes one
+compressed Parquet file per table, so multi-semester analytics can run
+against the snapshot instead of the production server:
+
+    python snapshot.py export snapshots/2025-06-01 --with-log
+    python snapshot.py activity snapshots/2025-06-01
+
+Requires pyarrow (pip install pyarrow).
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+SNAPSHOT_TABLES = ('organization', 'student', 'belongs_to', 'payment', 'belongs_to_history', 'payment_history')
+# belongs_to and payment are exported with their archived years
+SOURCES = {'belongs_to': 'belongs_to_all', 'payment': 'payment_all'}
+MANIFEST_FILE = 'manifest.json'
+
+# Table -> [(column, arrow type name)]
+COLUMNS = {
+    'organization': [('org_id', 'int32'), ('org_name', 'string'), ('year_established', 'date')],
+    'student': [('stud_no', 'string'), ('firstname', 'string'), ('lastname', 'string'), ('degrprog', 'string'),
+                ('batch', 'int16'), ('gender', 'string'), ('birthday', 'date')],
+    'belongs_to': [('stud_no', 'string'), ('org_id', 'int32'), ('semester', 'dictionary'),
+                   ('acad_year', 'dictionary'), ('status', 'dictionary'), ('role', 'dictionary'),
+                   ('committee', 'dictionary'), ('batch_year', 'int16')],
+    'payment': [('payment_id', 'int32'), ('amount_paid', 'decimal'), ('payment_date', 'date'),
+                ('payment_status', 'dictionary'), ('amount', 'decimal'), ('due_date', 'date'),
+                ('org_id', 'int32'), ('stud_no', 'string')],
+    # Versions are ordered by history_id; valid_from/valid_to keep their microseconds
+    'belongs_to_history': [('history_id', 'int64'), ('stud_no', 'string'), ('org_id', 'int32'),
+                           ('semester', 'dictionary'), ('acad_year', 'dictionary'), ('status', 'dictionary'),
+                           ('role', 'dictionary'), ('committee', 'dictionary'), ('batch_year', 'int16'),
+                           ('valid_from', 'timestamp_us'), ('valid_to', 'timestamp_us')],
+    'payment_history': [('history_id', 'int64'), ('payment_id', 'int32'), ('amount_paid', 'decimal'),
+                        ('payment_date', 'date'), ('payment_status', 'dictionary'), ('amount', 'decimal'),
+                        ('due_date', 'date'), ('org_id', 'int32'), ('stud_no', 'string'),
+                        ('valid_from', 'timestamp_us'), ('valid_to', 'timestamp_us')],
+    'studentorg_log': [('log_id', 'int32'), ('table_name', 'dictionary'), ('record_identifier', 'string'),
+                       ('change_type', 'dictionary'), ('change_timestamp', 'timestamp')],
+}
+
+def require_pyarrow():
+    """Import pyarrow, explaining how to install it when missing"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise SystemExit("✗ Snapshots need pyarrow: pip install pyarrow")
+    return pyarrow
+
+def arrow_schema(pa, table):
+    types = {
+        'int16': pa.int16(),
+        'int32': pa.int32(),
+        'int64': pa.int64(),
+        'string': pa.string(),
+        'date': pa.date32(),
+        'decimal': pa.decimal128(11, 2),
+        'timestamp': pa.timestamp('s'),
+        'timestamp_us': pa.timestamp('us'),
+        # Low-cardinality codes (status, role, acad_year) are dictionary-encoded
+        'dictionary': pa.dictionary(pa.int32(), pa.string()),
+    }
+    return pa.schema([(column, types[kind]) for column, kind in COLUMNS[table]])
+
+def export_table(db_manager, table, directory, batch_size=50000, compression='zstd'):
+    """Stream one table into directory/<table>.parquet and return its row count"""
+    pa = require_pyarrow()
+    schema = arrow_schema(pa, table)
+    columns = [column for column, _ in COLUMNS[table]]
+    path = os.path.join(directory, f"{table}.parquet")
+
+    def to_array(field, values):
+        if pa.types.is_dictionary(field.type):
+            return pa.array(values, type=pa.string()).dictionary_encode()
+        return pa.array(values, type=field.type)
+
+    # A dedicated cursor so rows are read in batches rather than all at once
+    cursor = db_manager.connection.cursor(dictionary=True)
+    rows_written = 0
+    try:
+        cursor.execute(f"SELECT {', '.join(columns)} FROM {SOURCES.get(table, table)} ORDER BY {columns[0]}")
+        with pa.parquet.ParquetWriter(f"{path}.tmp", schema, compression=compression) as writer:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                batch = pa.RecordBatch.from_arrays(
+                    [to_array(field, [row[field.name] for row in rows]) for field in schema], schema=schema)
+                writer.write_batch(batch)
+                rows_written += len(rows)
+    finally:
+        cursor.close()
+    os.replace(f"{path}.tmp", path)
+    return rows_written
+
+def export_snapshot(db_manager, directory, tables=SNAPSHOT_TABLES, batch_size=50000, compression='zstd',
+                    progress=print):
+    """Export tables to Parquet files plus a manifest; returns the manifest"""
+    os.makedirs(directory, exist_ok=True)
+    # Everything exported is at least as new as this audit log position
+    db_manager.cursor.execute("SELECT COALESCE(MAX(log_id), 0) AS log_id FROM studentorg_log")
+    log_id = db_manager.cursor.fetchone()['log_id']
+    db_manager.connection.commit()
+
+    manifest = {
+        'exported_at': datetime.now().isoformat(timespec='seconds'),
+        'log_id': log_id,
+        'compression': compression,
+        'tables': {},
+    }
+    for table in tables:
+        start = time.perf_counter()
+        count = export_table(db_manager, table, directory, batch_size=batch_size, compression=compression)
+        elapsed = time.perf_counter() - start
+        manifest['tables'][table] = {'rows': count, 'file': f"{table}.parquet"}
+        progress(f"✓ {table}: {count} rows in {elapsed:.1f}s")
+
+    with open(os.path.join(directory, f"{MANIFEST_FILE}.tmp"), 'w', encoding='utf-8') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    os.replace(os.path.join(directory, f"{MANIFEST_FILE}.tmp"), os.path.join(directory, MANIFEST_FILE))
+    return manifest
+
+def load_table(directory, table, columns=None, filters=None):
+    """Read a snapshot table (optionally only some columns/rows) as a pyarrow Table"""
+    pa = require_pyarrow()
+    return pa.parquet.read_table(os.path.join(directory, f"{table}.parquet"), columns=columns, filters=filters)
+
+def activity_by_term(directory, org_id=None):
+    """Active and inactive member counts per organization and term, from a snapshot.
+
+    The all-organizations counterpart of AdvancedReports.active_inactive_percentage.
+    """
+    pa = require_pyarrow()
+    import pyarrow.compute as pc
+
+    filters = [('org_id', '=', org_id)] if org_id else None
+    memberships = load_table(directory, 'belongs_to', columns=['org_id', 'acad_year', 'semester', 'status'],
+                             filters=filters)
+    status = memberships.column('status').cast(pa.string())
+    terms = pa.table({
+        'org_id': memberships.column('org_id'),
+        'acad_year': memberships.column('acad_year').cast(pa.string()),
+        'semester': memberships.column('semester').cast(pa.string()),
+        'active': pc.cast(pc.equal(status, 'Active'), pa.int32()),
+        'inactive': pc.cast(pc.is_in(status, value_set=pa.array(['Inactive', 'Alumni'])), pa.int32()),
+    })
+    grouped = terms.group_by(['org_id', 'acad_year', 'semester']).aggregate(
+        [('active', 'count'), ('active', 'sum'), ('inactive', 'sum')])
+
+    rows = [{
+        'org_id': row['org_id'],
+        'acad_year': row['acad_year'],
+        'semester': row['semester'],
+        'total_members': row['active_count'],
+        'active_members': row['active_sum'],
+        'inactive_members': row['inactive_sum'],
+    } for row in grouped.to_pylist()]
+    # Latest term first within each organization
+    rows.sort(key=lambda row: (row['acad_year'], row['semester']), reverse=True)
+    rows.sort(key=lambda row: row['org_id'])
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar snapshots of the SOMS database")
+    commands = parser.add_subparsers(dest='command', required=True)
+    export = commands.add_parser('export', help="export the tables to Parquet")
+    export.add_argument('directory')
+    export.add_argument('--with-log', action='store_true', help="also export studentorg_log")
+    export.add_argument('--batch-size', type=int, default=50000, help="rows per fetch and row group")
+    export.add_argument('--compression', default='zstd', choices=['zstd', 'snappy', 'gzip', 'none'])
+    export.add_argument('--sqlite', metavar='PATH', help="export from a SQLite snapshot instead of MariaDB")
+    activity = commands.add_parser('activity', help="active/inactive members per org and term")
+    activity.add_argument('directory')
+    activity.add_argument('--org', type=int, help="only this organization")
+    args = parser.parse_args()
+
+    require_pyarrow()
+    if args.command == 'export':
+        from backend import open_database
+        tables = SNAPSHOT_TABLES + (('studentorg_log',) if args.with_log else ())
+        with open_database(args.sqlite) as db_manager:
+            manifest = export_snapshot(db_manager, args.directory, tables, batch_size=args.batch_size,
+                                       compression=args.compression)
+        total = sum(table['rows'] for table in manifest['tables'].values())
+        print(f"✓ Snapshot of {total} rows written to {args.directory} (log_id {manifest['log_id']})")
+    else:
+        from tabulate import tabulate
+        rows = activity_by_term(args.directory, args.org)
+        print(tabulate(rows, headers="keys", tablefmt="grid"))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,299 @@
+"""
+Non-interactive command line interface for the Student Organization Management System
+
+Runs one operation, writes machine-readable output to stdout and exits
+with a status code, so it can be used from cron jobs and pipelines:
+
+    python soms.py report late-payments --org 1001 --ay 2024-2025 --sem 1 --format csv
+    python soms.py fees assign --stud 2021-00001 --org 1001 --amount 250 --due 2025-01-31
+    python soms.py fees pay --payment 1005 --amount 100
+    python soms.py members rollover --from-sem 1 --from-ay 2024-2025 --dry-run
+    python soms.py profile 2021-00001 --format json
+    python soms.py report alumni --org 1001 --as-of 2025-01-01 --sqlite soms.db
+
+Exit status: 0 success, 1 database error, 2 usage error, 3 rejected or not found.
+"""
+
+import argparse
+import csv
+import json
+import sys
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_USAGE = 2
+EXIT_REJECTED = 3
+
+# Command line option -> report parameter
+REPORT_OPTIONS = {
+    'org': 'org_id',
+    'ay': 'acad_year',
+    'sem': 'semester',
+    'stud': 'stud_no',
+    'as_of': 'as_of_date',
+    'role': 'role',
+    'status': 'status',
+    'gender': 'gender',
+    'degrprog': 'degrprog',
+    'batch': 'batch_year',
+    'semesters': 'n_semesters',
+    'top': 'k',
+    'from_ay': 'from_acad_year',
+    'to_ay': 'to_acad_year',
+    'min_balance': 'min_balance',
+}
+
+class CommandError(Exception):
+    """A command failure with the exit status to return"""
+
+    def __init__(self, message, status=EXIT_REJECTED):
+        super().__init__(message)
+        self.status = status
+
+def to_json(value):
+    """JSON encoder hook for database values"""
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Cannot serialize {type(value).__name__}")
+
+def write_output(data, output_format, out=None):
+    """Write rows (a list or iterator of dicts or records) or a single dict in the requested format"""
+    if out is None:
+        out = sys.stdout
+    if isinstance(data, dict):
+        rows = [data]
+    elif output_format == 'csv':
+        rows = data
+    else:
+        rows = data = list(data)
+    if output_format == 'json':
+        if rows and hasattr(rows[0], '_asdict'):
+            data = [row._asdict() for row in rows]
+        json.dump(data, out, default=to_json, indent=2)
+        out.write("\n")
+    elif output_format == 'csv':
+        # CSV is written row by row, so streamed reports never sit in memory
+        rows = iter(rows)
+        first = next(rows, None)
+        if first is None:
+            return
+        if hasattr(first, '_fields'):
+            # Compact records are tuples already in column order
+            writer = csv.writer(out, lineterminator="\n")
+            writer.writerow(first._fields)
+        else:
+            writer = csv.DictWriter(out, fieldnames=list(first.keys()), lineterminator="\n")
+            writer.writeheader()
+        writer.writerow(first)
+        writer.writerows(rows)
+    else:
+        from tabulate import tabulate
+        print(tabulate(rows, headers="keys", tablefmt="grid"), file=out)
+
+def report_names():
+    from fees import FEE_REPORTS
+    from reports import REPORTS
+    return sorted([*REPORTS, *FEE_REPORTS])
+
+def cmd_report(db, args):
+    from fees import FEE_REPORTS, FeesManager
+    from reports import REPORTS, AdvancedReports
+    from routing import ReportRouter
+
+    if args.replica_sqlite:
+        from backend import SQLiteConnection
+        router = ReportRouter(db, lambda: SQLiteConnection(args.replica_sqlite), max_lag=args.max_lag)
+    else:
+        router = ReportRouter.from_config(db)
+    # CSV output is written as rows arrive, so the report is fetched in batches
+    options = {'stream': args.format == 'csv', 'compact': True, 'router': router}
+    if args.name in REPORTS:
+        manager, (method, spec) = AdvancedReports(db, **options), REPORTS[args.name]
+    else:
+        manager, (method, spec) = FeesManager(db, **options), FEE_REPORTS[args.name]
+
+    values = {param: getattr(args, option) for option, param in REPORT_OPTIONS.items()
+              if getattr(args, option) is not None}
+    # The fee procedures take the first year of the academic year
+    if args.name in FEE_REPORTS and 'acad_year' in values:
+        values.setdefault('batch_year', values['acad_year'].split('-')[0])
+
+    params = {}
+    for name, kind, required in spec:
+        if name in values:
+            try:
+                params[name] = kind(values[name])
+            except (ValueError, InvalidOperation):
+                raise CommandError(f"Invalid value for {name}: {values[name]!r}", EXIT_USAGE)
+        elif required:
+            option = next((opt for opt, param in REPORT_OPTIONS.items() if param == name), name)
+            raise CommandError(f"Report {args.name} requires --{option.replace('_', '-')}", EXIT_USAGE)
+    try:
+        return getattr(manager, method)(**params)
+    except ValueError as e:
+        # Parameters the report itself rejects, such as a malformed academic year
+        raise CommandError(str(e), EXIT_USAGE)
+
+def cmd_fees_assign(db, args):
+    from fees import FeesManager
+    payment_id = FeesManager(db).assign_fee(args.stud, args.org, args.amount, args.due)
+    return {'payment_id': payment_id}
+
+def cmd_fees_pay(db, args):
+    from fees import FeesManager
+    return FeesManager(db).apply_payment(args.payment, args.amount)
+
+def cmd_members_rollover(db, args):
+    from membership import MembershipManager, next_term
+    from reports import acad_year_start
+    try:
+        for acad_year in filter(None, (args.from_ay, args.to_ay)):
+            acad_year_start(acad_year)
+    except ValueError as e:
+        raise CommandError(str(e), EXIT_USAGE)
+    to_semester, to_acad_year = next_term(args.from_sem, args.from_ay)
+    summary = MembershipManager(db).rollover_members(
+        args.from_sem, args.from_ay, args.to_sem or to_semester, args.to_ay or to_acad_year,
+        status=args.status, org_id=args.org, dry_run=args.dry_run, per_row_audit=args.per_row_audit)
+    summary['dry_run'] = args.dry_run
+    return summary
+
+def cmd_members_import(db, args):
+    from membership import MembershipManager
+    with open(args.file, newline='', encoding='utf-8') as csv_file:
+        summary = MembershipManager(db).load_roster(csv_file, batch_size=args.batch_size,
+                                                    per_row_audit=args.per_row_audit)
+    return {key: len(value) if isinstance(value, list) else value for key, value in summary.items()}
+
+def cmd_students_import(db, args):
+    from student import StudentManager
+    with open(args.file, newline='', encoding='utf-8') as csv_file:
+        summary = StudentManager(db).load_students(csv_file, batch_size=args.batch_size,
+                                                   update_existing=args.update,
+                                                   per_row_audit=args.per_row_audit)
+    summary['invalid'] = len(summary['invalid'])
+    return summary
+
+def cmd_profile(db, args):
+    from student import StudentManager
+    profile = StudentManager(db).get_student_profile(args.stud_no)
+    if profile is None:
+        raise CommandError(f"Student {args.stud_no} not found")
+    if args.format == 'json':
+        return profile
+    # Flatten for csv/table output: one row per membership, open fee and balance
+    return [{'section': section, **row} for section in ('memberships', 'open_fees', 'balances')
+            for row in profile[section]]
+
+def build_parser():
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--format', choices=['table', 'csv', 'json'], default='table', help="output format")
+    common.add_argument('--sqlite', metavar='PATH', help="run against a SQLite snapshot instead of MariaDB")
+
+    parser = argparse.ArgumentParser(prog="soms", description="Student Organization Management System CLI")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    report = commands.add_parser('report', help="run a report", parents=[common])
+    report.add_argument('name', choices=report_names())
+    report.add_argument('--org', type=int, help="organization ID")
+    report.add_argument('--ay', help="academic year (YYYY-YYYY)")
+    report.add_argument('--sem', type=int, choices=[1, 2], help="semester")
+    report.add_argument('--stud', help="student number")
+    report.add_argument('--as-of', help="as of date (YYYY-MM-DD)")
+    report.add_argument('--role')
+    report.add_argument('--status')
+    report.add_argument('--gender')
+    report.add_argument('--degrprog')
+    report.add_argument('--batch', type=int, help="batch year")
+    report.add_argument('--semesters', type=int, help="number of semesters")
+    report.add_argument('--top', type=int, help="number of rows (top-debtors)")
+    report.add_argument('--from-ay', help="first academic year of a range (YYYY-YYYY)")
+    report.add_argument('--to-ay', help="last academic year of a range (YYYY-YYYY)")
+    report.add_argument('--min-balance', help="smallest balance to include")
+    report.add_argument('--replica-sqlite', metavar='PATH',
+                        help="run the report on a SQLite snapshot (with its log) used as a replica")
+    report.add_argument('--max-lag', type=int, default=100,
+                        help="log entries the --replica-sqlite snapshot may trail by")
+    report.set_defaults(handler=cmd_report)
+
+    fees = commands.add_parser('fees', help="fee operations").add_subparsers(dest='action', required=True)
+    assign = fees.add_parser('assign', help="assign a fee to a member", parents=[common])
+    assign.add_argument('--stud', required=True)
+    assign.add_argument('--org', type=int, required=True)
+    assign.add_argument('--amount', type=Decimal, required=True)
+    assign.add_argument('--due', required=True, help="due date (YYYY-MM-DD)")
+    assign.set_defaults(handler=cmd_fees_assign)
+    pay = fees.add_parser('pay', help="record a payment", parents=[common])
+    pay.add_argument('--payment', type=int, required=True, help="payment ID")
+    pay.add_argument('--amount', type=Decimal, required=True)
+    pay.set_defaults(handler=cmd_fees_pay)
+
+    members = commands.add_parser('members', help="membership operations").add_subparsers(dest='action', required=True)
+    rollover = members.add_parser('rollover', help="carry memberships into the next term", parents=[common])
+    rollover.add_argument('--from-sem', required=True, choices=['1', '2'])
+    rollover.add_argument('--from-ay', required=True)
+    rollover.add_argument('--to-sem', choices=['1', '2'])
+    rollover.add_argument('--to-ay')
+    rollover.add_argument('--status', default='Active')
+    rollover.add_argument('--org', type=int)
+    rollover.add_argument('--dry-run', action='store_true')
+    rollover.add_argument('--per-row-audit', action='store_true')
+    rollover.set_defaults(handler=cmd_members_rollover)
+    roster = members.add_parser('import', help="import a membership roster CSV", parents=[common])
+    roster.add_argument('file')
+    roster.add_argument('--batch-size', type=int, default=500)
+    roster.add_argument('--per-row-audit', action='store_true')
+    roster.set_defaults(handler=cmd_members_import)
+
+    students = commands.add_parser('students', help="student operations").add_subparsers(dest='action', required=True)
+    student_import = students.add_parser('import', help="bulk register students from a CSV", parents=[common])
+    student_import.add_argument('file')
+    student_import.add_argument('--batch-size', type=int, default=1000)
+    student_import.add_argument('--update', action='store_true', help="update existing students")
+    student_import.add_argument('--per-row-audit', action='store_true')
+    student_import.set_defaults(handler=cmd_students_import)
+
+    profile = commands.add_parser('profile', help="show a student profile", parents=[common])
+    profile.add_argument('stud_no')
+    profile.set_defaults(handler=cmd_profile)
+
+    return parser
+
+def run(argv=None):
+    """Run one command and return its exit status"""
+    args = build_parser().parse_args(argv)
+
+    from mysql.connector import Error
+    from backend import open_database
+    from fees import FeeError
+
+    try:
+        with open_database(args.sqlite) as db:
+            # Written before the connection closes: streamed reports are still being fetched
+            data = args.handler(db, args)
+            try:
+                write_output(data, args.format)
+            finally:
+                # Ends a partly read stream (and its snapshot) while the connection is open
+                if hasattr(data, 'close'):
+                    data.close()
+    except CommandError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return e.status
+    except FeeError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return EXIT_REJECTED
+    except OSError as e:
+        print(f"✗ {e}", file=sys.stderr)
+        return EXIT_USAGE
+    except Error as e:
+        print(f"✗ Database error: {e}", file=sys.stderr)
+        return EXIT_ERROR
+    return EXIT_OK
+
+if __name__ == "__main__":
+    sys.exit(run())
@@ -0,0 +1,238 @@
+"""
+Student management module for the Student Organization Management System
+"""
+
+import csv
+import time
+from datetime import datetime
+from tabulate import tabulate
+from audit import BulkAudit
+
+STUDENT_COLUMNS = ('stud_no', 'firstname', 'lastname', 'degrprog', 'batch', 'gender', 'birthday')
+
+PROFILE_SECTIONS = ('student', 'memberships', 'open_fees', 'balances')
+
+class StudentManager:
+    def __init__(self, db_manager):
+        self.db_manager = db_manager
+
+    def manage_students(self):
+        """Manage student records"""
+        while True:
+            print("\n=== Student Management ===")
+            print("1. Bulk Import Students (CSV)")
+            print("2. View Student Profile")
+            print("3. Back to Main Menu")
+
+            choice = input("\nEnter your choice (1-3): ")
+
+            if choice == '1':
+                self.import_students()
+            elif choice == '2':
+                self.view_student_profile()
+            elif choice == '3':
+                break
+            else:
+                print("Invalid choice!")
+
+    def _audit_high_water_mark(self):
+        """Return the latest studentorg_log id"""
+        self.db_manager.cursor.execute("SELECT COALESCE(MAX(log_id), 0) AS log_id FROM studentorg_log")
+        return self.db_manager.cursor.fetchone()['log_id']
+
+    def load_students(self, csv_file, batch_size=1000, update_existing=False, per_row_audit=False):
+        """Register students from a registrar CSV export with batched multi-row inserts.
+
+        Existing student numbers are skipped, or overwritten when
+        update_existing is True. Per-row audit triggers are suppressed unless
+        per_row_audit is True; one summary log row is written per batch
+        instead. Returns a summary dict with counts, the number of
+        studentorg_log rows written and the throughput.
+        """
+        summary = {
+            'read': 0,
+            'inserted': 0,
+            'existing': 0,
+            'invalid': [],
+            'audit_rows': 0,
+            'elapsed': 0.0,
+            'rows_per_sec': 0.0,
+        }
+        cursor = self.db_manager.cursor
+        connection = self.db_manager.connection
+
+        if update_existing:
+            on_duplicate = ", ".join(f"{column} = VALUES({column})" for column in STUDENT_COLUMNS[1:])
+        else:
+            on_duplicate = "stud_no = stud_no"
+        row_placeholder = f"({', '.join(['%s'] * len(STUDENT_COLUMNS))})"
+
+        def flush(batch, audit):
+            keys = [row[0] for row in batch]
+            cursor.execute(f"SELECT COUNT(*) AS existing FROM student WHERE stud_no IN ({', '.join(['%s'] * len(keys))})",
+                           keys)
+            existing = int(cursor.fetchone()['existing'])
+            query = f"""INSERT INTO student ({', '.join(STUDENT_COLUMNS)})
+                        VALUES {', '.join([row_placeholder] * len(batch))}
+                        ON DUPLICATE KEY UPDATE {on_duplicate}"""
+            cursor.execute(query, [value for row in batch for value in row])
+            audit.record_keys('INSERT', keys, len(batch) - existing)
+            if update_existing:
+                audit.record_keys('UPDATE', keys, existing)
+            connection.commit()
+            summary['existing'] += existing
+            summary['inserted'] += len(batch) - existing
+
+        start_log_id = self._audit_high_water_mark()
+        start = time.perf_counter()
+        seen = set()
+        batch = []
+        reader = csv.DictReader(csv_file)
+        with BulkAudit(self.db_manager, 'student', per_row=per_row_audit) as audit:
+            try:
+                for record in reader:
+                    summary['read'] += 1
+                    try:
+                        values = [(record.get(column) or '').strip() for column in STUDENT_COLUMNS]
+                        values[4] = int(values[4])
+                        values[5] = values[5].upper()
+                        values[6] = datetime.strptime(values[6], '%Y-%m-%d').date() if values[6] else None
+                    except (ValueError, AttributeError):
+                        summary['invalid'].append((reader.line_num, record.get('stud_no')))
+                        continue
+                    if not all(values[:3]) or values[5] not in ('M', 'F') or values[0] in seen:
+                        summary['invalid'].append((reader.line_num, values[0]))
+                        continue
+                    seen.add(values[0])
+                    values[3] = values[3] or None
+
+                    batch.append(values)
+                    if len(batch) >= batch_size:
+                        flush(batch, audit)
+                        batch = []
+                if batch:
+                    flush(batch, audit)
+            except Exception:
+                connection.rollback()
+                raise
+
+        summary['elapsed'] = time.perf_counter() - start
+        summary['audit_rows'] = self._audit_high_water_mark() - start_log_id
+        loaded = summary['inserted'] + summary['existing']
+        if summary['elapsed'] > 0:
+            summary['rows_per_sec'] = loaded / summary['elapsed']
+        return summary
+
+    def import_students(self):
+        """Bulk register students from a CSV file"""
+        print("\n=== Bulk Import Students ===")
+        print(f"Expected CSV header: {','.join(STUDENT_COLUMNS)}")
+        path = input("CSV file path: ").strip()
+        update_existing = input("Update students that already exist? (y/N): ").strip().lower() == 'y'
+        per_row_audit = input("Keep per-row audit triggers? (y/N): ").strip().lower() == 'y'
+        try:
+            batch_size = int(input("Batch size [1000]: ").strip() or 1000)
+        except ValueError:
+            print("✗ Invalid batch size.")
+            return
+
+        try:
+            with open(path, newline='', encoding='utf-8') as csv_file:
+                summary = self.load_students(csv_file, batch_size=batch_size, update_existing=update_existing,
+                                             per_row_audit=per_row_audit)
+        except OSError as e:
+            print(f"✗ Could not read file: {e}")
+            return
+        except Exception as e:
+            print(f"✗ Error importing students: {e}")
+            return
+
+        if summary['invalid']:
+            print("\nInvalid or repeated rows:")
+            print(tabulate(summary['invalid'], headers=["Line", "Student No"], tablefmt="grid"))
+
+        print(f"\nRows read: {summary['read']}")
+        print(f"New students: {summary['inserted']}")
+        print(f"Existing students {'updated' if update_existing else 'skipped'}: {summary['existing']}")
+        print(f"Invalid rows: {len(summary['invalid'])}")
+        print(f"Audit log rows written: {summary['audit_rows']}")
+        print(f"Elapsed: {summary['elapsed']:.2f}s ({summary['rows_per_sec']:.0f} rows/sec)")
+        print("✓ Student import complete!")
+
+    def get_student_profile(self, stud_no):
+        """Fetch a student's identity, memberships, open fees and balances in one call.
+
+        Returns a dict keyed by PROFILE_SECTIONS, or None if the student does
+        not exist.
+        """
+        cursor = self.db_manager.cursor
+        cursor.callproc('GetStudentProfile', (stud_no,))
+        profile = dict(zip(PROFILE_SECTIONS, (result.fetchall() for result in cursor.stored_results())))
+        if not profile.get('student'):
+            return None
+        profile['student'] = profile['student'][0]
+        return profile
+
+    def view_student_profile(self, stud_no=None):
+        """View a student's full profile"""
+        if stud_no is None:
+            stud_no = input("Student Number: ").strip()
+
+        try:
+            profile = self.get_student_profile(stud_no)
+        except Exception as e:
+            print(f"✗ Error viewing student profile: {e}")
+            return
+
+        if not profile:
+            print("✗ Student not found!")
+            return
+
+        student = profile['student']
+        print(f"\nStudent: {student['firstname']} {student['lastname']} ({student['stud_no']})")
+        print(f"Program: {student['degrprog']}  Batch: {student['batch']}  "
+              f"Gender: {student['gender']}  Birthday: {student['birthday']}")
+
+        if profile['memberships']:
+            table_data = [[
+                row['acad_year'],
+                row['semester'],
+                row['org_name'],
+                row['role'],
+                row['status'],
+                row['committee']
+            ] for row in profile['memberships']]
+            print("\nMemberships:")
+            print(tabulate(table_data, headers=["Academic Year", "Semester", "Organization", "Role",
+                                                "Status", "Committee"], tablefmt="grid"))
+        else:
+            print("\nNo memberships found.")
+
+        if profile['open_fees']:
+            table_data = [[
+                row['payment_id'],
+                row['org_name'],
+                row['amount'],
+                row['amount_paid'] or 0,
+                row['payment_status'],
+                row['due_date'],
+                row['days_overdue'] if row['days_overdue'] > 0 else 'Not overdue'
+            ] for row in profile['open_fees']]
+            print("\nOpen Fees:")
+            print(tabulate(table_data, headers=["Payment ID", "Organization", "Amount", "Amount Paid",
+                                                "Status", "Due Date", "Days Overdue"], tablefmt="grid"))
+        else:
+            print("\nNo open fees.")
+
+        if profile['balances']:
+            table_data = [[
+                row['org_name'],
+                row['total_fees'],
+                row['total_paid'],
+                row['balance']
+            ] for row in profile['balances']]
+            print("\nBalance per Organization:")
+            print(tabulate(table_data, headers=["Organization", "Total Fees", "Total Paid", "Balance"],
+                           tablefmt="grid"))
+            total_balance = sum(float(row['balance'] or 0) for row in profile['balances'])
+            print(f"\nTotal balance: ₱{total_balance:.2f}")
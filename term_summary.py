@@ -0,0 +1,144 @@
+"""
+Per-term membership summary for the Student Organization Management System
+
+term_membership_summary keeps one row per organization and term with its
+member counts by status and how many members carried over from the
+previous term, archived terms included.
+AdvancedReports.activity_trend reads it instead of scanning belongs_to.
+
+The summary is maintained incrementally from the change feed: each batch
+of belongs_to changes recomputes only the terms it touched (and the terms
+after them, whose carry-over counts depend on them):
+
+    python term_summary.py refresh                  rebuild every term
+    python term_summary.py follow --once            apply new changes (e.g. from cron)
+    python cdc.py --checkpoint cdc/terms.json --subscriber term_summary:TermSummarySubscriber
+"""
+
+import argparse
+import sys
+
+from archive import live_and_archived
+from cdc import ChangeFeed, Subscriber
+from membership import next_term, previous_term
+
+DEFAULT_CHECKPOINT = 'cdc/term_summary.json'
+
+# Terms as consecutive integers (start year * 2 + semester - 1), so the previous term is term_no - 1
+TERM_NO = "CAST(SUBSTRING_INDEX({alias}.acad_year, '-', 1) AS SIGNED) * 2 + {alias}.semester - 1"
+
+SUMMARY_SELECT = f"""
+    SELECT b.org_id, b.acad_year, b.semester, {TERM_NO.format(alias='b')} AS term_no,
+           COUNT(*) AS total_members,
+           SUM(CASE WHEN b.status = 'Active' THEN 1 ELSE 0 END) AS active_members,
+           SUM(CASE WHEN b.status = 'Inactive' THEN 1 ELSE 0 END) AS inactive_members,
+           SUM(CASE WHEN b.status = 'Alumni' THEN 1 ELSE 0 END) AS alumni_members,
+           COUNT(prev.stud_no) AS retained_members
+    FROM {{members}}
+    LEFT JOIN {{previous}}
+           ON prev.stud_no = b.stud_no
+          AND prev.org_id = b.org_id
+          AND prev.semester = IF(b.semester = '1', '2', '1')
+          AND prev.acad_year = IF(b.semester = '2', b.acad_year,
+                                  CONCAT(CAST(SUBSTRING_INDEX(b.acad_year, '-', 1) AS SIGNED) - 1, '-',
+                                         SUBSTRING_INDEX(b.acad_year, '-', 1)))
+    {{where}}
+    GROUP BY b.org_id, b.acad_year, b.semester
+"""
+
+SUMMARY_COLUMNS = ('org_id', 'acad_year', 'semester', 'term_no', 'total_members', 'active_members',
+                   'inactive_members', 'alumni_members', 'retained_members')
+
+def refresh_all(db_manager):
+    """Rebuild the whole summary from belongs_to; returns the number of terms"""
+    cursor = db_manager.cursor
+    cursor.execute("DELETE FROM term_membership_summary")
+    cursor.execute(f"INSERT INTO term_membership_summary ({', '.join(SUMMARY_COLUMNS)}) "
+                   + SUMMARY_SELECT.format(members='belongs_to_all b', previous='belongs_to_all prev', where=''))
+    count = cursor.rowcount
+    db_manager.connection.commit()
+    return count
+
+def refresh_terms(db_manager, terms, batch_size=500):
+    """Recompute the summary rows of some (org_id, acad_year, semester) terms.
+
+    The terms and their previous terms are read from the live and archive
+    tables separately (archive.live_and_archived), so only their rows are
+    read rather than every archived term.
+    """
+    terms = sorted(set(terms))
+    cursor = db_manager.cursor
+    for start in range(0, len(terms), batch_size):
+        chunk = terms[start:start + batch_size]
+        placeholder = f"({', '.join(['(%s, %s, %s)'] * len(chunk))})"
+        params = [value for term in chunk for value in term]
+        previous_params = [value for org_id, acad_year, semester in chunk
+                           for value in (org_id, *reversed(previous_term(semester, acad_year)))]
+        members = live_and_archived('belongs_to', f"(b.org_id, b.acad_year, b.semester) IN {placeholder}", 'b')
+        previous = live_and_archived('belongs_to', f"(prev.org_id, prev.acad_year, prev.semester) IN {placeholder}",
+                                     'prev')
+        cursor.execute(f"DELETE FROM term_membership_summary WHERE (org_id, acad_year, semester) IN {placeholder}",
+                       params)
+        cursor.execute(f"INSERT INTO term_membership_summary ({', '.join(SUMMARY_COLUMNS)}) "
+                       + SUMMARY_SELECT.format(members=members, previous=previous, where=''),
+                       params * 2 + previous_params * 2)
+    db_manager.connection.commit()
+    return len(terms)
+
+def affected_terms(org_id, semester, acad_year):
+    """A membership change alters its own term and the carry-over count of the next one"""
+    following_semester, following_year = next_term(str(semester), acad_year)
+    return [(int(org_id), acad_year, str(semester)), (int(org_id), following_year, following_semester)]
+
+class TermSummarySubscriber(Subscriber):
+    """Keeps term_membership_summary current from belongs_to change events"""
+
+    name = 'term-summary'
+
+    def bind(self, db_manager):
+        self.db_manager = db_manager
+
+    def apply(self, events):
+        terms = set()
+        for event in events:
+            if event.table != 'belongs_to':
+                continue
+            if event.change_type == 'BULK_DEL':
+                # A deleted key range cannot be narrowed to terms
+                refresh_all(self.db_manager)
+                return
+            _, org_id, semester, acad_year = event.key
+            terms.update(affected_terms(org_id, semester, acad_year))
+        if terms:
+            refresh_terms(self.db_manager, terms)
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the per-term membership summary")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('refresh', help="rebuild the summary from belongs_to")
+    follow = commands.add_parser('follow', help="apply belongs_to changes from studentorg_log")
+    follow.add_argument('--checkpoint', default=DEFAULT_CHECKPOINT)
+    follow.add_argument('--interval', type=float, default=2.0, help="seconds between polls when idle")
+    follow.add_argument('--once', action='store_true', help="stop when caught up")
+    for command in commands.choices.values():
+        command.add_argument('--sqlite', metavar='PATH', help="use a SQLite database instead of MariaDB")
+    args = parser.parse_args()
+
+    from backend import open_database
+    with open_database(args.sqlite) as db_manager:
+        if args.command == 'refresh':
+            print(f"✓ Summarized {refresh_all(db_manager)} organization terms")
+            return 0
+        feed = ChangeFeed(db_manager, [TermSummarySubscriber()], args.checkpoint)
+        if feed.log_id is None:
+            # The summary is rebuilt once, then kept current from this log position
+            feed.start_from_latest()
+            refresh_all(db_manager)
+        try:
+            feed.run(poll_interval=args.interval, once=args.once)
+        except KeyboardInterrupt:
+            print(f"\nStopped at log_id {feed.log_id}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
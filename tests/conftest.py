@@ -0,0 +1,54 @@
+"""
+Shared fixtures: an empty SQLite database (backend.py) and helpers that add rows to it
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+@pytest.fixture
+def db(tmp_path):
+    """A SQLiteDatabase with the SOMS schema, triggers and emulated procedures"""
+    from backend import SQLiteDatabase
+    with SQLiteDatabase(str(tmp_path / 'soms.db')) as database:
+        yield database
+
+def add_student(db, stud_no, firstname='Juan', lastname='Santos', batch=2020):
+    db.cursor.execute("""INSERT INTO student (stud_no, firstname, lastname, degrprog, batch, gender, birthday)
+                         VALUES (%s, %s, %s, 'BSCS', %s, 'M', '2002-01-01')""",
+                      (stud_no, firstname, lastname, batch))
+    db.connection.commit()
+
+def add_org(db, org_name='Young Computer Scientists'):
+    db.cursor.execute("INSERT INTO organization (org_name, year_established) VALUES (%s, '2000-01-01')",
+                      (org_name,))
+    db.connection.commit()
+    return db.cursor.lastrowid
+
+def add_member(db, stud_no, org_id, semester='1', acad_year='2024-2025', status='Active', role='Member',
+               committee='Membership', batch_year=None):
+    db.cursor.execute("""INSERT INTO belongs_to (stud_no, org_id, semester, acad_year, status, role, committee,
+                                                 batch_year)
+                         VALUES (%s, %s, %s, %s, %s, %s, %s, %s)""",
+                      (stud_no, org_id, semester, acad_year, status, role, committee,
+                       batch_year or int(acad_year.split('-')[0])))
+    db.connection.commit()
+
+def add_fee(db, stud_no, org_id, amount, due_date, amount_paid=0, payment_date=None):
+    """Insert a fee, Paid, Partial or Not Paid according to amount_paid; returns its payment_id"""
+    if amount_paid >= amount:
+        status = 'Paid'
+    elif amount_paid > 0:
+        status = 'Partial'
+    else:
+        status = 'Not Paid'
+    db.cursor.execute("""INSERT INTO payment (amount_paid, payment_date, payment_status, amount, due_date, org_id,
+                                              stud_no)
+                         VALUES (%s, %s, %s, %s, %s, %s, %s)""",
+                      (amount_paid, payment_date, status, amount, due_date, org_id, stud_no))
+    db.connection.commit()
+    return db.cursor.lastrowid
@@ -0,0 +1,84 @@
+from decimal import Decimal
+
+import pytest
+
+from conftest import add_fee, add_member, add_org, add_student
+
+@pytest.fixture
+def years(db):
+    """Three academic years of memberships and fees in one organization"""
+    org_id = add_org(db)
+    for stud_no in ('2020-00001', '2020-00002', '2020-00003'):
+        add_student(db, stud_no)
+    for acad_year, semesters in (('2022-2023', '12'), ('2023-2024', '12'), ('2024-2025', '1')):
+        for semester in semesters:
+            add_member(db, '2020-00001', org_id, semester, acad_year, role='President', committee='Executive')
+            add_member(db, '2020-00002', org_id, semester, acad_year,
+                       status='Inactive' if acad_year == '2022-2023' else 'Active')
+            if acad_year != '2022-2023':
+                add_member(db, '2020-00003', org_id, semester, acad_year)
+    add_fee(db, '2020-00001', org_id, Decimal('100.00'), '2022-09-30', amount_paid=Decimal('100.00'),
+            payment_date='2022-09-15')
+    add_fee(db, '2020-00001', org_id, Decimal('100.00'), '2022-10-30', amount_paid=Decimal('40.00'),
+            payment_date='2022-11-15')
+    add_fee(db, '2020-00002', org_id, Decimal('75.00'), '2023-03-31')
+    add_fee(db, '2020-00003', org_id, Decimal('120.00'), '2024-09-30', amount_paid=Decimal('120.00'),
+            payment_date='2024-09-01')
+    return org_id
+
+def report_outputs(db, org_id):
+    from reports import AdvancedReports
+    from term_summary import refresh_all
+    reports = AdvancedReports(db)
+    refresh_all(db)
+    return {
+        'role_history': reports.role_history(org_id, 'President'),
+        'executive_committee': reports.executive_committee(org_id, '2022-2023'),
+        'late_payments': reports.late_payments(org_id, '2022-2023', 1),
+        'active_inactive_percentage': reports.active_inactive_percentage(org_id, 10),
+        'top_debtors': reports.top_debtors(),
+        'activity_trend': reports.activity_trend(org_id),
+    }
+
+def count(db, table):
+    db.cursor.execute(f"SELECT COUNT(*) AS n FROM {table}")
+    return db.cursor.fetchone()['n']
+
+def test_archive_year_round_trip(db, years):
+    from archive import archive_status, archive_year, closed_years
+    before = report_outputs(db, years)
+    assert before['executive_committee'] and before['late_payments']
+    totals = count(db, 'payment_all'), count(db, 'belongs_to_all')
+    logged = count(db, 'studentorg_log')
+
+    assert closed_years(db, 2024) == [2022, 2023]
+    # Only the settled fee moves; the partial and the unpaid fee stay live however old
+    assert archive_year(db, 2022) == (1, 4)
+    assert (count(db, 'payment_archive'), count(db, 'belongs_to_archive')) == (1, 4)
+    assert (count(db, 'payment_all'), count(db, 'belongs_to_all')) == totals
+    assert report_outputs(db, years) == before
+    assert count(db, 'studentorg_log') == logged
+
+    assert archive_status(db)[0] == {'acad_year': '2022-2023', 'live_payments': 2, 'archived_payments': 1,
+                                     'live_memberships': 0, 'archived_memberships': 4}
+    assert closed_years(db, 2024) == [2023]
+    assert archive_year(db, 2023) == (0, 6)
+    assert report_outputs(db, years) == before
+
+def test_archive_year_refuses_archived_keys(db, years):
+    from archive import ArchiveError, archive_year
+    archive_year(db, 2022)
+    # A row written straight into a closed year, bypassing the membership checks
+    add_member(db, '2020-00001', years, '1', '2022-2023')
+    with pytest.raises(ArchiveError, match="2022-2023: 0 payments and 1 memberships are already archived"):
+        archive_year(db, 2022)
+    assert count(db, 'belongs_to_archive') == 4
+
+def test_rollover_into_archived_term(db, years):
+    from archive import archive_year
+    from membership import MembershipManager
+    archive_year(db, 2022)
+    summary = MembershipManager(db).rollover_members('1', '2023-2024', '2', '2022-2023')
+    assert summary == {'eligible': 3, 'already_enrolled': 2, 'inserted': 1}
+    db.cursor.execute("SELECT stud_no FROM belongs_to WHERE acad_year = '2022-2023'")
+    assert [row['stud_no'] for row in db.cursor.fetchall()] == ['2020-00003']
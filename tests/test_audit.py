@@ -0,0 +1,47 @@
+from audit import BulkAudit, belongs_to_key, parse_bulk_identifier
+from conftest import add_student
+
+def log_rows(db):
+    db.cursor.execute("SELECT table_name, record_identifier, change_type FROM studentorg_log ORDER BY log_id")
+    return [(row['table_name'], row['record_identifier'], row['change_type']) for row in db.cursor.fetchall()]
+
+def test_bulk_identifier_round_trip():
+    first = belongs_to_key('2020-00001', 1001, '1', '2024-2025')
+    last = belongs_to_key('2020-00010', 1001, '2', '2024-2025')
+    assert first == '2020-00001-1001-1-2024-2025'
+    assert parse_bulk_identifier(f"{first}..{last} (10 rows)") == (first, last, 10)
+    assert parse_bulk_identifier('2020-00001-1001-1-2024-2025') is None
+    assert parse_bulk_identifier(None) is None
+
+def test_bulk_audit_replaces_per_row_logs(db):
+    before = log_rows(db)
+    with BulkAudit(db, 'student') as audit:
+        for stud_no in ('2020-00003', '2020-00001', '2020-00002'):
+            add_student(db, stud_no)
+        audit.record_keys('INSERT', ['2020-00003', '2020-00001', '2020-00002'])
+        audit.record('DELETE', 'x', 'y', 0)
+        db.connection.commit()
+    assert audit.batches == 1
+    assert log_rows(db) == before + [('student', '2020-00001..2020-00003 (3 rows)', 'BULK_INS')]
+
+    # The flag is cleared on exit, so the triggers write per-row logs again
+    add_student(db, '2020-00004')
+    assert log_rows(db)[-1][1:] == ('2020-00004', 'INSERT')
+
+def test_bulk_audit_record_keys_count(db):
+    with BulkAudit(db, 'belongs_to') as audit:
+        audit.record_keys('UPDATE', [3, 10, 7], count=2)
+        audit.record_keys('UPDATE', [])
+        db.connection.commit()
+    # Keys are compared as record identifiers (strings), not as numbers
+    assert log_rows(db)[-1] == ('belongs_to', '10..7 (2 rows)', 'BULK_UPD')
+    assert audit.batches == 1
+
+def test_bulk_audit_per_row(db):
+    with BulkAudit(db, 'student', per_row=True) as audit:
+        add_student(db, '2020-00001')
+        add_student(db, '2020-00002')
+        audit.record_keys('INSERT', ['2020-00001', '2020-00002'])
+        db.connection.commit()
+    assert audit.batches == 0
+    assert [row[1:] for row in log_rows(db)[-2:]] == [('2020-00001', 'INSERT'), ('2020-00002', 'INSERT')]
@@ -0,0 +1,20 @@
+from conftest import add_student
+
+def log_count(db):
+    db.cursor.execute("SELECT COUNT(*) AS n FROM studentorg_log")
+    return db.cursor.fetchone()['n']
+
+def test_session_flags_are_not_transactional(db):
+    db.cursor.execute("SET @soms_skip_audit = 1")
+    assert not db.connection.in_transaction
+    db.cursor.execute("INSERT INTO organization (org_name, year_established) VALUES ('Chess Club', '2001-01-01')")
+    db.connection.rollback()
+
+    # Like a MariaDB session variable, the flag survives the rollback
+    before = log_count(db)
+    add_student(db, '2020-00001')
+    assert log_count(db) == before
+    db.cursor.execute("SET @soms_skip_audit = NULL")
+    assert not db.connection.in_transaction
+    add_student(db, '2020-00002')
+    assert log_count(db) == before + 1
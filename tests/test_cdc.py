@@ -0,0 +1,56 @@
+import time
+
+import pytest
+
+from cdc import ChangeFeed, Subscriber
+from conftest import add_student
+
+class Recorder(Subscriber):
+    def __init__(self):
+        self.batches = []
+
+    def apply(self, events):
+        self.batches.append([(event.table, event.key, event.row and event.row['firstname']) for event in events])
+
+@pytest.fixture
+def manila(monkeypatch):
+    """A host clock eight hours ahead of SQLite's UTC CURRENT_TIMESTAMP"""
+    monkeypatch.setenv('TZ', 'Asia/Manila')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_subscribers_must_apply():
+    class Incomplete(Subscriber):
+        pass
+    with pytest.raises(TypeError, match="apply"):
+        Incomplete()
+
+def test_feed_publishes_current_rows(db, tmp_path):
+    recorder = Recorder()
+    feed = ChangeFeed(db, [recorder], str(tmp_path / 'feed.json'))
+    feed.start_from_latest()
+    add_student(db, '2020-00001')
+    add_student(db, '2020-00002')
+    db.cursor.execute("UPDATE student SET firstname = 'Ana' WHERE stud_no = '2020-00001'")
+    db.connection.commit()
+    assert feed.poll() == 3
+    assert recorder.batches == [[('student', ('2020-00002',), 'Juan'), ('student', ('2020-00001',), 'Ana')]]
+    assert ChangeFeed(db, [], feed.checkpoint_path).log_id == feed.log_id
+
+def test_recent_gaps_are_held_on_the_database_clock(db, tmp_path, manila):
+    feed = ChangeFeed(db, [Recorder()], str(tmp_path / 'feed.json'), gap_grace=60)
+    feed.start_from_latest()
+    add_student(db, '2020-00001')
+    # A log_id taken by a transaction that has not committed yet
+    db.cursor.execute("""INSERT INTO studentorg_log (log_id, table_name, record_identifier, change_type)
+                         VALUES (%s, 'student', '2020-00002', 'INSERT')""", (feed.log_id + 3,))
+    db.connection.commit()
+    assert [entry['log_id'] for entry in feed.read_log()] == [feed.log_id + 1]
+
+    # Once older than gap_grace on the database clock, the gap is a rolled-back insert
+    db.cursor.execute("""UPDATE studentorg_log SET change_timestamp = DATETIME(change_timestamp, '-2 minutes')
+                         WHERE log_id = %s""", (feed.log_id + 3,))
+    db.connection.commit()
+    assert [entry['log_id'] for entry in feed.read_log()] == [feed.log_id + 1, feed.log_id + 3]
@@ -0,0 +1,78 @@
+from conftest import add_member, add_org, add_student
+from database import iter_procedure
+
+class FakeResult:
+    """One statement result of a CALL: its rows, fetched in batches"""
+
+    def __init__(self, rows):
+        self.with_rows = rows is not None
+        self.rows = list(rows or [])
+
+    def fetchmany(self, size):
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+class FakeCursor:
+    """A cursor whose multi-statement CALL yields a result set and the closing OK packet"""
+
+    def __init__(self, rows):
+        self.statements = [FakeResult(rows), FakeResult(None)]
+        self.consumed = 0
+        self.closed = False
+
+    def execute(self, operation, params=(), multi=False):
+        assert operation == 'CALL GetReport(%s, %s)' and multi
+        for statement in self.statements:
+            self.consumed += 1
+            yield statement
+
+    def close(self):
+        # The connector raises "Unread result found" when the OK packet is left on the wire
+        assert self.consumed == len(self.statements), "CALL results not drained"
+        self.closed = True
+
+class FakeConnection:
+    def __init__(self, rows):
+        self.cursors = []
+        self.rows = rows
+
+    def cursor(self, dictionary=False, buffered=False):
+        self.cursors.append(FakeCursor(self.rows))
+        return self.cursors[-1]
+
+class FakeDatabase:
+    def __init__(self, rows):
+        self.connection = FakeConnection(rows)
+
+ROWS = [{'stud_no': f"2020-{n:05d}"} for n in range(1, 8)]
+
+def test_iter_procedure_reads_every_batch():
+    db = FakeDatabase(ROWS)
+    assert list(iter_procedure(db, 'GetReport', (1001, '2024-2025'), batch_size=3)) == ROWS
+    [cursor] = db.connection.cursors
+    assert cursor.closed
+
+def test_iter_procedure_drains_when_closed_early():
+    db = FakeDatabase(ROWS)
+    rows = iter_procedure(db, 'GetReport', (1001, '2024-2025'), batch_size=3)
+    assert next(rows) == ROWS[0]
+    rows.close()
+    [cursor] = db.connection.cursors
+    assert cursor.closed
+    assert cursor.statements[0].rows == []
+
+def test_iter_procedure_without_result_set():
+    db = FakeDatabase(None)
+    assert list(iter_procedure(db, 'GetReport', (1001, '2024-2025'))) == []
+    assert db.connection.cursors[0].closed
+
+def test_iter_procedure_emulated(db):
+    org_id = add_org(db)
+    for stud_no in ('2020-00001', '2020-00002', '2020-00003'):
+        add_student(db, stud_no)
+        add_member(db, stud_no, org_id, committee='Executive')
+    rows = list(iter_procedure(db, 'GetExecutiveCommitteeMembers', (org_id, '2024-2025'), batch_size=2))
+    assert sorted(row['stud_no'] for row in rows) == ['2020-00001', '2020-00002', '2020-00003']
+    # The connection is free for the next statement
+    db.cursor.execute("SELECT COUNT(*) AS members FROM belongs_to")
+    assert db.cursor.fetchone()['members'] == 3
@@ -0,0 +1,202 @@
+import shutil
+import sys
+import types
+from decimal import Decimal
+
+import pytest
+from mysql.connector import errors
+
+import drivers
+from conftest import add_fee, add_member, add_org, add_student
+
+class StubError(Exception):
+    def __init__(self, msg, errno=None, sqlstate=None):
+        super().__init__(msg)
+        self.errno = errno
+        self.sqlstate = sqlstate
+
+class StubCursor:
+    """A MariaDB Connector/Python cursor: callproc() leaves one result set current, nextset() moves on"""
+
+    def __init__(self, raw, **options):
+        self.raw = raw
+        self.options = options
+        self.description = None
+        self.rows = []
+        self.sets = []
+        self.lastrowid = None
+        self.rowcount = -1
+
+    def execute(self, query, params=()):
+        if self.raw.errors:
+            raise self.raw.errors.pop(0)
+        self.raw.statements.append((query, params))
+
+    def callproc(self, procedure, args=()):
+        self.raw.statements.append((f"CALL {procedure}", args))
+        self.sets = list(self.raw.procedures[procedure])
+        self.nextset()
+
+    def nextset(self):
+        if not self.sets:
+            return None
+        self.description, self.rows = self.sets.pop(0)
+        return True
+
+    def fetchall(self):
+        rows, self.rows = self.rows, []
+        return rows
+
+    def close(self):
+        pass
+
+class StubConnection:
+    def __init__(self, **config):
+        self.config = config
+        self.statements = []
+        self.errors = []
+        self.procedures = {}
+        self.commits = 0
+
+    def cursor(self, **options):
+        return StubCursor(self, **options)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+@pytest.fixture
+def mariadb(monkeypatch):
+    """A stand-in mariadb module with the connector's error classes and connect()"""
+    module = types.ModuleType('mariadb')
+    module.Error = StubError
+    module.DatabaseError = type('DatabaseError', (StubError,), {})
+    for name in ('IntegrityError', 'DataError', 'OperationalError', 'ProgrammingError', 'NotSupportedError',
+                 'InterfaceError', 'InternalError'):
+        setattr(module, name, type(name, (module.DatabaseError,), {}))
+    module.connections = []
+
+    def connect(**config):
+        if config.get('password') == 'wrong':
+            raise module.OperationalError("Access denied for user 'soms'", errno=1045, sqlstate='28000')
+        module.connections.append(StubConnection(**config))
+        return module.connections[-1]
+
+    module.connect = connect
+    monkeypatch.setitem(sys.modules, 'mariadb', module)
+    return module
+
+def test_connect_passes_the_configuration(mariadb):
+    connection = drivers.connect('mariadb', host='db', user='soms', password='secret', database='soms',
+                                 pool_name='ignored')
+    assert isinstance(connection, drivers.MariaDBConnection)
+    assert mariadb.connections[0].config == {'host': 'db', 'user': 'soms', 'password': 'secret',
+                                             'database': 'soms', 'port': 3306, 'autocommit': False}
+    with pytest.raises(SystemExit):
+        drivers.connect('sqlite')
+
+def test_missing_connector(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'mariadb', None)
+    with pytest.raises(SystemExit, match="pip install mariadb"):
+        drivers.connect('mariadb')
+
+def test_callproc_collects_every_result_set(mariadb):
+    connection = drivers.connect('mariadb')
+    mariadb.connections[0].procedures['GetStudentProfile'] = [
+        ((('stud_no',), ('name',)), [{'stud_no': '2020-00001', 'name': 'Juan Santos'}]),
+        ((('org_name',),), [{'org_name': 'Young Computer Scientists'}, {'org_name': 'Society of Biologists'}]),
+        # The status of the CALL itself has no result set
+        (None, []),
+    ]
+    cursor = connection.cursor(dictionary=True)
+    assert cursor.callproc('GetStudentProfile', ['2020-00001']) == ['2020-00001']
+    profile, organizations = cursor.stored_results()
+    assert profile.description == (('stud_no',), ('name',))
+    assert profile.fetchall() == [{'stud_no': '2020-00001', 'name': 'Juan Santos'}]
+    assert organizations.fetchmany(1) == [{'org_name': 'Young Computer Scientists'}]
+    assert organizations.fetchone() == {'org_name': 'Society of Biologists'}
+    assert mariadb.connections[0].statements == [('CALL GetStudentProfile', ('2020-00001',))]
+
+def test_transactions(mariadb):
+    connection = drivers.connect('mariadb')
+    raw = mariadb.connections[0]
+    assert not connection.in_transaction
+
+    connection.start_transaction(readonly=True)
+    assert raw.statements[-1] == ('START TRANSACTION READ ONLY', ())
+    assert connection.in_transaction
+    with pytest.raises(errors.ProgrammingError):
+        connection.start_transaction()
+    connection.commit()
+    assert not connection.in_transaction
+
+    connection.start_transaction(consistent_snapshot=True, isolation_level='REPEATABLE READ', readonly=False)
+    assert raw.statements[-2:] == [('SET TRANSACTION ISOLATION LEVEL REPEATABLE READ', ()),
+                                   ('START TRANSACTION WITH CONSISTENT SNAPSHOT, READ WRITE', ())]
+    connection.rollback()
+
+    # A statement outside start_transaction() opens one too, as with mysql.connector without autocommit
+    connection.cursor().execute("SELECT 1")
+    assert connection.in_transaction
+    connection.commit()
+    assert (connection.in_transaction, raw.commits) == (False, 2)
+
+def test_errors_are_translated(mariadb):
+    error = drivers.translate_error(mariadb.IntegrityError("Duplicate entry", errno=1062, sqlstate='23000'))
+    assert isinstance(error, errors.IntegrityError)
+    assert (error.errno, error.sqlstate) == (1062, '23000')
+    assert "Duplicate entry" in str(error)
+    assert type(drivers.translate_error(mariadb.Error("Lost connection"))) is errors.DatabaseError
+
+    connection = drivers.connect('mariadb')
+    mariadb.connections[0].errors.append(mariadb.ProgrammingError("You have an error in your SQL syntax",
+                                                                  errno=1064))
+    with pytest.raises(errors.ProgrammingError) as raised:
+        connection.cursor().execute("SELEC 1")
+    assert raised.value.errno == 1064
+    assert isinstance(raised.value.__cause__, mariadb.ProgrammingError)
+
+    with pytest.raises(errors.OperationalError) as raised:
+        drivers.connect('mariadb', password='wrong')
+    assert raised.value.errno == 1045
+
+def test_normalize():
+    assert drivers.normalize(Decimal('150.00')) == drivers.normalize(150.0) == Decimal('150.0000')
+    assert drivers.normalize(b'Juan') == 'Juan'
+    assert drivers.normalize('2020-00001') == '2020-00001'
+
+def test_check_parity_reports_mismatches(db, tmp_path, monkeypatch):
+    import main
+    from backend import SQLiteConnection
+    org_id = add_org(db)
+    for stud_no in ('2020-00001', '2020-00002'):
+        add_student(db, stud_no)
+        add_member(db, stud_no, org_id)
+    add_fee(db, '2020-00001', org_id, Decimal('100.00'), '2024-09-30')
+    add_fee(db, '2020-00002', org_id, Decimal('80.00'), '2024-09-30', amount_paid=Decimal('20.00'),
+            payment_date='2024-09-01')
+    # Each driver reads its own copy of the same data, until the mysql-c copy is changed
+    paths = {'mysql': db.path, 'mysql-c': str(tmp_path / 'mysql-c.db')}
+    shutil.copy(db.path, paths['mysql-c'])
+    monkeypatch.setattr(main, 'connect', lambda driver, **config: SQLiteConnection(paths[driver]))
+
+    assert drivers.check_parity(['mysql', 'mysql-c']) == []
+
+    def change(statement):
+        connection = SQLiteConnection(paths['mysql-c'])
+        connection.cursor().execute(statement)
+        connection.commit()
+        connection.close()
+        return {name: problem for name, driver, problem in drivers.check_parity(['mysql', 'mysql-c'])
+                if driver == 'mysql-c'}
+
+    problems = change("UPDATE payment SET amount = 90 WHERE stud_no = '2020-00002'")
+    assert problems['top-debtors'].startswith("row 1 differs: {'debt_rank': 2, 'stud_no': '2020-00002'")
+    assert "'balance': 70" in problems['top-debtors']
+    problems = change("DELETE FROM payment WHERE stud_no = '2020-00001'")
+    assert problems['top-debtors'] == "1 rows, mysql returned 2"
@@ -0,0 +1,94 @@
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+
+from conftest import add_fee, add_member, add_org, add_student
+
+@pytest.fixture
+def history(db):
+    """A generated-style dataset whose history is backdated with seed_history(backdate=True)"""
+    from history import seed_history
+    org_id = add_org(db)
+    add_student(db, '2020-00001')
+    db.cursor.execute("SET @soms_skip_history = 1")
+    add_member(db, '2020-00001', org_id, semester='2', acad_year='2023-2024')
+    add_fee(db, '2020-00001', org_id, Decimal('100.00'), '2024-03-31', amount_paid=Decimal('100.00'),
+            payment_date='2024-03-15')
+    unpaid = add_fee(db, '2020-00001', org_id, Decimal('50.00'), '2024-04-30')
+    db.cursor.execute("UPDATE payment SET payment_status = 'Unpaid' WHERE payment_id = %s", (unpaid,))
+    db.connection.commit()
+    db.cursor.execute("SET @soms_skip_history = NULL")
+    assert seed_history(db, backdate=True) == {'payment': 3, 'belongs_to': 1}
+    return org_id, unpaid
+
+def fees_summary(db, org_id, as_of_date):
+    from reports import AdvancedReports
+    rows = AdvancedReports(db).fees_summary_by_date(org_id, as_of_date)
+    return sorted((str(row['due_date']), Decimal(str(row['total_paid'])), Decimal(str(row['total_unpaid'])))
+                  for row in rows)
+
+def fee_totals(db, org_id, as_of_date):
+    """GetOrgFeeTotalsAsOfDate: one row of paid and unpaid totals per organization"""
+    from fees import FeesManager
+    return [(Decimal(str(row['total_paid_fees'])), Decimal(str(row['total_unpaid_fees'])))
+            for row in FeesManager(db).org_fee_totals(org_id, as_of_date)]
+
+def alumni(db, org_id, as_of_date):
+    from reports import AdvancedReports
+    return [row['stud_no'] for row in AdvancedReports(db).alumni_members(org_id, as_of_date)]
+
+def test_backdated_fee_versions(db, history):
+    org_id, _ = history
+    # Fees are on record 30 days before they are due, paid from their payment date
+    assert fees_summary(db, org_id, '2024-02-29') == []
+    assert fees_summary(db, org_id, '2024-03-10') == [('2024-03-31', Decimal('0'), Decimal('0'))]
+    assert fees_summary(db, org_id, '2024-03-20') == [('2024-03-31', Decimal('100'), Decimal('0'))]
+    assert fees_summary(db, org_id, '2024-04-15') == [('2024-03-31', Decimal('100'), Decimal('0')),
+                                                      ('2024-04-30', Decimal('0'), Decimal('50'))]
+    assert fee_totals(db, org_id, '2024-02-29') == []
+    assert fee_totals(db, org_id, '2024-04-15') == [(Decimal('100'), Decimal('50'))]
+
+def test_changes_open_new_versions(db, history):
+    org_id, unpaid = history
+    today = date.today()
+    db.cursor.execute("""UPDATE payment SET amount_paid = amount, payment_date = %s, payment_status = 'Paid'
+                         WHERE payment_id = %s""", (today, unpaid))
+    db.cursor.execute("UPDATE belongs_to SET status = 'Alumni' WHERE org_id = %s", (org_id,))
+    db.connection.commit()
+
+    # Earlier dates still read the versions that were current then
+    assert fees_summary(db, org_id, '2024-04-15')[1] == ('2024-04-30', Decimal('0'), Decimal('50'))
+    assert fees_summary(db, org_id, today)[1] == ('2024-04-30', Decimal('50'), Decimal('0'))
+    assert fee_totals(db, org_id, '2024-04-15') == [(Decimal('100'), Decimal('50'))]
+    assert fee_totals(db, org_id, today) == [(Decimal('150'), Decimal('0'))]
+
+    assert alumni(db, org_id, '2024-01-15') == []
+    assert alumni(db, org_id, today - timedelta(days=1)) == []
+    assert alumni(db, org_id, today) == ['2020-00001']
+
+def test_seed_history_is_idempotent(db, history):
+    from history import seed_history
+    assert seed_history(db) == {'payment': 0, 'belongs_to': 0}
+    db.cursor.execute("SELECT COUNT(*) AS versions FROM payment_history")
+    assert db.cursor.fetchone()['versions'] == 3
+
+def test_columnar_engine_reads_the_same_versions(db, history):
+    from columnar import ColumnarEngine
+    from reports import AdvancedReports
+    org_id, unpaid = history
+    today = date.today()
+    db.cursor.execute("UPDATE payment SET amount_paid = amount, payment_status = 'Paid' WHERE payment_id = %s",
+                      (unpaid,))
+    db.cursor.execute("UPDATE belongs_to SET status = 'Alumni' WHERE org_id = %s", (org_id,))
+    db.connection.commit()
+
+    engine = ColumnarEngine.from_database(db)
+    reports = AdvancedReports(db)
+    for as_of_date in ('2024-02-29', '2024-03-20', '2024-04-15', today - timedelta(days=1), today):
+        assert ([(row['due_date'], row['total_paid'], row['total_unpaid'])
+                 for row in engine.fees_summary_by_date(org_id, as_of_date)] ==
+                sorted((row['due_date'], Decimal(str(row['total_paid'])), Decimal(str(row['total_unpaid'])))
+                       for row in reports.fees_summary_by_date(org_id, as_of_date)))
+        assert engine.alumni_members(org_id, as_of_date) == reports.alumni_members(org_id, as_of_date)
+    assert engine.run_report('alumni', org_id=org_id, as_of_date=today)[0]['alumni_record'] == "Member, Membership, 2 sem"
@@ -0,0 +1,116 @@
+import io
+
+import pytest
+
+from conftest import add_member, add_org, add_student
+
+@pytest.fixture
+def term(db):
+    """Four 2024-2025 first-semester members of one organization; 2020-00002 already enrolled in the second"""
+    org_id = add_org(db)
+    for stud_no in ('2020-00001', '2020-00002', '2020-00003', '2020-00004'):
+        add_student(db, stud_no)
+    add_member(db, '2020-00001', org_id)
+    add_member(db, '2020-00002', org_id)
+    add_member(db, '2020-00003', org_id)
+    add_member(db, '2020-00004', org_id, status='Inactive')
+    add_member(db, '2020-00002', org_id, semester='2')
+    return org_id
+
+def manager(db):
+    from membership import MembershipManager
+    return MembershipManager(db)
+
+def log_rows(db, change_type):
+    db.cursor.execute("""SELECT record_identifier FROM studentorg_log
+                         WHERE table_name = 'belongs_to' AND change_type = %s
+                         ORDER BY log_id""", (change_type,))
+    return [row['record_identifier'] for row in db.cursor.fetchall()]
+
+def second_semester(db):
+    db.cursor.execute("""SELECT stud_no FROM belongs_to WHERE semester = '2' AND acad_year = '2024-2025'
+                         ORDER BY stud_no""")
+    return [row['stud_no'] for row in db.cursor.fetchall()]
+
+def roster(*lines):
+    return io.StringIO('\n'.join(('stud_no,org_id,semester,acad_year,status,role,committee',) + lines) + '\n')
+
+def test_rollover_dry_run_counts_without_writing(db, term):
+    summary = manager(db).rollover_members('1', '2024-2025', '2', '2024-2025', dry_run=True)
+    assert summary == {'eligible': 3, 'already_enrolled': 1, 'inserted': 0}
+    assert second_semester(db) == ['2020-00002']
+
+def test_rollover_copies_active_members_once(db, term):
+    from audit import belongs_to_key, parse_bulk_identifier
+    before = len(log_rows(db, 'INSERT'))
+    summary = manager(db).rollover_members('1', '2024-2025', '2', '2024-2025')
+    assert summary == {'eligible': 3, 'already_enrolled': 1, 'inserted': 2}
+    assert second_semester(db) == ['2020-00001', '2020-00002', '2020-00003']
+
+    # One summary row replaces the per-row trigger rows
+    assert len(log_rows(db, 'INSERT')) == before
+    [identifier] = log_rows(db, 'BULK_INS')
+    assert parse_bulk_identifier(identifier) == (belongs_to_key('2020-00001', term, '2', '2024-2025'),
+                                                 belongs_to_key('2020-00003', term, '2', '2024-2025'), 2)
+
+    assert manager(db).rollover_members('1', '2024-2025', '2', '2024-2025') == {
+        'eligible': 3, 'already_enrolled': 3, 'inserted': 0}
+    assert len(log_rows(db, 'BULK_INS')) == 1
+
+def test_rollover_per_row_audit(db, term):
+    before = len(log_rows(db, 'INSERT'))
+    manager(db).rollover_members('1', '2024-2025', '2', '2024-2025', per_row_audit=True)
+    assert len(log_rows(db, 'INSERT')) == before + 2
+    assert log_rows(db, 'BULK_INS') == []
+
+def test_rollover_filters_by_organization(db, term):
+    other = add_org(db, 'Society of Biologists')
+    add_member(db, '2020-00004', other)
+    summary = manager(db).rollover_members('1', '2024-2025', '2', '2024-2025', org_id=other)
+    assert summary == {'eligible': 1, 'already_enrolled': 0, 'inserted': 1}
+
+def test_load_roster_validates_every_row(db, term):
+    summary = manager(db).load_roster(roster(
+        f"2020-00004,{term},2,2024-2025,Active,Member,Finance",
+        f"2020-00002,{term},2,2024-2025,Active,Member,Finance",
+        f"2020-09999,{term},2,2024-2025,Active,Member,Finance",
+        "2020-00001,9999,2,2024-2025,Active,Member,Finance",
+        "2020-00001,abc,2,2024-2025,Active,Member,Finance",
+        f"2020-00001,{term},,2024-2025,Active,Member,Finance",
+        f"2020-00004,{term},2,2024-2025,Active,Member,Publicity",
+        f"2020-00003,{term},2,2024-2025,Active,Member,Finance",
+    ), batch_size=2)
+    assert summary['read'] == 8
+    assert summary['inserted'] == 2
+    assert summary['missing_students'] == [(4, '2020-09999', term, '2', '2024-2025')]
+    assert summary['missing_orgs'] == [(5, '2020-00001', 9999, '2', '2024-2025')]
+    assert summary['invalid'] == [(6, '2020-00001', 'abc', '2', '2024-2025'),
+                                  (7, '2020-00001', term, '', '2024-2025')]
+    assert sorted(summary['duplicates']) == [(3, '2020-00002', term, '2', '2024-2025'),
+                                             (8, '2020-00004', term, '2', '2024-2025')]
+    assert second_semester(db) == ['2020-00002', '2020-00003', '2020-00004']
+
+    db.cursor.execute("""SELECT committee FROM belongs_to
+                         WHERE stud_no = '2020-00004' AND semester = '2' AND acad_year = '2024-2025'""")
+    assert db.cursor.fetchone()['committee'] == 'Finance'
+    assert [identifier.endswith('(1 rows)') for identifier in log_rows(db, 'BULK_INS')] == [True, True]
+
+def test_load_roster_rejects_archived_memberships(db, term):
+    from archive import archive_year
+    assert archive_year(db, 2024) == (0, 5)
+    summary = manager(db).load_roster(roster(f"2020-00001,{term},1,2024-2025,Active,Member,Finance"))
+    assert summary['inserted'] == 0
+    assert summary['duplicates'] == [(2, '2020-00001', term, '1', '2024-2025')]
+
+def test_rollover_refuses_pending_work(db, term):
+    from mysql.connector import errors
+    db.cursor.execute("""INSERT INTO student (stud_no, firstname, lastname, degrprog, batch, gender)
+                         VALUES ('2020-00005', 'Ana', 'Reyes', 'BSCS', 2020, 'F')""")
+    with pytest.raises(errors.ProgrammingError, match="open transaction"):
+        manager(db).rollover_members('1', '2024-2025', '2', '2024-2025')
+    # The caller's insert is neither committed nor rolled back by the rollover
+    assert db.connection.in_transaction
+    db.connection.rollback()
+    db.cursor.execute("SELECT COUNT(*) AS n FROM student WHERE stud_no = '2020-00005'")
+    assert db.cursor.fetchone()['n'] == 0
+    assert second_semester(db) == ['2020-00002']
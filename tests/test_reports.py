@@ -0,0 +1,60 @@
+from decimal import Decimal
+
+import pytest
+
+from conftest import add_fee, add_member, add_org, add_student
+
+@pytest.fixture
+def debts(db):
+    """Three debtors in two organizations: 2020-00001 owes 150.00, 2020-00002 owes 149.99, 2020-00003 owes 500.00"""
+    first, second = add_org(db, 'Young Computer Scientists'), add_org(db, 'Society of Biologists')
+    for stud_no in ('2020-00001', '2020-00002', '2020-00003', '2020-00004'):
+        add_student(db, stud_no)
+        add_member(db, stud_no, first)
+    add_fee(db, '2020-00001', first, Decimal('100.00'), '2024-09-30')
+    add_fee(db, '2020-00001', first, Decimal('100.00'), '2024-10-30', amount_paid=Decimal('50.00'),
+            payment_date='2024-10-01')
+    add_fee(db, '2020-00002', first, Decimal('149.99'), '2024-09-30')
+    add_fee(db, '2020-00003', first, Decimal('200.00'), '2023-09-30')
+    add_fee(db, '2020-00003', second, Decimal('300.00'), '2024-09-30')
+    add_fee(db, '2020-00004', first, Decimal('80.00'), '2024-09-30', amount_paid=Decimal('80.00'),
+            payment_date='2024-09-01')
+    return first, second
+
+def top_debtors(db, **params):
+    from reports import AdvancedReports
+    return [(row['stud_no'], Decimal(row['balance'])) for row in AdvancedReports(db).top_debtors(**params)]
+
+def test_top_debtors_ranks_open_balances(db, debts):
+    assert top_debtors(db) == [('2020-00003', Decimal('500.00')), ('2020-00001', Decimal('150.00')),
+                               ('2020-00002', Decimal('149.99'))]
+    assert top_debtors(db, k=1) == [('2020-00003', Decimal('500.00'))]
+
+def test_top_debtors_min_balance_is_numeric(db, debts):
+    # A Decimal bound as TEXT compares greater than every number in SQLite
+    assert len(top_debtors(db, min_balance=Decimal('0'))) == 3
+    assert [stud_no for stud_no, _ in top_debtors(db, min_balance=Decimal('150.00'))] == ['2020-00003',
+                                                                                       '2020-00001']
+    assert top_debtors(db, min_balance=Decimal('500.01')) == []
+
+def test_top_debtors_scopes(db, debts):
+    first, second = debts
+    assert top_debtors(db, org_id=second) == [('2020-00003', Decimal('300.00'))]
+    assert top_debtors(db, from_acad_year='2024-2025') == [('2020-00003', Decimal('300.00')),
+                                                           ('2020-00001', Decimal('150.00')),
+                                                           ('2020-00002', Decimal('149.99'))]
+    assert top_debtors(db, org_id=first, to_acad_year='2023-2024') == [('2020-00003', Decimal('200.00'))]
+
+@pytest.mark.parametrize('params', [{'k': 0}, {'k': -1}, {'from_acad_year': 'abc'}, {'to_acad_year': '2022'},
+                                    {'from_acad_year': '2022-2024'}, {'to_acad_year': '2022-'}])
+def test_top_debtors_rejects_bad_bounds(db, debts, params):
+    with pytest.raises(ValueError):
+        top_debtors(db, **params)
+
+def test_top_debtors_cli_on_sqlite(db, debts, capsys):
+    import soms
+    status = soms.run(['report', 'top-debtors', '--min-balance', '0', '--format', 'csv',
+                       '--sqlite', db.path])
+    lines = capsys.readouterr().out.splitlines()
+    assert status == soms.EXIT_OK
+    assert [line.split(',')[1] for line in lines[1:]] == ['2020-00003', '2020-00001', '2020-00002']
@@ -0,0 +1,80 @@
+import shutil
+from decimal import Decimal
+
+import pytest
+from mysql.connector import errors
+
+from conftest import add_fee, add_member, add_org, add_student
+from routing import ReportRouter
+
+@pytest.fixture
+def primary(db):
+    org_id = add_org(db)
+    add_student(db, '2020-00001')
+    add_member(db, '2020-00001', org_id)
+    add_fee(db, '2020-00001', org_id, Decimal('100.00'), '2024-09-30')
+    return db
+
+def top_debtors(db, router):
+    from reports import AdvancedReports
+    return [row['stud_no'] for row in AdvancedReports(db, router=router).top_debtors()]
+
+def pending_fee(db):
+    """An uncommitted write on the shared connection, as a cashier leaves it mid-payment"""
+    db.cursor.execute("UPDATE payment SET amount_paid = 100, payment_status = 'Paid'")
+    assert db.connection.in_transaction
+
+def assert_still_pending(db):
+    assert db.connection.in_transaction
+    db.connection.rollback()
+    db.cursor.execute("SELECT payment_status FROM payment")
+    assert db.cursor.fetchone()['payment_status'] == 'Not Paid'
+
+def test_report_refuses_an_open_transaction(primary):
+    router = ReportRouter(primary)
+    pending_fee(primary)
+    with pytest.raises(errors.ProgrammingError, match="open transaction"):
+        top_debtors(primary, router)
+    assert_still_pending(primary)
+
+def test_report_reads_on_a_separate_primary_connection(primary):
+    from backend import SQLiteConnection
+    # Opened before the write: a new SQLite connection would wait on the write lock to create its schema
+    separate = SQLiteConnection(primary.path)
+    router = ReportRouter(primary, connect_primary=lambda: separate)
+    pending_fee(primary)
+    # The separate connection sees only committed rows
+    assert top_debtors(primary, router) == ['2020-00001']
+    assert router.routes == {'primary': 1}
+    assert_still_pending(primary)
+
+def test_replica_check_leaves_the_primary_transaction(primary, tmp_path):
+    from backend import SQLiteConnection
+    replica_path = str(tmp_path / 'replica.db')
+    shutil.copy(primary.path, replica_path)
+    router = ReportRouter(primary, lambda: SQLiteConnection(replica_path))
+    pending_fee(primary)
+    assert top_debtors(primary, router) == ['2020-00001']
+    assert router.routes == {'replica': 1}
+    assert_still_pending(primary)
+
+def test_replica_errors_fall_back_to_the_primary(primary, tmp_path):
+    from backend import SQLiteConnection
+    replica_path = str(tmp_path / 'replica.db')
+    shutil.copy(primary.path, replica_path)
+
+    def broken():
+        # Dropped after connecting, since SQLiteConnection creates any missing table
+        connection = SQLiteConnection(replica_path)
+        connection.cursor().execute("DROP TABLE studentorg_log")
+        connection.commit()
+        return connection
+    router = ReportRouter(primary, broken)
+    assert top_debtors(primary, router) == ['2020-00001']
+    assert router.routes == {'unavailable': 1, 'primary': 1}
+
+    def unreachable():
+        raise errors.InterfaceError(msg="Can't connect to replica")
+    router = ReportRouter(primary, unreachable)
+    assert top_debtors(primary, router) == ['2020-00001']
+    assert router.routes == {'unavailable': 1, 'primary': 1}
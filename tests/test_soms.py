@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+import soms
+from conftest import add_fee, add_member, add_org, add_student
+
+@pytest.mark.parametrize('options, message', [
+    (['--to-ay', '2022'], "Invalid academic year: '2022'"),
+    (['--from-ay', 'abc'], "Invalid academic year: 'abc'"),
+    (['--top', '-1'], "Invalid number of rows: -1"),
+])
+def test_report_rejects_bad_parameters(db, capsys, options, message):
+    status = soms.run(['report', 'top-debtors', *options, '--sqlite', db.path])
+    assert status == soms.EXIT_USAGE
+    assert capsys.readouterr().err.startswith(f"✗ {message}")
+
+@pytest.mark.parametrize('options', [['--from-sem', '1', '--from-ay', '2024'],
+                                     ['--from-sem', '2', '--from-ay', '2024-2025', '--to-ay', '2025/2026']])
+def test_rollover_rejects_bad_academic_years(db, capsys, options):
+    status = soms.run(['members', 'rollover', *options, '--sqlite', db.path])
+    assert status == soms.EXIT_USAGE
+    assert capsys.readouterr().err.startswith("✗ Invalid academic year")
+
+def test_json_output(db, capsys):
+    from decimal import Decimal
+    org_id = add_org(db)
+    add_student(db, '2020-00001')
+    add_member(db, '2020-00001', org_id)
+    add_fee(db, '2020-00001', org_id, Decimal('99.50'), '2024-09-30')
+    assert soms.run(['report', 'top-debtors', '--format', 'json', '--sqlite', db.path]) == soms.EXIT_OK
+    [row] = json.loads(capsys.readouterr().out)
+    # Decimals are written as strings
+    assert (row['stud_no'], row['balance']) == ('2020-00001', '99.50')